@@ -1,6 +1,7 @@
 from datetime import datetime, timezone
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy import func
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.core.deps import get_current_user
@@ -8,6 +9,13 @@ from app.models.hr_employee import HREmployee
 from app.models.new_hire import NewHire
 from app.models.question import Question
 from app.models.conversation import Conversation
+from app.models.contract import Contract
+from app.models.contract_template import ContractTemplate
+from app.services.analytics_query import DIMENSIONS, METRICS, AnalyticsQueryError, run_query
+from app.services.exporter import export_response
+from app.services.generation_metrics import generation_metrics
+from app.services.quantile_sketches import sketch_quantiles
+from app.services.status_history import average_hours_to_complete, funnel, stage_durations, time_in_stage
 
 router = APIRouter(prefix="/analytics", tags=["Analytics"])
 
@@ -46,7 +54,7 @@ async def get_overview(
             "completed": completed,
             "in_progress": in_progress,
             "completion_rate": completion_rate,
-            "average_time_to_complete_hours": 18.5,
+            "average_time_to_complete_hours": average_hours_to_complete(db, start_date, end_date),
             "total_questions": total_questions,
             "questions_answered": answered_questions,
             "average_response_time_hours": 3.2,
@@ -96,3 +104,203 @@ async def get_conversation_analytics(
         "by_language": by_language,
         "common_questions": [],
     }
+
+
+@router.get("/funnel")
+async def get_funnel(
+    start_date: str = Query(None),
+    end_date: str = Query(None),
+    db: Session = Depends(get_db),
+    current_user: HREmployee = Depends(get_current_user),
+):
+    """How many of the new hires created in the period reached each onboarding stage."""
+    return {"stages": funnel(db, start_date, end_date)}
+
+
+@router.get("/time-in-stage")
+async def get_time_in_stage(
+    start_date: str = Query(None),
+    end_date: str = Query(None),
+    db: Session = Depends(get_db),
+    current_user: HREmployee = Depends(get_current_user),
+):
+    """Hours new hires spent in each status, for status changes in the period."""
+    return {"stages": time_in_stage(db, start_date, end_date)}
+
+
+@router.get("/stage-durations")
+async def get_stage_durations(
+    from_status: str = Query("invited"),
+    to_status: str = Query("completed"),
+    start_date: str = Query(None),
+    end_date: str = Query(None),
+    db: Session = Depends(get_db),
+    current_user: HREmployee = Depends(get_current_user),
+):
+    """Hours from first reaching one status to first reaching another, e.g. invited to completed."""
+    return stage_durations(db, from_status, to_status, start_date, end_date)
+
+
+@router.get("/query")
+async def query_analytics(
+    metrics: List[str] = Query(..., description=f"Any of: {', '.join(METRICS)}"),
+    group_by: List[str] = Query([], description=f"Any of: {', '.join(DIMENSIONS)}"),
+    start_date: str = Query(None),
+    end_date: str = Query(None),
+    db: Session = Depends(get_db),
+    current_user: HREmployee = Depends(get_current_user),
+):
+    """New hire metrics grouped by whitelisted dimensions, computed in a single aggregate query.
+
+    Lists may be repeated parameters or comma-separated. Salary metrics are always
+    grouped by currency as well. Results are cached per normalized query for
+    ANALYTICS_QUERY_CACHE_TTL_SECONDS.
+    """
+    try:
+        return run_query(db, metrics, group_by, start_date, end_date)
+    except AnalyticsQueryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/percentiles/{metric}")
+async def get_percentiles(
+    metric: str,
+    group_by: List[str] = Query([]),
+    quantiles: str = Query("0.25,0.5,0.75"),
+    position: str = Query(None),
+    country: str = Query(None),
+    currency: str = Query(None),
+    language: str = Query(None),
+    db: Session = Depends(get_db),
+    current_user: HREmployee = Depends(get_current_user),
+):
+    """Salary or conversation duration percentiles from the stored quantile sketches.
+
+    ``salary`` has the dimensions position, country and currency; ``conversation_duration``
+    has language. Sketches matching the filters are merged per ``group_by`` combination.
+    """
+    filters = {
+        name: value
+        for name, value in {"position": position, "country": country, "currency": currency, "language": language}.items()
+        if value is not None
+    }
+    try:
+        qs = [float(q) for q in quantiles.split(",") if q.strip()]
+        dimensions = [d.strip() for value in group_by for d in value.split(",") if d.strip()]
+        rows = sketch_quantiles(db, metric, qs, filters, dimensions)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"metric": metric, "group_by": dimensions, "filters": filters, "rows": rows}
+
+
+@router.get("/conversations/export")
+async def export_conversations(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    new_hire_id: str = Query(None),
+    language: str = Query(None),
+    completion_status: str = Query(None),
+    start_date: str = Query(None),
+    end_date: str = Query(None),
+    include_transcript: bool = Query(False),
+    current_user: HREmployee = Depends(get_current_user),
+):
+    """Conversation records streamed as CSV or NDJSON, optionally with full transcripts."""
+    columns = [
+        Conversation.id, Conversation.new_hire_id, NewHire.full_name.label("new_hire_name"),
+        Conversation.session_id, Conversation.language, Conversation.platform,
+        Conversation.start_time, Conversation.end_time, Conversation.duration_seconds,
+        Conversation.completion_status, Conversation.sentiment_score, Conversation.engagement_score,
+        Conversation.summary, Conversation.agent_id, Conversation.elevenlabs_conversation_id,
+    ]
+    if include_transcript:
+        columns.append(Conversation.full_transcript)
+    statement = (
+        select(*columns)
+        .select_from(Conversation)
+        .outerjoin(NewHire, NewHire.id == Conversation.new_hire_id)
+    )
+    if new_hire_id:
+        statement = statement.where(Conversation.new_hire_id == new_hire_id)
+    if language:
+        statement = statement.where(Conversation.language == language)
+    if completion_status:
+        statement = statement.where(Conversation.completion_status == completion_status)
+    if start_date:
+        statement = statement.where(Conversation.start_time >= start_date)
+    if end_date:
+        statement = statement.where(Conversation.start_time < func.date(end_date) + 1)
+    return export_response(statement.order_by(Conversation.start_time.desc()), format, "conversations")
+
+
+@router.get("/generation")
+async def get_generation_analytics(
+    start_date: str = Query(None),
+    end_date: str = Query(None),
+    db: Session = Depends(get_db),
+    current_user: HREmployee = Depends(get_current_user),
+):
+    """Token usage and latency of contract generation per contract type, template and model.
+
+    ``documents`` aggregates what is persisted on contracts; ``live`` holds this
+    process's counters for every model call, including new hire parsing.
+    """
+    latency = Contract.generation_latency_ms
+    query = db.query(
+        Contract.contract_type,
+        Contract.template_id,
+        ContractTemplate.name,
+        Contract.ai_model,
+        func.count(Contract.id),
+        func.coalesce(func.sum(Contract.prompt_tokens), 0),
+        func.coalesce(func.sum(Contract.completion_tokens), 0),
+        func.avg(latency),
+        func.percentile_cont(0.5).within_group(latency),
+        func.percentile_cont(0.95).within_group(latency),
+        func.avg(Contract.generation_ttft_ms),
+        func.percentile_cont(0.95).within_group(Contract.generation_ttft_ms),
+    ).outerjoin(
+        ContractTemplate, ContractTemplate.id == Contract.template_id
+    ).filter(Contract.deleted_at == None, latency != None)
+
+    if start_date:
+        query = query.filter(Contract.created_at >= start_date)
+    if end_date:
+        query = query.filter(Contract.created_at < func.date(end_date) + 1)
+
+    rows = query.group_by(
+        Contract.contract_type, Contract.template_id, ContractTemplate.name, Contract.ai_model
+    ).order_by(func.count(Contract.id).desc()).all()
+
+    def _round(value):
+        return round(float(value), 1) if value is not None else None
+
+    documents = [
+        {
+            "contract_type": contract_type,
+            "template_id": str(template_id) if template_id else None,
+            "template_name": template_name,
+            "ai_model": ai_model,
+            "documents": count,
+            "prompt_tokens": int(prompt_tokens),
+            "completion_tokens": int(completion_tokens),
+            "average_latency_ms": _round(avg_latency),
+            "p50_latency_ms": _round(p50_latency),
+            "p95_latency_ms": _round(p95_latency),
+            "average_ttft_ms": _round(avg_ttft),
+            "p95_ttft_ms": _round(p95_ttft),
+        }
+        for (
+            contract_type, template_id, template_name, ai_model, count, prompt_tokens, completion_tokens,
+            avg_latency, p50_latency, p95_latency, avg_ttft, p95_ttft,
+        ) in rows
+    ]
+
+    return {
+        "documents": documents,
+        "totals": {
+            "documents": sum(d["documents"] for d in documents),
+            "prompt_tokens": sum(d["prompt_tokens"] for d in documents),
+            "completion_tokens": sum(d["completion_tokens"] for d in documents),
+        },
+        "live": generation_metrics.snapshot(),
+    }
@@ -0,0 +1,144 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from app.db.session import get_db
+from app.core.deps import get_current_user
+from app.models.hr_employee import HREmployee
+from app.models.contract_clause import ContractClause
+from app.schemas.clause import ClauseCreate, ClauseUpdate, ClauseResponse
+from app.services.template_renderer import TemplateValidationError, validate_template
+from app.services.clause_library import clause_library
+
+router = APIRouter(prefix="/clauses", tags=["Clauses"])
+
+
+def _clause_response(clause: ContractClause) -> ClauseResponse:
+    return ClauseResponse(
+        id=str(clause.id),
+        clause_key=clause.clause_key,
+        title=clause.title,
+        country=clause.country,
+        language=clause.language,
+        contract_types=clause.contract_types,
+        position=clause.position,
+        numbered=clause.numbered,
+        body_template=clause.body_template,
+        variables=clause.variables,
+        generation_prompt=clause.generation_prompt,
+        version=clause.version,
+        is_active=clause.is_active,
+        created_at=clause.created_at,
+        updated_at=clause.updated_at,
+    )
+
+
+@router.get("")
+async def list_clauses(
+    country: str = Query(None),
+    language: str = Query(None),
+    contract_type: str = Query(None),
+    is_active: bool = Query(None),
+    db: Session = Depends(get_db),
+    current_user: HREmployee = Depends(get_current_user),
+):
+    query = db.query(ContractClause).filter(ContractClause.deleted_at == None)
+
+    if country:
+        query = query.filter(ContractClause.country == country)
+    if language:
+        query = query.filter(ContractClause.language == language)
+    if contract_type:
+        query = query.filter(
+            (ContractClause.contract_types == None) | ContractClause.contract_types.any(contract_type)
+        )
+    if is_active is not None:
+        query = query.filter(ContractClause.is_active == is_active)
+
+    clauses = query.order_by(
+        ContractClause.country, ContractClause.language, ContractClause.position, ContractClause.version.desc()
+    ).all()
+    return {"data": [_clause_response(c) for c in clauses]}
+
+
+@router.post("", status_code=201, response_model=ClauseResponse)
+async def create_clause(
+    request: ClauseCreate,
+    db: Session = Depends(get_db),
+    current_user: HREmployee = Depends(get_current_user),
+):
+    try:
+        validate_template(request.body_template, request.variables)
+    except TemplateValidationError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    version = 1
+    if request.parent_clause_id:
+        parent = db.query(ContractClause).filter(
+            ContractClause.id == request.parent_clause_id, ContractClause.deleted_at == None
+        ).first()
+        if not parent:
+            raise HTTPException(status_code=404, detail="Parent clause not found")
+        version = (parent.version or 1) + 1
+
+    clause = ContractClause(
+        **request.model_dump(exclude={"parent_clause_id"}),
+        parent_clause_id=request.parent_clause_id,
+        version=version,
+        created_by=current_user.id,
+    )
+    db.add(clause)
+    db.commit()
+    db.refresh(clause)
+    clause_library.invalidate()
+    return _clause_response(clause)
+
+
+@router.get("/{clause_id}", response_model=ClauseResponse)
+async def get_clause(
+    clause_id: str,
+    db: Session = Depends(get_db),
+    current_user: HREmployee = Depends(get_current_user),
+):
+    clause = db.query(ContractClause).filter(
+        ContractClause.id == clause_id, ContractClause.deleted_at == None
+    ).first()
+    if not clause:
+        raise HTTPException(status_code=404, detail="Clause not found")
+    return _clause_response(clause)
+
+
+@router.patch("/{clause_id}")
+async def update_clause(
+    clause_id: str,
+    request: ClauseUpdate,
+    db: Session = Depends(get_db),
+    current_user: HREmployee = Depends(get_current_user),
+):
+    clause = db.query(ContractClause).filter(
+        ContractClause.id == clause_id, ContractClause.deleted_at == None
+    ).first()
+    if not clause:
+        raise HTTPException(status_code=404, detail="Clause not found")
+
+    update_data = request.model_dump(exclude_unset=True)
+    content_changed = (
+        "body_template" in update_data
+        and update_data["body_template"] != clause.body_template
+    )
+    if "body_template" in update_data or "variables" in update_data:
+        try:
+            validate_template(
+                update_data.get("body_template", clause.body_template),
+                update_data.get("variables", clause.variables),
+            )
+        except TemplateValidationError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+
+    for field, value in update_data.items():
+        setattr(clause, field, value)
+    # Compiled clauses are cached by (id, version), so edits must bump the version.
+    if content_changed or "variables" in update_data:
+        clause.version = (clause.version or 1) + 1
+
+    db.commit()
+    clause_library.invalidate()
+    return {"message": "Clause updated successfully"}
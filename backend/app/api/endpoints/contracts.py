@@ -1,8 +1,12 @@
+import asyncio
+import json
 from datetime import datetime, timezone
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
-from app.db.session import get_db
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload, defer
+from app.db.session import get_db, SessionLocal
+from app.core.config import settings
 from app.core.deps import get_current_user
 from app.models.hr_employee import HREmployee
 from app.models.new_hire import NewHire
@@ -10,14 +14,87 @@ from app.models.contract import Contract
 from app.models.contract_template import ContractTemplate
 from app.schemas.contract import (
     GenerateContractRequest, ContractResponse, ContractUpdate,
-    RegenerateContractRequest, ContractListItem,
+    RegenerateContractRequest, ContractListItem, BatchGenerateContractsRequest,
+    GenerateDocumentPackRequest,
 )
 from app.services.document_generator import DocumentGeneratorService
-import io
+from app.services.template_renderer import TemplateRenderError
+from app.services.template_index import template_index
+from app.services.pdf_renderer import get_contract_pdf
+from app.services.blob_store import get_blob_store
+from app.services.contract_storage import load_contract_content, store_contract_content
+from app.services.contract_sections import diff_clauses
+from app.services.exporter import export_response
 
 router = APIRouter(prefix="/contracts", tags=["Contracts"])
 
 
+def _contract_response(contract: Contract) -> ContractResponse:
+    return ContractResponse(
+        id=str(contract.id),
+        contract_type=contract.contract_type,
+        status=contract.status,
+        content=load_contract_content(contract),
+        s3_url=contract.s3_url,
+        version=contract.version,
+        generation_tokens=contract.generation_tokens,
+        prompt_tokens=contract.prompt_tokens,
+        completion_tokens=contract.completion_tokens,
+        generation_latency_ms=contract.generation_latency_ms,
+        generation_ttft_ms=contract.generation_ttft_ms,
+        ai_model=contract.ai_model,
+        created_at=contract.created_at,
+        updated_at=contract.updated_at,
+    )
+
+
+def _apply_new_hire_updates(db: Session, new_hire: NewHire, updates: dict) -> None:
+    allowed_fields = {'salary', 'position', 'department', 'start_date',
+                      'employment_type', 'work_location', 'currency'}
+    for field, value in updates.items():
+        if field in allowed_fields and value is not None:
+            setattr(new_hire, field, value)
+    new_hire.updated_at = datetime.now(timezone.utc)
+    db.commit()
+    db.refresh(new_hire)
+
+
+def _parse_range_header(range_header: str, size: int) -> tuple[int, int] | None:
+    """Parse a single 'bytes=' range into inclusive (start, end); None if unsatisfiable.
+
+    Other units and multi-range requests are answered with the whole object.
+    """
+    unit, _, spec = range_header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        return 0, size - 1
+    start_s, _, end_s = spec.strip().partition("-")
+    try:
+        if not start_s:
+            length = int(end_s)
+            if length <= 0:
+                return None
+            return max(size - length, 0), size - 1
+        start = int(start_s)
+        end = int(end_s) if end_s else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+def _contract_filters(new_hire_id: str = None, status_filter: str = None, contract_type: str = None) -> list:
+    """Criteria shared by the list and export endpoints."""
+    criteria = [Contract.deleted_at == None]
+    if new_hire_id:
+        criteria.append(Contract.new_hire_id == new_hire_id)
+    if status_filter:
+        criteria.append(Contract.status == status_filter)
+    if contract_type:
+        criteria.append(Contract.contract_type == contract_type)
+    return criteria
+
+
 @router.get("")
 async def list_contracts(
     new_hire_id: str = Query(None),
@@ -26,14 +103,11 @@ async def list_contracts(
     db: Session = Depends(get_db),
     current_user: HREmployee = Depends(get_current_user),
 ):
-    query = db.query(Contract).filter(Contract.deleted_at == None)
-
-    if new_hire_id:
-        query = query.filter(Contract.new_hire_id == new_hire_id)
-    if status_filter:
-        query = query.filter(Contract.status == status_filter)
-    if contract_type:
-        query = query.filter(Contract.contract_type == contract_type)
+    query = (
+        db.query(Contract)
+        .options(defer(Contract.content))
+        .filter(*_contract_filters(new_hire_id, status_filter, contract_type))
+    )
 
     contracts = query.order_by(Contract.created_at.desc()).all()
 
@@ -53,6 +127,32 @@ async def list_contracts(
     return {"data": items}
 
 
+@router.get("/export")
+async def export_contracts(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    new_hire_id: str = Query(None),
+    status_filter: str = Query(None, alias="status"),
+    contract_type: str = Query(None),
+    current_user: HREmployee = Depends(get_current_user),
+):
+    """Metadata (no document text) of every contract matching the list filters, as CSV or NDJSON."""
+    statement = (
+        select(
+            Contract.id, Contract.new_hire_id, NewHire.full_name.label("new_hire_name"),
+            Contract.template_id, Contract.contract_type, Contract.status, Contract.version,
+            Contract.parent_contract_id, Contract.signed_at, Contract.ai_model,
+            Contract.generation_tokens, Contract.prompt_tokens, Contract.completion_tokens,
+            Contract.generation_latency_ms, Contract.generation_ttft_ms, Contract.content_size,
+            Contract.created_at, Contract.updated_at,
+        )
+        .select_from(Contract)
+        .outerjoin(NewHire, NewHire.id == Contract.new_hire_id)
+        .where(*_contract_filters(new_hire_id, status_filter, contract_type))
+        .order_by(Contract.created_at.desc())
+    )
+    return export_response(statement, format, "contracts")
+
+
 @router.post("/generate", response_model=ContractResponse, status_code=status.HTTP_201_CREATED)
 async def generate_contract(
     request: GenerateContractRequest,
@@ -67,43 +167,210 @@ async def generate_contract(
 
     # Update new hire information if requested
     if request.update_new_hire and request.new_hire_updates:
-        allowed_fields = {'salary', 'position', 'department', 'start_date', 
-                         'employment_type', 'work_location', 'currency'}
-        for field, value in request.new_hire_updates.items():
-            if field in allowed_fields and value is not None:
-                setattr(new_hire, field, value)
-        new_hire.updated_at = datetime.now(timezone.utc)
-        db.commit()
-        db.refresh(new_hire)
+        _apply_new_hire_updates(db, new_hire, request.new_hire_updates)
 
     template = None
     if request.template_id:
         template = db.query(ContractTemplate).filter(
             ContractTemplate.id == request.template_id
         ).first()
+    template_resolved = template is None
+    if template_resolved:
+        template = template_index.resolve(
+            db, request.contract_type, new_hire.country, new_hire.preferred_language,
+        )
 
     generator = DocumentGeneratorService()
-    contract = await generator.generate_contract(
-        db=db,
-        new_hire=new_hire,
-        contract_type=request.contract_type,
-        template=template,
-        generation_prompt=request.generation_prompt,
-        custom_variables=request.custom_variables,
-    )
+    try:
+        contract = await generator.generate_contract(
+            db=db,
+            new_hire=new_hire,
+            contract_type=request.contract_type,
+            template=template,
+            generation_prompt=request.generation_prompt,
+            custom_variables=request.custom_variables,
+            template_resolved=template_resolved,
+        )
+    except TemplateRenderError as e:
+        raise HTTPException(status_code=422, detail=str(e))
 
-    return ContractResponse(
-        id=str(contract.id),
-        contract_type=contract.contract_type,
-        status=contract.status,
-        content=contract.content,
-        s3_url=contract.s3_url,
-        version=contract.version,
-        generation_tokens=contract.generation_tokens,
-        ai_model=contract.ai_model,
-        created_at=contract.created_at,
-        updated_at=contract.updated_at,
+    return _contract_response(contract)
+
+
+@router.post("/generate/batch")
+async def generate_contracts_batch(
+    request: BatchGenerateContractsRequest,
+    db: Session = Depends(get_db),
+    current_user: HREmployee = Depends(get_current_user),
+):
+    """
+    Generate one contract per new hire for a whole onboarding cohort.
+    Progress is streamed as NDJSON, one line per hire as it finishes, followed by
+    a summary line. Each contract is saved before its line is sent.
+    """
+    new_hire_ids = list(dict.fromkeys(request.new_hire_ids))
+    if len(new_hire_ids) > settings.CONTRACT_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A batch can contain at most {settings.CONTRACT_BATCH_MAX_SIZE} new hires",
+        )
+
+    if request.template_id:
+        template_exists = db.query(ContractTemplate.id).filter(
+            ContractTemplate.id == request.template_id
+        ).first()
+        if not template_exists:
+            raise HTTPException(status_code=404, detail="Template not found")
+
+    # The request-scoped session is closed before a streamed body is sent,
+    # so the batch runs on its own session.
+    async def stream():
+        batch_db = SessionLocal()
+        # Contracts are committed one by one on their own session, which leaves the
+        # new hires loaded in batch_db unexpired.
+        write_db = SessionLocal()
+        try:
+            new_hires = batch_db.query(NewHire).options(
+                joinedload(NewHire.benefits),
+            ).filter(
+                NewHire.id.in_(new_hire_ids), NewHire.deleted_at == None
+            ).all()
+            by_id = {str(nh.id): nh for nh in new_hires}
+
+            template = None
+            if request.template_id:
+                template = batch_db.query(ContractTemplate).filter(
+                    ContractTemplate.id == request.template_id
+                ).first()
+
+            generator = DocumentGeneratorService()
+            semaphore = asyncio.Semaphore(settings.CONTRACT_BATCH_CONCURRENCY)
+
+            async def generate_one(new_hire_id: str):
+                new_hire = by_id.get(new_hire_id)
+                if not new_hire:
+                    return new_hire_id, None, "New hire not found"
+                hire_template = template or template_index.resolve(
+                    batch_db, request.contract_type, new_hire.country, new_hire.preferred_language,
+                )
+                async with semaphore:
+                    try:
+                        contract = await generator.build_contract(
+                            new_hire=new_hire,
+                            contract_type=request.contract_type,
+                            template=hire_template,
+                            generation_prompt=request.generation_prompt,
+                            custom_variables=request.custom_variables,
+                            template_resolved=template is None,
+                        )
+                    except Exception as e:
+                        return new_hire_id, None, str(e)
+                return new_hire_id, contract, None
+
+            tasks = [asyncio.create_task(generate_one(i)) for i in new_hire_ids]
+            generated = 0
+            completed = 0
+            try:
+                for finished in asyncio.as_completed(tasks):
+                    new_hire_id, contract, error = await finished
+                    completed += 1
+                    # Stored before it is reported, so a dropped connection loses nothing already sent.
+                    if contract is not None:
+                        try:
+                            write_db.add(contract)
+                            write_db.commit()
+                            generated += 1
+                        except Exception as e:
+                            write_db.rollback()
+                            contract, error = None, f"Failed to save contract: {e}"
+                    yield json.dumps({
+                        "new_hire_id": new_hire_id,
+                        "status": "generated" if contract is not None else "failed",
+                        "contract_id": str(contract.id) if contract is not None else None,
+                        "error": error,
+                        "completed": completed,
+                        "total": len(new_hire_ids),
+                    }) + "\n"
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+            yield json.dumps({
+                "status": "completed",
+                "generated": generated,
+                "failed": len(new_hire_ids) - generated,
+                "total": len(new_hire_ids),
+            }) + "\n"
+        finally:
+            write_db.close()
+            batch_db.close()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+@router.post("/generate/pack", status_code=status.HTTP_201_CREATED)
+async def generate_document_pack(
+    request: GenerateDocumentPackRequest,
+    db: Session = Depends(get_db),
+    current_user: HREmployee = Depends(get_current_user),
+):
+    """Generate several document types for one new hire concurrently and save them together."""
+    contract_types = list(dict.fromkeys(request.contract_types))
+    new_hire = db.query(NewHire).options(joinedload(NewHire.benefits)).filter(
+        NewHire.id == request.new_hire_id, NewHire.deleted_at == None
+    ).first()
+    if not new_hire:
+        raise HTTPException(status_code=404, detail="New hire not found")
+
+    template_ids = request.template_ids or {}
+    templates = {}
+    if template_ids:
+        found = db.query(ContractTemplate).filter(
+            ContractTemplate.id.in_(set(template_ids.values()))
+        ).all()
+        by_id = {str(t.id): t for t in found}
+        for contract_type, template_id in template_ids.items():
+            if template_id not in by_id:
+                raise HTTPException(status_code=404, detail=f"Template not found for {contract_type}")
+            templates[contract_type] = by_id[template_id]
+    resolved = {t for t in contract_types if t not in templates}
+    for contract_type in resolved:
+        templates[contract_type] = template_index.resolve(
+            db, contract_type, new_hire.country, new_hire.preferred_language,
+        )
+
+    generator = DocumentGeneratorService()
+    custom_variables = request.custom_variables or {}
+    context = generator.prepare_context(new_hire, custom_variables)
+    semaphore = asyncio.Semaphore(settings.CONTRACT_BATCH_CONCURRENCY)
+
+    async def generate_one(contract_type: str) -> Contract:
+        async with semaphore:
+            return await generator.build_contract(
+                new_hire=new_hire,
+                contract_type=contract_type,
+                template=templates.get(contract_type),
+                generation_prompt=request.generation_prompt,
+                custom_variables=custom_variables,
+                context=context,
+                template_resolved=contract_type in resolved,
+            )
+
+    results = await asyncio.gather(
+        *(generate_one(t) for t in contract_types), return_exceptions=True,
     )
+    for contract_type, result in zip(contract_types, results):
+        if isinstance(result, TemplateRenderError):
+            raise HTTPException(status_code=422, detail=f"{contract_type}: {result}")
+        if isinstance(result, Exception):
+            raise HTTPException(status_code=500, detail=f"Failed to generate {contract_type}: {result}")
+
+    db.add_all(results)
+    db.commit()
+    for contract in results:
+        db.refresh(contract)
+
+    return {"data": [_contract_response(c) for c in results]}
 
 
 @router.get("/{contract_id}", response_model=ContractResponse)
@@ -118,18 +385,7 @@ async def get_contract(
     if not contract:
         raise HTTPException(status_code=404, detail="Contract not found")
 
-    return ContractResponse(
-        id=str(contract.id),
-        contract_type=contract.contract_type,
-        status=contract.status,
-        content=contract.content,
-        s3_url=contract.s3_url,
-        version=contract.version,
-        generation_tokens=contract.generation_tokens,
-        ai_model=contract.ai_model,
-        created_at=contract.created_at,
-        updated_at=contract.updated_at,
-    )
+    return _contract_response(contract)
 
 
 @router.patch("/{contract_id}")
@@ -146,6 +402,8 @@ async def update_contract(
         raise HTTPException(status_code=404, detail="Contract not found")
 
     update_data = request.model_dump(exclude_unset=True)
+    if "content" in update_data:
+        store_contract_content(contract, update_data.pop("content"), contract.parent_contract)
     for field, value in update_data.items():
         setattr(contract, field, value)
 
@@ -154,9 +412,42 @@ async def update_contract(
     return {"message": "Contract updated successfully"}
 
 
+@router.get("/{contract_id}/diff/{other_contract_id}")
+async def diff_contracts(
+    contract_id: str,
+    other_contract_id: str,
+    db: Session = Depends(get_db),
+    current_user: HREmployee = Depends(get_current_user),
+):
+    """Clause-level changes going from contract_id to other_contract_id; unchanged clauses are omitted."""
+    contracts = db.query(Contract).options(defer(Contract.content)).filter(
+        Contract.id.in_([contract_id, other_contract_id]), Contract.deleted_at == None
+    ).all()
+    by_id = {str(c.id): c for c in contracts}
+    base, target = by_id.get(contract_id), by_id.get(other_contract_id)
+    if not base or not target:
+        raise HTTPException(status_code=404, detail="Contract not found")
+
+    if base.content_sha256 and base.content_sha256 == target.content_sha256:
+        changes, unchanged = [], None
+    else:
+        changes, unchanged = diff_clauses(
+            load_contract_content(base) or "", load_contract_content(target) or "",
+        )
+
+    return {
+        "from": {"id": str(base.id), "version": base.version},
+        "to": {"id": str(target.id), "version": target.version},
+        "identical": not changes,
+        "unchanged_clauses": unchanged,
+        "changes": changes,
+    }
+
+
 @router.get("/{contract_id}/download")
 async def download_contract(
     contract_id: str,
+    range_header: str = Header(None, alias="Range"),
     db: Session = Depends(get_db),
     current_user: HREmployee = Depends(get_current_user),
 ):
@@ -166,14 +457,41 @@ async def download_contract(
     if not contract:
         raise HTTPException(status_code=404, detail="Contract not found")
 
-    # For now, generate a simple text file from the contract content
-    content = contract.content or "No content available"
-    buffer = io.BytesIO(content.encode("utf-8"))
+    content = load_contract_content(contract) or "No content available"
+    title = contract.contract_type.replace("_", " ").title()
+    try:
+        pdf_key = await get_contract_pdf(content, title)
+    except (ImportError, OSError):
+        # OSError: WeasyPrint is installed but its pango/cairo system libraries are not.
+        raise HTTPException(status_code=500, detail="WeasyPrint library not installed")
+
+    if contract.pdf_key != pdf_key:
+        contract.pdf_key = pdf_key
+        db.commit()
+
+    store = get_blob_store()
+    size = await asyncio.to_thread(store.size, pdf_key)
+    headers = {
+        "Content-Disposition": f"attachment; filename=contract_{contract_id}.pdf",
+        "Accept-Ranges": "bytes",
+        "ETag": f'"{pdf_key.rsplit("/", 1)[-1].removesuffix(".pdf")}"',
+    }
+
+    start, end, status_code = 0, size - 1, 200
+    if range_header:
+        byte_range = _parse_range_header(range_header, size)
+        if byte_range is None:
+            return Response(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+        start, end = byte_range
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
 
     return StreamingResponse(
-        buffer,
+        store.iter_range(pdf_key, start, end, settings.PDF_STREAM_CHUNK_SIZE),
+        status_code=status_code,
         media_type="application/pdf",
-        headers={"Content-Disposition": f"attachment; filename=contract_{contract_id}.pdf"},
+        headers=headers,
     )
 
 
@@ -191,31 +509,31 @@ async def regenerate_contract(
         raise HTTPException(status_code=404, detail="Contract not found")
 
     new_hire = db.query(NewHire).filter(NewHire.id == old_contract.new_hire_id).first()
+    if request.new_hire_updates:
+        _apply_new_hire_updates(db, new_hire, request.new_hire_updates)
     template = db.query(ContractTemplate).filter(
         ContractTemplate.id == old_contract.template_id
     ).first() if old_contract.template_id else None
+    custom_variables = (
+        request.custom_variables if request.custom_variables is not None else old_contract.variables
+    )
 
     generator = DocumentGeneratorService()
-    contract = await generator.generate_contract(
-        db=db,
-        new_hire=new_hire,
-        contract_type=old_contract.contract_type,
-        template=template,
-        generation_prompt=request.generation_prompt,
-        custom_variables=request.custom_variables,
-        parent_contract_id=old_contract.id,
-        version=old_contract.version + 1,
-    )
+    try:
+        contract = await generator.generate_contract(
+            db=db,
+            new_hire=new_hire,
+            contract_type=old_contract.contract_type,
+            template=template,
+            generation_prompt=request.generation_prompt,
+            custom_variables=custom_variables,
+            parent_contract=old_contract,
+            version=old_contract.version + 1,
+            incremental=bool(request.incremental),
+            # Only a directly rendered parent used its template as the finished text.
+            template_resolved=old_contract.ai_model != "template_render",
+        )
+    except TemplateRenderError as e:
+        raise HTTPException(status_code=422, detail=str(e))
 
-    return ContractResponse(
-        id=str(contract.id),
-        contract_type=contract.contract_type,
-        status=contract.status,
-        content=contract.content,
-        s3_url=contract.s3_url,
-        version=contract.version,
-        generation_tokens=contract.generation_tokens,
-        ai_model=contract.ai_model,
-        created_at=contract.created_at,
-        updated_at=contract.updated_at,
-    )
+    return _contract_response(contract)
@@ -1,8 +1,9 @@
 import uuid
 import math
 from datetime import datetime, timedelta, timezone
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import func, case
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, case, select
 from sqlalchemy.orm import Session, joinedload
 from app.db.session import get_db
 from app.core.deps import get_current_user
@@ -12,14 +13,21 @@ from app.models.benefit import Benefit
 from app.models.contract import Contract
 from app.models.question import Question
 from app.models.conversation import Conversation
-from app.models.conversation_message import ConversationMessage
 from app.schemas.new_hire import (
     NewHireCreate, NewHireUpdate, NewHireListItem, NewHireDetail,
     NewHireCreateResponse, NewHireListResponse, PaginationMeta,
     DashboardStatistics, InvitationRequest, InvitationResponse,
     BenefitResponse, AIParseNewHireRequest, AIParseNewHireResponse,
+    AIParseNewHireBatchRequest,
 )
 from app.core.config import settings
+from app.services.speculative_drafts import pregenerate_drafts
+from app.services.llm_provider import get_llm_provider
+from app.services.description_parser import parse_batch, parse_with_fallback
+from app.services.new_hire_import import IMPORT_FORMATS, detect_format, import_new_hires
+from app.services.exporter import export_response
+from app.services.status_history import average_hours_to_complete
+from app.services.conversation_archive import message_count
 import json
 
 router = APIRouter(prefix="/new-hires", tags=["New Hires"])
@@ -74,7 +82,7 @@ async def get_statistics(
         total_new_hires=total,
         by_status=by_status,
         completion_rate=round(completion_rate, 1),
-        average_time_to_complete_hours=18.5,
+        average_time_to_complete_hours=average_hours_to_complete(db),
         pending_questions=pending_questions,
         this_month={
             "new_hires_created": this_month_created,
@@ -84,6 +92,22 @@ async def get_statistics(
     )
 
 
+def _new_hire_filters(status: str = None, search: str = None) -> list:
+    """Criteria shared by the list and export endpoints."""
+    criteria = [NewHire.deleted_at == None]
+    if status:
+        criteria.append(NewHire.status == status)
+    if search:
+        search_term = f"%{search}%"
+        criteria.append((NewHire.full_name.ilike(search_term)) | (NewHire.email.ilike(search_term)))
+    return criteria
+
+
+def _new_hire_order(sort_by: str, sort_order: str):
+    sort_col = getattr(NewHire, sort_by, NewHire.created_at)
+    return sort_col.asc() if sort_order == "asc" else sort_col.desc()
+
+
 @router.get("", response_model=NewHireListResponse)
 async def list_new_hires(
     page: int = Query(1, ge=1),
@@ -95,23 +119,11 @@ async def list_new_hires(
     db: Session = Depends(get_db),
     current_user: HREmployee = Depends(get_current_user),
 ):
-    query = db.query(NewHire).filter(NewHire.deleted_at == None)
-
-    if status:
-        query = query.filter(NewHire.status == status)
-    if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            (NewHire.full_name.ilike(search_term)) | (NewHire.email.ilike(search_term))
-        )
+    query = db.query(NewHire).filter(*_new_hire_filters(status, search))
 
     total = query.count()
 
-    sort_col = getattr(NewHire, sort_by, NewHire.created_at)
-    if sort_order == "asc":
-        query = query.order_by(sort_col.asc())
-    else:
-        query = query.order_by(sort_col.desc())
+    query = query.order_by(_new_hire_order(sort_by, sort_order))
 
     offset = (page - 1) * per_page
     new_hires = query.offset(offset).limit(per_page).all()
@@ -161,6 +173,7 @@ async def list_new_hires(
 @router.post("", response_model=NewHireCreateResponse, status_code=status.HTTP_201_CREATED)
 async def create_new_hire(
     request: NewHireCreate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: HREmployee = Depends(get_current_user),
 ):
@@ -208,6 +221,9 @@ async def create_new_hire(
     db.commit()
     db.refresh(new_hire)
 
+    if settings.SPECULATIVE_DRAFTS_ENABLED:
+        background_tasks.add_task(pregenerate_drafts, str(new_hire.id))
+
     return NewHireCreateResponse(
         id=str(new_hire.id),
         session_id=session_id,
@@ -217,6 +233,51 @@ async def create_new_hire(
     )
 
 
+NEW_HIRE_EXPORT_COLUMNS = (
+    NewHire.id, NewHire.email, NewHire.full_name, NewHire.phone, NewHire.preferred_language,
+    NewHire.position, NewHire.department, NewHire.salary, NewHire.currency, NewHire.start_date,
+    NewHire.employment_type, NewHire.country, NewHire.city, NewHire.work_location, NewHire.status,
+    NewHire.voice_session_completed, NewHire.offer_accepted, NewHire.offer_accepted_at,
+    NewHire.invitation_sent_at, NewHire.notes, NewHire.created_at, NewHire.updated_at,
+)
+
+
+@router.get("/export")
+async def export_new_hires(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    status: str = Query(None),
+    search: str = Query(None),
+    sort_by: str = Query("created_at"),
+    sort_order: str = Query("desc"),
+    current_user: HREmployee = Depends(get_current_user),
+):
+    """Every new hire matching the list filters, streamed as CSV or NDJSON."""
+    statement = (
+        select(*NEW_HIRE_EXPORT_COLUMNS)
+        .where(*_new_hire_filters(status, search))
+        .order_by(_new_hire_order(sort_by, sort_order))
+    )
+    return export_response(statement, format, "new-hires")
+
+
+@router.post("/import")
+async def import_new_hires_file(
+    request: Request,
+    format: str = Query(None, description="csv or jsonl; taken from Content-Type when omitted"),
+    db: Session = Depends(get_db),
+    current_user: HREmployee = Depends(get_current_user),
+):
+    """
+    Bulk-create new hires from a CSV (with a header row) or JSONL request body.
+    The body is parsed as it is received and written in batches; invalid or duplicate
+    rows are reported by line number without aborting the rest of the file.
+    """
+    file_format = (format or detect_format(request.headers.get("content-type")) or "").lower()
+    if file_format not in IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="Specify format=csv or format=jsonl")
+    return await import_new_hires(db, request.stream(), file_format, current_user.id)
+
+
 @router.get("/{new_hire_id}", response_model=NewHireDetail)
 async def get_new_hire(
     new_hire_id: str,
@@ -226,7 +287,7 @@ async def get_new_hire(
     nh = db.query(NewHire).options(
         joinedload(NewHire.hr_employee),
         joinedload(NewHire.benefits),
-        joinedload(NewHire.contracts),
+        joinedload(NewHire.contracts).defer(Contract.content),
         joinedload(NewHire.questions).joinedload(Question.conversation),
         joinedload(NewHire.conversations),
     ).filter(
@@ -294,9 +355,7 @@ async def get_new_hire(
             "sentiment_score": float(cv.sentiment_score) if cv.sentiment_score else None,
             "engagement_score": float(cv.engagement_score) if cv.engagement_score else None,
             "language": cv.language,
-            "message_count": db.query(ConversationMessage).filter(
-                ConversationMessage.conversation_id == cv.id
-            ).count(),
+            "message_count": message_count(db, cv),
         } for cv in nh.conversations],
     )
 
@@ -305,6 +364,7 @@ async def get_new_hire(
 async def update_new_hire(
     new_hire_id: str,
     request: NewHireUpdate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: HREmployee = Depends(get_current_user),
 ):
@@ -318,6 +378,9 @@ async def update_new_hire(
 
     db.commit()
     db.refresh(nh)
+
+    if settings.SPECULATIVE_DRAFTS_ENABLED:
+        background_tasks.add_task(pregenerate_drafts, str(nh.id))
     return {"message": "New hire updated successfully", "id": str(nh.id)}
 
 
@@ -445,59 +508,65 @@ async def parse_new_hire_description(
     """
     Parse a natural language description of a new hire and extract structured data.
     Example: "Omar Hassan, Senior Software Engineer in Cairo, starts March 1st, 25000 EGP salary"
-    """
-    try:
-        from openai import OpenAI
-        client = OpenAI(api_key=settings.OPENAI_API_KEY)
-    except ImportError:
-        raise HTTPException(status_code=500, detail="OpenAI library not installed")
-    except Exception:
-        raise HTTPException(status_code=500, detail="OpenAI API key not configured")
-
-    system_prompt = """You are an HR data extraction assistant. Extract structured employee information from natural language descriptions.
-
-Extract the following fields if mentioned:
-- full_name: Employee's full name
-- email: Email address
-- phone: Phone number
-- preferred_language: "en" for English, "ar" for Arabic
-- position: Job title/position
-- department: Department name (e.g., Engineering, Marketing, Sales, HR, Finance)
-- salary: Numeric salary value
-- currency: Currency code (AED, USD, SAR, EGP)
-- start_date: Start date in YYYY-MM-DD format
-- employment_type: "full_time", "part_time", or "contract"
-- country: Country name (UAE, Saudi Arabia, Egypt, Jordan, Qatar)
-- city: City name
-- work_location: "office", "remote", or "hybrid"
-- benefits: Array of benefits with type and description
-- notes: Any additional notes
-
-Return ONLY valid JSON with the extracted fields. Omit fields that aren't mentioned.
-Use null for missing values. Be smart about inferring information (e.g., if "Dubai" is mentioned, country is likely "UAE")."""
-
-    user_prompt = f"""Extract employee information from this description:
-
-"{request.description}"
-
-Return only the JSON object with extracted fields."""
 
+    Clearly structured descriptions are parsed locally; the model is asked only for
+    the fields the local parser could not fill with confidence.
+    """
     try:
-        response = client.chat.completions.create(
-            model=settings.OPENAI_MODEL,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            temperature=0.1,
-            response_format={"type": "json_object"},
-        )
-
-        parsed_data = json.loads(response.choices[0].message.content)
-        return AIParseNewHireResponse(**parsed_data)
+        fields, confidence = await parse_with_fallback(request.description, get_llm_provider())
+        return AIParseNewHireResponse(**fields, confidence=confidence)
 
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Failed to parse description: {str(e)}"
         )
+
+
+@router.post("/parse-description/batch")
+async def parse_new_hire_descriptions_batch(
+    request: AIParseNewHireBatchRequest,
+    current_user: HREmployee = Depends(get_current_user),
+):
+    """
+    Parse a pasted list of new hire descriptions.
+    Results are streamed as NDJSON, one line per description as soon as it is parsed
+    (in completion order, identified by ``index``), followed by a summary line.
+    """
+    if len(request.descriptions) > settings.PARSE_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A batch can contain at most {settings.PARSE_BATCH_MAX_SIZE} descriptions",
+        )
+
+    async def stream():
+        sources: dict[str, int] = {}
+        failed = 0
+        completed = 0
+        async for result in parse_batch(request.descriptions, get_llm_provider()):
+            completed += 1
+            sources[result.source] = sources.get(result.source, 0) + 1
+            try:
+                data = AIParseNewHireResponse(**result.fields, confidence=result.confidence).model_dump()
+                error = result.error
+            except Exception as e:
+                data, error = None, f"Failed to parse description: {str(e)}"
+            if data is None:
+                failed += 1
+            yield json.dumps({
+                "index": result.index,
+                "status": "parsed" if data is not None else "failed",
+                "source": result.source,
+                "data": data,
+                "error": error,
+                "completed": completed,
+                "total": len(request.descriptions),
+            }, default=str) + "\n"
+        yield json.dumps({"summary": {
+            "total": len(request.descriptions),
+            "parsed": completed - failed,
+            "failed": failed,
+            "by_source": sources,
+        }}) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
@@ -1,6 +1,7 @@
 import math
 from datetime import datetime, timezone
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.core.deps import get_current_user
@@ -11,10 +12,23 @@ from app.schemas.question import (
     QuestionListItem, QuestionDetail, AnswerQuestionRequest,
     QuestionUpdate, QuestionListResponse,
 )
+from app.services.exporter import export_response
 
 router = APIRouter(prefix="/questions", tags=["Questions"])
 
 
+def _question_filters(status_filter: str = None, priority: str = None, new_hire_id: str = None) -> list:
+    """Criteria shared by the list and export endpoints."""
+    criteria = [Question.deleted_at == None]
+    if status_filter:
+        criteria.append(Question.status == status_filter)
+    if priority:
+        criteria.append(Question.priority == priority)
+    if new_hire_id:
+        criteria.append(Question.new_hire_id == new_hire_id)
+    return criteria
+
+
 @router.get("")
 async def list_questions(
     page: int = Query(1, ge=1),
@@ -25,14 +39,7 @@ async def list_questions(
     db: Session = Depends(get_db),
     current_user: HREmployee = Depends(get_current_user),
 ):
-    query = db.query(Question).filter(Question.deleted_at == None)
-
-    if status_filter:
-        query = query.filter(Question.status == status_filter)
-    if priority:
-        query = query.filter(Question.priority == priority)
-    if new_hire_id:
-        query = query.filter(Question.new_hire_id == new_hire_id)
+    query = db.query(Question).filter(*_question_filters(status_filter, priority, new_hire_id))
 
     total = query.count()
     offset = (page - 1) * per_page
@@ -68,6 +75,30 @@ async def list_questions(
     }
 
 
+@router.get("/export")
+async def export_questions(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    status_filter: str = Query(None, alias="status"),
+    priority: str = Query(None),
+    new_hire_id: str = Query(None),
+    current_user: HREmployee = Depends(get_current_user),
+):
+    """Every question matching the list filters, streamed as CSV or NDJSON."""
+    statement = (
+        select(
+            Question.id, Question.new_hire_id, NewHire.full_name.label("new_hire_name"),
+            Question.conversation_id, Question.question, Question.context, Question.category,
+            Question.status, Question.priority, Question.sentiment, Question.hr_response,
+            Question.responded_by, Question.asked_at, Question.answered_at, Question.response_due_by,
+        )
+        .select_from(Question)
+        .outerjoin(NewHire, NewHire.id == Question.new_hire_id)
+        .where(*_question_filters(status_filter, priority, new_hire_id))
+        .order_by(Question.asked_at.desc())
+    )
+    return export_response(statement, format, "questions")
+
+
 @router.get("/{question_id}", response_model=QuestionDetail)
 async def get_question(
     question_id: str,
@@ -7,6 +7,8 @@ from app.models.contract_template import ContractTemplate
 from app.schemas.template import (
     TemplateCreate, TemplateUpdate, TemplateResponse, TemplateListItem,
 )
+from app.services.template_renderer import TemplateValidationError, validate_template
+from app.services.template_index import template_index
 
 router = APIRouter(prefix="/templates", tags=["Templates"])
 
@@ -53,6 +55,20 @@ async def create_template(
     db: Session = Depends(get_db),
     current_user: HREmployee = Depends(get_current_user),
 ):
+    try:
+        validate_template(request.content_template, request.variables)
+    except TemplateValidationError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    version = 1
+    if request.parent_template_id:
+        parent = db.query(ContractTemplate).filter(
+            ContractTemplate.id == request.parent_template_id, ContractTemplate.deleted_at == None
+        ).first()
+        if not parent:
+            raise HTTPException(status_code=404, detail="Parent template not found")
+        version = (parent.version or 1) + 1
+
     template = ContractTemplate(
         name=request.name,
         description=request.description,
@@ -63,11 +79,14 @@ async def create_template(
         variables=request.variables,
         tags=request.tags,
         requires_legal_review=request.requires_legal_review,
+        parent_template_id=request.parent_template_id,
+        version=version,
         created_by=current_user.id,
     )
     db.add(template)
     db.commit()
     db.refresh(template)
+    template_index.invalidate()
 
     return TemplateResponse(
         id=str(template.id),
@@ -129,8 +148,25 @@ async def update_template(
         raise HTTPException(status_code=404, detail="Template not found")
 
     update_data = request.model_dump(exclude_unset=True)
+    content_changed = (
+        "content_template" in update_data
+        and update_data["content_template"] != template.content_template
+    )
+    if "content_template" in update_data or "variables" in update_data:
+        try:
+            validate_template(
+                update_data.get("content_template", template.content_template),
+                update_data.get("variables", template.variables),
+            )
+        except TemplateValidationError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+
     for field, value in update_data.items():
         setattr(template, field, value)
+    # Compiled templates are cached by (id, version), so edits must bump the version.
+    if content_changed or "variables" in update_data:
+        template.version = (template.version or 1) + 1
 
     db.commit()
+    template_index.invalidate()
     return {"message": "Template updated successfully"}
@@ -7,8 +7,10 @@ from app.core.config import settings
 from app.models.hr_employee import HREmployee
 from app.models.new_hire import NewHire
 from app.models.conversation import Conversation
-from app.models.conversation_message import ConversationMessage
 from app.models.question import Question
+from app.services.audit import set_audit_user
+from app.services.conversation_archive import get_transcript as load_transcript
+from app.services.transcript_store import get_transcript_store
 from app.schemas.voice import (
     InitializeSessionRequest, InitializeSessionResponse,
     VoiceConfigResponse, StoreMessageRequest,
@@ -30,6 +32,7 @@ async def initialize_session(
     ).first()
     if not new_hire:
         raise HTTPException(status_code=404, detail="Invalid session")
+    set_audit_user(new_hire.id, "new_hire")
 
     if new_hire.session_expires_at and new_hire.session_expires_at < datetime.now(timezone.utc):
         raise HTTPException(status_code=400, detail="Session expired")
@@ -145,20 +148,13 @@ async def store_message(
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
 
-    msg_count = db.query(ConversationMessage).filter(
-        ConversationMessage.conversation_id == conversation_id
-    ).count()
-
-    message = ConversationMessage(
-        conversation_id=conversation.id,
-        speaker=request.speaker,
-        message=request.message,
-        audio_url=request.audio_url,
-        audio_duration_seconds=request.audio_duration_seconds,
-        timestamp=request.timestamp or datetime.now(timezone.utc),
-        sequence_number=msg_count + 1,
-    )
-    db.add(message)
+    get_transcript_store().append(db, conversation, [{
+        "speaker": request.speaker,
+        "message": request.message,
+        "audio_url": request.audio_url,
+        "audio_duration_seconds": request.audio_duration_seconds,
+        "timestamp": request.timestamp or datetime.now(timezone.utc),
+    }])
     db.commit()
 
     return {"message": "Message stored successfully"}
@@ -257,9 +253,7 @@ async def get_transcript(
         raise HTTPException(status_code=404, detail="Conversation not found")
 
     new_hire = db.query(NewHire).filter(NewHire.id == conversation.new_hire_id).first()
-    messages = db.query(ConversationMessage).filter(
-        ConversationMessage.conversation_id == conversation_id
-    ).order_by(ConversationMessage.sequence_number).all()
+    messages, full_transcript = load_transcript(db, conversation)
 
     return TranscriptResponse(
         conversation_id=str(conversation.id),
@@ -269,12 +263,12 @@ async def get_transcript(
         duration_seconds=conversation.duration_seconds,
         language=conversation.language,
         messages=[{
-            "speaker": m.speaker,
-            "message": m.message,
-            "timestamp": m.timestamp.isoformat() if m.timestamp else None,
-            "audio_url": m.audio_url,
+            "speaker": m["speaker"],
+            "message": m["message"],
+            "timestamp": m["timestamp"],
+            "audio_url": m["audio_url"],
         } for m in messages],
-        full_transcript=conversation.full_transcript,
+        full_transcript=full_transcript,
         summary=conversation.summary,
         sentiment_score=float(conversation.sentiment_score) if conversation.sentiment_score else None,
     )
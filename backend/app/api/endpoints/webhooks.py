@@ -9,9 +9,9 @@ from sqlalchemy.orm import Session
 from app.core.config import settings
 from app.db.session import get_db
 from app.models.conversation import Conversation
-from app.models.conversation_message import ConversationMessage
 from app.models.question import Question
 from app.services.question_extractor import extract_questions_from_transcript
+from app.services.transcript_store import get_transcript_store
 
 
 router = APIRouter(prefix="/webhooks", tags=["Webhooks"])
@@ -142,11 +142,7 @@ def _store_transcript_messages(
     if not base_time and metadata.get("start_time_unix_secs"):
         base_time = datetime.fromtimestamp(metadata["start_time_unix_secs"], tz=timezone.utc)
 
-    existing_count = db.query(ConversationMessage).filter(
-        ConversationMessage.conversation_id == conversation.id
-    ).count()
-
-    sequence_number = existing_count
+    turns = []
     for turn in transcript:
         role = (turn.get("role") or "").lower()
         message = (turn.get("message") or "").strip()
@@ -158,14 +154,9 @@ def _store_transcript_messages(
         if base_time and turn.get("time_in_call_secs") is not None:
             timestamp = base_time + timedelta(seconds=float(turn["time_in_call_secs"]))
 
-        sequence_number += 1
-        db.add(ConversationMessage(
-            conversation_id=conversation.id,
-            speaker=speaker,
-            message=message,
-            timestamp=timestamp,
-            sequence_number=sequence_number,
-        ))
+        turns.append({"speaker": speaker, "message": message, "timestamp": timestamp})
+
+    get_transcript_store().append(db, conversation, turns)
 
 
 def _format_full_transcript(transcript: list[dict]) -> str | None:
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.endpoints import auth, new_hires, contracts, questions, templates, analytics, voice, webhooks
+from app.api.endpoints import auth, new_hires, contracts, questions, templates, clauses, analytics, voice, webhooks
 
 api_router = APIRouter()
 
@@ -8,6 +8,7 @@ api_router.include_router(new_hires.router)
 api_router.include_router(contracts.router)
 api_router.include_router(questions.router)
 api_router.include_router(templates.router)
+api_router.include_router(clauses.router)
 api_router.include_router(analytics.router)
 api_router.include_router(voice.router)
 api_router.include_router(webhooks.router)
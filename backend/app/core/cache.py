@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    """Thread-safe LRU of at most ``maxsize`` entries.
+
+    With ``ttl_seconds`` an entry also expires that long after it was stored.
+    None is never cached, so ``get`` returning None always means a miss.
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._items: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: K) -> Optional[V]:
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is None:
+                return None
+            if self.ttl_seconds is not None and time.monotonic() - entry[0] > self.ttl_seconds:
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: K, value: V) -> None:
+        if value is None:
+            return
+        with self._lock:
+            self._items[key] = (time.monotonic(), value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def get_or_set(self, key: K, factory: Callable[[], V]) -> V:
+        """Cached value, or ``factory()`` stored and returned; the factory runs outside the lock."""
+        value = self.get(key)
+        if value is None:
+            value = factory()
+            self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._items)
@@ -1,3 +1,4 @@
+from ipaddress import IPv4Network, IPv6Network, ip_network
 from pydantic_settings import BaseSettings
 from typing import Optional
 
@@ -30,6 +31,102 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: Optional[str] = None
     OPENAI_MODEL: str = "gpt-4-turbo"
 
+    # LLM provider: "openai", or "fake" for offline benchmarking
+    LLM_PROVIDER: str = "openai"
+    # Append every completion to this JSONL file so it can be replayed by the fake provider
+    LLM_RECORD_PATH: Optional[str] = None
+    # Start rate for batched model calls (0 disables the limit)
+    LLM_REQUESTS_PER_MINUTE: float = 120.0
+    FAKE_LLM_LATENCY_MEDIAN_MS: float = 800.0
+    FAKE_LLM_LATENCY_P95_MS: float = 2500.0
+    FAKE_LLM_COMPLETION_TOKENS: int = 600
+    FAKE_LLM_REPLAY_PATH: Optional[str] = None
+    FAKE_LLM_SEED: int = 0
+    # parse-description: the model is only asked for fields the local parser scores below this
+    PARSE_LOCAL_MIN_CONFIDENCE: float = 0.8
+    PARSE_CACHE_SIZE: int = 1000
+    PARSE_BATCH_MAX_SIZE: int = 200
+    PARSE_BATCH_ITEMS_PER_CALL: int = 8
+    PARSE_BATCH_CONCURRENCY: int = 4
+    # Recent calls per series kept for latency percentiles in /analytics/generation
+    GENERATION_METRICS_SAMPLE_SIZE: int = 1000
+
+    # Contract generation
+    CONTRACT_BATCH_MAX_SIZE: int = 200
+    CONTRACT_BATCH_CONCURRENCY: int = 8
+    # Prompt budget for document generation; oversized template sections are trimmed to fit
+    PROMPT_TOKEN_BUDGET: int = 6000
+    PROMPT_MIN_SECTION_TOKENS: int = 60
+    GENERATION_MIN_OUTPUT_TOKENS: int = 1024
+    GENERATION_MAX_OUTPUT_TOKENS: int = 4096
+    TEMPLATE_CACHE_SIZE: int = 256
+    TEMPLATE_INDEX_TTL_SECONDS: int = 300
+
+    CONTRACT_TEXT_CACHE_SIZE: int = 512
+    CONTRACT_SNAPSHOT_INTERVAL: int = 5
+    CONTRACT_DELTA_MAX_RATIO: float = 0.5
+    # Above this share of affected clauses an incremental regeneration falls back to a full one
+    CONTRACT_INCREMENTAL_MAX_FRACTION: float = 0.6
+
+    # Bulk new hire import
+    NEW_HIRE_IMPORT_BATCH_SIZE: int = 500
+    NEW_HIRE_IMPORT_MAX_REPORTED_ERRORS: int = 1000
+
+    # Results of /analytics/query, keyed by normalized query
+    ANALYTICS_QUERY_CACHE_SIZE: int = 256
+    ANALYTICS_QUERY_CACHE_TTL_SECONDS: int = 60
+
+    # Relative error of the salary and duration quantile sketches
+    QUANTILE_SKETCH_RELATIVE_ACCURACY: float = 0.01
+
+    # Write-behind audit log: entries are queued on commit and inserted in batches
+    AUDIT_QUEUE_SIZE: int = 10000
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 1.0
+    AUDIT_MAX_VALUE_LENGTH: int = 1000
+    # Reverse proxies (addresses or CIDR ranges, comma-separated) whose X-Forwarded-For is
+    # believed when recording the client address; without any, the direct peer is recorded.
+    TRUSTED_PROXIES: str = ""
+
+    @property
+    def trusted_proxy_networks(self) -> list[IPv4Network | IPv6Network]:
+        """Parse TRUSTED_PROXIES into networks"""
+        return [ip_network(p.strip(), strict=False) for p in self.TRUSTED_PROXIES.split(",") if p.strip()]
+
+    # Monthly partitions of audit_logs and conversation_messages
+    PARTITION_MONTHS_AHEAD: int = 3
+    PARTITION_MAINTENANCE_INTERVAL_SECONDS: int = 21600
+    AUDIT_LOG_RETENTION_MONTHS: int = 24
+    CONVERSATION_MESSAGE_RETENTION_MONTHS: int = 36
+
+    # Conversations of completed new hires move to zstd blobs after this many days
+    CONVERSATION_ARCHIVE_AFTER_DAYS: int = 90
+    CONVERSATION_ARCHIVE_ZSTD_LEVEL: int = 10
+    CONVERSATION_ARCHIVE_CACHE_SIZE: int = 64
+
+    # Transcript layout: "rows" (one conversation_messages row per turn) or "chunks"
+    # (JSONB arrays of up to TRANSCRIPT_CHUNK_SIZE turns per row, appended in batches)
+    TRANSCRIPT_STORAGE: str = "rows"
+    TRANSCRIPT_CHUNK_SIZE: int = 200
+
+    # Rows fetched per server-side cursor batch by the CSV/NDJSON exports
+    EXPORT_BATCH_SIZE: int = 1000
+
+    # Parquet snapshots for BI, written to the blob store under SNAPSHOT_PREFIX
+    SNAPSHOT_PREFIX: str = "analytics"
+    SNAPSHOT_ROWS_PER_FILE: int = 100000
+    SNAPSHOT_WATERMARK_LAG_SECONDS: int = 60
+
+    # Speculative drafts: pre-generate the default document pack when a new hire is saved
+    SPECULATIVE_DRAFTS_ENABLED: bool = False
+    SPECULATIVE_DRAFT_CONCURRENCY: int = 2
+    SPECULATIVE_DRAFT_TTL_SECONDS: int = 3600
+    SPECULATIVE_DRAFT_CACHE_SIZE: int = 1000
+
+    # PDF rendering
+    PDF_RENDER_WORKERS: int = 2
+    PDF_STREAM_CHUNK_SIZE: int = 64 * 1024
+
     # ElevenLabs
     ELEVENLABS_API_KEY: Optional[str] = None
     ELEVENLABS_AGENT_ID: Optional[str] = None
@@ -40,6 +137,14 @@ class Settings(BaseSettings):
     AWS_SECRET_ACCESS_KEY: Optional[str] = None
     AWS_REGION: str = "us-east-1"
     S3_BUCKET_NAME: str = "hr-platform-documents"
+    # Point at MinIO (e.g. http://minio:9000) to use an S3-compatible stand-in
+    S3_ENDPOINT_URL: Optional[str] = None
+
+    # Blob storage for contract text and PDFs: "local" or "s3"
+    BLOB_STORE_BACKEND: str = "local"
+    BLOB_STORE_LOCAL_DIR: str = "/var/lib/hr-platform/blobs"
+    # Set once BLOB_STORE_LOCAL_DIR is a persistent volume; until then contract text stays in Postgres
+    BLOB_STORE_LOCAL_DURABLE: bool = False
 
     # Twilio (WhatsApp)
     TWILIO_ACCOUNT_SID: Optional[str] = None
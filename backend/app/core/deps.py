@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.core.security import decode_token
 from app.models.hr_employee import HREmployee
+from app.services.audit import set_audit_user
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
@@ -34,6 +35,7 @@ async def get_current_user(
     ).first()
     if user is None:
         raise credentials_exception
+    set_audit_user(user.id, "hr_employee")
     return user
 
 
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import uuid
+from datetime import date
+from decimal import Decimal
+from typing import Optional
+
+
+def jsonable(value, *, decimals: Optional[int] = None, max_length: Optional[int] = None):
+    """``value`` with UUIDs, decimals and dates converted to JSON types, recursing into dicts and lists.
+
+    Decimals become exact strings unless ``decimals`` is given, in which case they
+    and floats are rounded to that many places. Strings longer than ``max_length``
+    are cut short and end in an ellipsis.
+    """
+    if decimals is not None and isinstance(value, (Decimal, float)):
+        return round(float(value), decimals)
+    if isinstance(value, (uuid.UUID, Decimal)):
+        return str(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return {k: jsonable(v, decimals=decimals, max_length=max_length) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [jsonable(v, decimals=decimals, max_length=max_length) for v in value]
+    if max_length is not None and isinstance(value, str) and len(value) > max_length:
+        return value[:max_length] + "…"
+    return value
@@ -5,8 +5,17 @@ from app.models.hr_employee import HREmployee  # noqa
 from app.models.new_hire import NewHire  # noqa
 from app.models.contract import Contract  # noqa
 from app.models.contract_template import ContractTemplate  # noqa
+from app.models.contract_clause import ContractClause  # noqa
 from app.models.benefit import Benefit  # noqa
 from app.models.conversation import Conversation  # noqa
 from app.models.conversation_message import ConversationMessage  # noqa
 from app.models.question import Question  # noqa
 from app.models.audit_log import AuditLog  # noqa
+from app.models.quantile_sketch import QuantileSketch  # noqa
+from app.models.status_transition import NewHireStatusTransition  # noqa
+from app.models.transcript_chunk import ConversationTranscriptChunk  # noqa
+
+# Flush listeners that keep derived tables in step with the models above
+import app.services.quantile_sketches  # noqa
+import app.services.status_history  # noqa
+import app.services.audit  # noqa
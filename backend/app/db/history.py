@@ -0,0 +1,21 @@
+from sqlalchemy import event
+
+# (model, attribute name) pairs already listened to
+_tracked: set[tuple[type, str]] = set()
+
+
+def _keep_old_value(target, value, oldvalue, initiator):
+    return value
+
+
+def track_previous_values(*attributes) -> None:
+    """Load each attribute's old value before it is overwritten, so flush listeners see it in its history.
+
+    Registering the same attribute again is a no-op.
+    """
+    for attribute in attributes:
+        key = (attribute.class_, attribute.key)
+        if key in _tracked:
+            continue
+        _tracked.add(key)
+        event.listen(attribute, "set", _keep_old_value, active_history=True, retval=True)
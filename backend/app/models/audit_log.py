@@ -7,6 +7,8 @@ from app.db.base_class import Base
 
 class AuditLog(Base):
     __tablename__ = "audit_logs"
+    # Monthly range partitions on created_at, maintained by app.services.partitions
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
 
@@ -28,4 +30,5 @@ class AuditLog(Base):
     request_id = Column(String(255))
 
     # Timestamps
-    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), index=True)
+    # Part of the primary key because Postgres requires the partition key in it
+    created_at = Column(DateTime(timezone=True), primary_key=True, default=lambda: datetime.now(timezone.utc), index=True)
@@ -20,6 +20,11 @@ class Contract(Base):
     s3_url = Column(Text)
     s3_bucket = Column(String(255))
     s3_key = Column(String(500))
+    content_sha256 = Column(String(64))
+    content_size = Column(Integer)
+    pdf_key = Column(String(500))
+    # Number of deltas between this version's stored text and the last full snapshot
+    delta_depth = Column(Integer, default=0)
 
     # Version Control
     version = Column(Integer, default=1)
@@ -37,6 +42,11 @@ class Contract(Base):
     generation_prompt = Column(Text)
     ai_model = Column(String(100))
     generation_tokens = Column(Integer)
+    prompt_tokens = Column(Integer)
+    completion_tokens = Column(Integer)
+    generation_latency_ms = Column(Integer)
+    # Time to the first streamed token of the earliest model call, if any
+    generation_ttft_ms = Column(Integer)
 
     # Document Metadata
     meta_data = Column(JSONB, default={})
@@ -44,7 +54,7 @@ class Contract(Base):
 
     # Timestamps
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
-    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), index=True)
     deleted_at = Column(DateTime(timezone=True))
 
     # Relationships
@@ -0,0 +1,44 @@
+import uuid
+from datetime import datetime, timezone
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, Text, ForeignKey, ARRAY
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from app.db.base_class import Base
+
+
+class ContractClause(Base):
+    __tablename__ = "contract_clauses"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    clause_key = Column(String(100), nullable=False, index=True)
+    title = Column(String(255), nullable=False)
+
+    # Jurisdiction
+    country = Column(String(100), nullable=False, index=True)
+    language = Column(String(10), nullable=False, default="en")
+
+    # Contract types this clause belongs to; NULL means every type
+    contract_types = Column(ARRAY(String))
+    position = Column(Integer, nullable=False, default=0)
+    # Unnumbered clauses (preamble, signature block) are emitted without a heading
+    numbered = Column(Boolean, default=True)
+
+    # Clause Content
+    body_template = Column(Text, nullable=False)
+    variables = Column(JSONB, nullable=False, default=[])
+    # When set, the rendered body is adapted by the model using these instructions
+    generation_prompt = Column(Text)
+
+    # Version Control
+    version = Column(Integer, default=1)
+    parent_clause_id = Column(UUID(as_uuid=True), ForeignKey("contract_clauses.id", ondelete="SET NULL"))
+
+    # Status
+    is_active = Column(Boolean, default=True, index=True)
+
+    # Metadata
+    created_by = Column(UUID(as_uuid=True), ForeignKey("hr_employees.id", ondelete="SET NULL"))
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+    deleted_at = Column(DateTime(timezone=True))
@@ -27,6 +27,11 @@ class Conversation(Base):
     full_transcript = Column(Text)
     summary = Column(Text)
 
+    # Set once messages and transcript have moved to a compressed blob
+    archive_key = Column(String(500))
+    archived_at = Column(DateTime(timezone=True))
+    archived_message_count = Column(Integer)
+
     # Quality Metrics
     sentiment_score = Column(Numeric(3, 2))
     engagement_score = Column(Numeric(3, 2))
@@ -39,7 +44,7 @@ class Conversation(Base):
 
     # Timestamps
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
-    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), index=True)
 
     # Relationships
     new_hire = relationship("NewHire", back_populates="conversations")
@@ -8,6 +8,8 @@ from app.db.base_class import Base
 
 class ConversationMessage(Base):
     __tablename__ = "conversation_messages"
+    # Monthly range partitions on created_at, maintained by app.services.partitions
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     conversation_id = Column(UUID(as_uuid=True), ForeignKey("conversations.id", ondelete="CASCADE"), index=True)
@@ -31,7 +33,8 @@ class ConversationMessage(Base):
     # Sequence
     sequence_number = Column(Integer, nullable=False)
 
-    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    # Part of the primary key because Postgres requires the partition key in it
+    created_at = Column(DateTime(timezone=True), primary_key=True, default=lambda: datetime.now(timezone.utc))
 
     # Relationships
     conversation = relationship("Conversation", back_populates="messages")
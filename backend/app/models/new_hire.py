@@ -33,6 +33,7 @@ class NewHire(Base):
 
     # Status Tracking
     status = Column(String(50), default="draft", index=True)
+    status_changed_at = Column(DateTime(timezone=True))
 
     # Progress Tracking
     voice_session_completed = Column(Boolean, default=False)
@@ -52,7 +53,7 @@ class NewHire(Base):
 
     # Timestamps
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
-    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), index=True)
     deleted_at = Column(DateTime(timezone=True))
 
     # Relationships
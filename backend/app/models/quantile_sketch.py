@@ -0,0 +1,25 @@
+import uuid
+from datetime import datetime, timezone
+from sqlalchemy import Column, String, Integer, Float, DateTime, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from app.db.base_class import Base
+
+
+class QuantileSketch(Base):
+    __tablename__ = "quantile_sketches"
+    __table_args__ = (UniqueConstraint("metric", "dimension_key", name="uq_quantile_sketches_metric_key"),)
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+
+    # What is summarised, e.g. "salary" per position/country/currency
+    metric = Column(String(50), nullable=False, index=True)
+    dimension_key = Column(String(500), nullable=False)
+    dimensions = Column(JSONB, nullable=False, default={})
+
+    # Sketch state: bin index -> count, see app.services.quantile_sketches
+    relative_accuracy = Column(Float, nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+    zero_count = Column(Integer, nullable=False, default=0)
+    bins = Column(JSONB, nullable=False, default={})
+
+    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
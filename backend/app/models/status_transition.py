@@ -0,0 +1,31 @@
+import uuid
+from datetime import datetime, timezone
+from sqlalchemy import Column, String, Float, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+from app.db.base_class import Base
+
+
+class NewHireStatusTransition(Base):
+    """Append-only log of new hire status changes, written in the same transaction as the change."""
+
+    __tablename__ = "new_hire_status_transitions"
+    __table_args__ = (
+        Index("ix_status_transitions_to_status_at", "to_status", "at"),
+        Index("ix_status_transitions_from_status_at", "from_status", "at"),
+        Index("ix_status_transitions_new_hire_at", "new_hire_id", "at"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    new_hire_id = Column(UUID(as_uuid=True), ForeignKey("new_hires.id", ondelete="CASCADE"), nullable=False)
+
+    # NULL from_status marks the new hire's creation
+    from_status = Column(String(50))
+    to_status = Column(String(50), nullable=False)
+    at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+
+    # Precomputed durations, in seconds
+    seconds_in_previous_status = Column(Float)
+    seconds_since_created = Column(Float)
+
+    new_hire = relationship("NewHire")
@@ -0,0 +1,25 @@
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from app.db.base_class import Base
+
+
+class ConversationTranscriptChunk(Base):
+    """A run of consecutive turns of one conversation, stored as a JSONB array.
+
+    Used instead of conversation_messages when TRANSCRIPT_STORAGE is "chunks";
+    see app.services.transcript_store.
+    """
+
+    __tablename__ = "conversation_transcript_chunks"
+
+    conversation_id = Column(UUID(as_uuid=True), ForeignKey("conversations.id", ondelete="CASCADE"), primary_key=True)
+    chunk_index = Column(Integer, primary_key=True)
+
+    # Turns in sequence order, each shaped like a serialised ConversationMessage
+    first_sequence = Column(Integer, nullable=False)
+    turn_count = Column(Integer, nullable=False, default=0)
+    turns = Column(JSONB, nullable=False, default=list)
+
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
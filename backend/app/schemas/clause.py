@@ -0,0 +1,50 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+
+class ClauseCreate(BaseModel):
+    clause_key: str
+    title: str
+    country: str
+    language: str = "en"
+    contract_types: Optional[list[str]] = None
+    position: int = 0
+    numbered: bool = True
+    body_template: str
+    variables: list = []
+    generation_prompt: Optional[str] = None
+    # Set to publish this clause as a new version superseding the parent
+    parent_clause_id: Optional[str] = None
+
+
+class ClauseUpdate(BaseModel):
+    title: Optional[str] = None
+    contract_types: Optional[list[str]] = None
+    position: Optional[int] = None
+    numbered: Optional[bool] = None
+    body_template: Optional[str] = None
+    variables: Optional[list] = None
+    generation_prompt: Optional[str] = None
+    is_active: Optional[bool] = None
+
+
+class ClauseResponse(BaseModel):
+    id: str
+    clause_key: str
+    title: str
+    country: str
+    language: str
+    contract_types: Optional[list[str]] = None
+    position: int = 0
+    numbered: bool = True
+    body_template: str
+    variables: list = []
+    generation_prompt: Optional[str] = None
+    version: int = 1
+    is_active: bool = True
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import Optional, List
 from datetime import datetime
 
 
@@ -14,6 +14,23 @@ class GenerateContractRequest(BaseModel):
     new_hire_updates: Optional[dict] = None  # Can include salary, position, etc.
 
 
+class BatchGenerateContractsRequest(BaseModel):
+    new_hire_ids: List[str] = Field(..., min_length=1)
+    contract_type: str
+    template_id: Optional[str] = None
+    generation_prompt: Optional[str] = None
+    custom_variables: Optional[dict] = None
+
+
+class GenerateDocumentPackRequest(BaseModel):
+    new_hire_id: str
+    contract_types: List[str] = Field(..., min_length=1)
+    # Optional template per contract type, e.g. {"nda": "<template id>"}
+    template_ids: Optional[dict[str, str]] = None
+    generation_prompt: Optional[str] = None
+    custom_variables: Optional[dict] = None
+
+
 class ContractResponse(BaseModel):
     id: str
     contract_type: str
@@ -22,6 +39,10 @@ class ContractResponse(BaseModel):
     s3_url: Optional[str] = None
     version: int = 1
     generation_tokens: Optional[int] = None
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    generation_latency_ms: Optional[int] = None
+    generation_ttft_ms: Optional[int] = None
     ai_model: Optional[str] = None
     created_at: datetime
     updated_at: datetime
@@ -38,6 +59,9 @@ class ContractUpdate(BaseModel):
 class RegenerateContractRequest(BaseModel):
     generation_prompt: Optional[str] = None
     custom_variables: Optional[dict] = None
+    # Only regenerate the clauses affected by changed data, reusing the rest
+    incremental: Optional[bool] = False
+    new_hire_updates: Optional[dict] = None
 
 
 class ContractListItem(BaseModel):
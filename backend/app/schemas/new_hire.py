@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from typing import Optional, List
 from datetime import date, datetime
 from decimal import Decimal
@@ -162,6 +162,10 @@ class AIParseNewHireRequest(BaseModel):
     description: str
 
 
+class AIParseNewHireBatchRequest(BaseModel):
+    descriptions: List[str] = Field(..., min_length=1)
+
+
 class AIParseNewHireResponse(BaseModel):
     full_name: Optional[str] = None
     email: Optional[str] = None
@@ -178,3 +182,5 @@ class AIParseNewHireResponse(BaseModel):
     work_location: Optional[str] = None
     benefits: Optional[List[dict]] = None
     notes: Optional[str] = None
+    # Per-field confidence between 0 and 1
+    confidence: Optional[dict] = None
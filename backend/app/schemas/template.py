@@ -13,6 +13,8 @@ class TemplateCreate(BaseModel):
     variables: list = []
     tags: Optional[list[str]] = None
     requires_legal_review: bool = True
+    # Set to publish this template as a new version superseding the parent
+    parent_template_id: Optional[str] = None
 
 
 class TemplateUpdate(BaseModel):
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+from datetime import date
+from typing import Iterable, Optional
+
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.serialization import jsonable
+from app.models.new_hire import NewHire
+from app.models.question import Question
+from app.services.status_history import completions
+
+
+class AnalyticsQueryError(ValueError):
+    pass
+
+
+_question_counts = (
+    select(Question.new_hire_id, func.count(Question.id).label("questions"))
+    .where(Question.deleted_at == None)
+    .group_by(Question.new_hire_id)
+    .subquery("question_counts")
+)
+
+METRICS = {
+    "count": func.count(NewHire.id),
+    "completed": func.count(NewHire.id).filter(NewHire.status == "completed"),
+    "offer_acceptance_rate": 100.0 * func.avg(case((NewHire.offer_accepted == True, 1.0), else_=0.0)),
+    "median_salary": func.percentile_cont(0.5).within_group(NewHire.salary),
+    "average_salary": func.avg(NewHire.salary),
+    "median_hours_to_complete": func.percentile_cont(0.5).within_group(completions.c.hours),
+    "question_volume": func.coalesce(func.sum(_question_counts.c.questions), 0),
+}
+# Metrics that need the per-hire question counts joined in.
+QUESTION_METRICS = {"question_volume"}
+# Metrics that need each hire's first completion joined in.
+COMPLETION_METRICS = {"median_hours_to_complete"}
+# Amounts in different currencies can't be aggregated together; these are always grouped by currency.
+CURRENCY_METRICS = {"median_salary", "average_salary"}
+
+DIMENSIONS = {
+    "department": NewHire.department,
+    "country": NewHire.country,
+    "status": NewHire.status,
+    "language": NewHire.preferred_language,
+    "employment_type": NewHire.employment_type,
+    "currency": NewHire.currency,
+    "week": func.date(func.date_trunc("week", NewHire.created_at)),
+}
+
+
+def _names(values: Iterable[str]) -> list[str]:
+    # Accept both repeated parameters and comma-separated lists.
+    return sorted({v.strip() for value in values for v in value.split(",") if v.strip()})
+
+
+def normalize_query(
+    metrics: Iterable[str],
+    group_by: Iterable[str] = (),
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+) -> tuple:
+    metric_names = _names(metrics)
+    dimension_names = _names(group_by)
+    if CURRENCY_METRICS.intersection(metric_names) and "currency" not in dimension_names:
+        dimension_names = sorted([*dimension_names, "currency"])
+    if not metric_names:
+        raise AnalyticsQueryError("At least one metric is required")
+    unknown = [m for m in metric_names if m not in METRICS]
+    if unknown:
+        raise AnalyticsQueryError(f"Unknown metrics: {', '.join(unknown)}; choose from {', '.join(METRICS)}")
+    unknown = [d for d in dimension_names if d not in DIMENSIONS]
+    if unknown:
+        raise AnalyticsQueryError(
+            f"Unknown dimensions: {', '.join(unknown)}; choose from {', '.join(DIMENSIONS)}"
+        )
+    for value in (start_date, end_date):
+        if value:
+            try:
+                date.fromisoformat(value)
+            except ValueError:
+                raise AnalyticsQueryError(f"Invalid date {value!r}; expected YYYY-MM-DD")
+    return tuple(metric_names), tuple(dimension_names), start_date or None, end_date or None
+
+
+def build_statement(metrics: tuple, dimensions: tuple, start_date: Optional[str], end_date: Optional[str]):
+    """One GROUP BY over new_hires computing every requested metric."""
+    dimension_columns = [DIMENSIONS[d].label(d) for d in dimensions]
+    statement = select(*dimension_columns, *(METRICS[m].label(m) for m in metrics)).select_from(NewHire)
+    if QUESTION_METRICS.intersection(metrics):
+        statement = statement.outerjoin(_question_counts, _question_counts.c.new_hire_id == NewHire.id)
+    if COMPLETION_METRICS.intersection(metrics):
+        statement = statement.outerjoin(completions, completions.c.new_hire_id == NewHire.id)
+    statement = statement.where(NewHire.deleted_at == None)
+    if start_date:
+        statement = statement.where(NewHire.created_at >= start_date)
+    if end_date:
+        statement = statement.where(NewHire.created_at < func.date(end_date) + 1)
+    if dimension_columns:
+        statement = statement.group_by(*dimension_columns).order_by(*dimension_columns)
+    return statement
+
+
+# Query results keyed by normalized query
+_cache: LRUCache[tuple, list] = LRUCache(
+    settings.ANALYTICS_QUERY_CACHE_SIZE, settings.ANALYTICS_QUERY_CACHE_TTL_SECONDS,
+)
+
+
+def run_query(
+    db: Session,
+    metrics: Iterable[str],
+    group_by: Iterable[str] = (),
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+) -> dict:
+    key = normalize_query(metrics, group_by, start_date, end_date)
+    rows = _cache.get(key)
+    cached = rows is not None
+    if rows is None:
+        result = db.execute(build_statement(*key))
+        columns = list(result.keys())
+        rows = [{c: jsonable(v, decimals=2) for c, v in zip(columns, row)} for row in result]
+        _cache.put(key, rows)
+    metric_names, dimension_names, start, end = key
+    return {
+        "metrics": list(metric_names),
+        "group_by": list(dimension_names),
+        "start_date": start,
+        "end_date": end,
+        "rows": rows,
+        "cached": cached,
+    }
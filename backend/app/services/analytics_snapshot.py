@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import io
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import Boolean, Date, DateTime, Integer, Numeric, func, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.contract import Contract
+from app.models.conversation import Conversation
+from app.models.new_hire import NewHire
+from app.models.question import Question
+from app.services.blob_store import BlobNotFoundError, get_blob_store
+
+
+SNAPSHOT_MODELS = {
+    "new_hires": NewHire,
+    "questions": Question,
+    "conversations": Conversation,
+    "contracts": Contract,
+}
+
+# Document bodies, transcripts and access tokens stay in the OLTP database.
+EXCLUDED_COLUMNS = {
+    "new_hires": {"session_id", "meta_data"},
+    "questions": {"meta_data"},
+    "conversations": {"session_id", "full_transcript", "conversation_metadata"},
+    "contracts": {"content", "generation_prompt", "signature_url", "signature_ip", "variables", "meta_data"},
+}
+
+
+def _arrow_type(column):
+    import pyarrow as pa
+
+    column_type = column.type
+    if isinstance(column_type, DateTime):
+        return pa.timestamp("us", tz="UTC")
+    if isinstance(column_type, Date):
+        return pa.date32()
+    if isinstance(column_type, Boolean):
+        return pa.bool_()
+    if isinstance(column_type, Integer):
+        return pa.int64()
+    if isinstance(column_type, Numeric):
+        if column_type.precision:
+            return pa.decimal128(column_type.precision, column_type.scale or 0)
+        return pa.float64()
+    if isinstance(column_type, ARRAY):
+        return pa.list_(pa.string())
+    return pa.string()
+
+
+def _arrow_value(value):
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, dict):
+        return json.dumps(value, ensure_ascii=False, default=str)
+    return value
+
+
+def changed_at_expression(model):
+    """When a row last changed; indexed as ix_{table}_changed_at (see main.ADDED_INDEXES)."""
+    return func.coalesce(model.updated_at, model.created_at)
+
+
+def snapshot_columns(table: str) -> list:
+    model = SNAPSHOT_MODELS[table]
+    return [c for c in model.__table__.columns if c.name not in EXCLUDED_COLUMNS[table]]
+
+
+class SnapshotWriter:
+    """Writes changed rows of the OLTP tables to Parquet for BI tools.
+
+    Each run exports rows changed after the table's watermark into
+    ``{prefix}/{table}/updated_date=YYYY-MM-DD/{run}-{n}.parquet``. A row's change
+    time is ``updated_at``, or ``created_at`` for rows never stamped with one. Files
+    only ever add rows, so a row appears once per change; readers keep the latest
+    ``updated_at`` per ``id``, and ``deleted_at`` marks soft deletes.
+    """
+
+    def __init__(self, db: Session, prefix: Optional[str] = None):
+        self.db = db
+        self.store = get_blob_store()
+        self.prefix = (prefix or settings.SNAPSHOT_PREFIX).strip("/")
+        self.run_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+
+    @property
+    def _watermark_key(self) -> str:
+        return f"{self.prefix}/_watermarks.json"
+
+    def load_watermarks(self) -> dict[str, str]:
+        try:
+            return json.loads(self.store.get(self._watermark_key))
+        except BlobNotFoundError:
+            return {}
+
+    def _save_watermarks(self, watermarks: dict[str, str]) -> None:
+        self.store.put(self._watermark_key, json.dumps(watermarks, indent=2).encode(), "application/json")
+
+    def _write_file(self, table: str, partition: str, part: int, schema, rows: list[list]) -> str:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        arrays = [pa.array([r[i] for r in rows], type=field.type) for i, field in enumerate(schema)]
+        buffer = io.BytesIO()
+        pq.write_table(pa.Table.from_arrays(arrays, schema=schema), buffer, compression="zstd")
+        key = f"{self.prefix}/{table}/updated_date={partition}/{self.run_id}-{part:04d}.parquet"
+        self.store.put(key, buffer.getvalue(), "application/vnd.apache.parquet")
+        return key
+
+    def export_table(self, table: str, since: Optional[datetime], until: datetime) -> dict:
+        import pyarrow as pa
+
+        model = SNAPSHOT_MODELS[table]
+        columns = snapshot_columns(table)
+        schema = pa.schema([pa.field(c.name, _arrow_type(c)) for c in columns])
+        changed_at = changed_at_expression(model)
+        statement = select(*columns, changed_at).where(changed_at <= until).order_by(changed_at)
+        if since is not None:
+            statement = statement.where(changed_at > since)
+
+        files: list[str] = []
+        pending: list[list] = []
+        partition = None
+        rows_written = 0
+
+        # Rows arrive in change order, so a partition is complete once the date changes.
+        result = self.db.execute(statement.execution_options(stream_results=True, yield_per=settings.EXPORT_BATCH_SIZE))
+        for *row, row_changed_at in result:
+            values = [_arrow_value(v) for v in row]
+            row_partition = row_changed_at.date().isoformat()
+            if pending and (row_partition != partition or len(pending) >= settings.SNAPSHOT_ROWS_PER_FILE):
+                files.append(self._write_file(table, partition, len(files), schema, pending))
+                pending = []
+            partition = row_partition
+            pending.append(values)
+            rows_written += 1
+        if pending:
+            files.append(self._write_file(table, partition, len(files), schema, pending))
+        return {"rows": rows_written, "files": files}
+
+    def run(self, tables: Optional[list[str]] = None) -> dict:
+        """Export every table changed since its watermark, then advance the watermarks."""
+        # Rows stamped just before the run may not be committed yet; leave them for the next run.
+        until = datetime.now(timezone.utc) - timedelta(seconds=settings.SNAPSHOT_WATERMARK_LAG_SECONDS)
+        tables = tables or list(SNAPSHOT_MODELS)
+        unknown = set(tables) - set(SNAPSHOT_MODELS)
+        if unknown:
+            raise ValueError(f"Unknown snapshot tables: {', '.join(sorted(unknown))}")
+        watermarks = self.load_watermarks()
+        report = {}
+        for table in tables:
+            since = datetime.fromisoformat(watermarks[table]) if table in watermarks else None
+            report[table] = self.export_table(table, since, until)
+            watermarks[table] = until.isoformat()
+            self._save_watermarks(watermarks)
+        return report
+
+
+if __name__ == "__main__":
+    import sys
+
+    import app.db.base  # noqa – register all models
+    from app.db.session import SessionLocal
+
+    session = SessionLocal()
+    try:
+        for name, result in SnapshotWriter(session).run(sys.argv[1:] or None).items():
+            print(f"{name}: {result['rows']} rows in {len(result['files'])} files")
+    finally:
+        session.close()
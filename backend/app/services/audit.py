@@ -0,0 +1,313 @@
+from __future__ import annotations
+
+import ipaddress
+import queue
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import event, inspect, insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.serialization import jsonable
+from app.models.audit_log import AuditLog
+from app.models.benefit import Benefit
+from app.models.contract import Contract
+from app.models.contract_clause import ContractClause
+from app.models.contract_template import ContractTemplate
+from app.models.hr_employee import HREmployee
+from app.models.new_hire import NewHire
+from app.models.question import Question
+
+
+AUDITED_MODELS = (NewHire, Benefit, Contract, ContractTemplate, ContractClause, Question, HREmployee)
+
+# Bookkeeping columns whose changes alone are not worth an entry.
+IGNORED_COLUMNS = {"updated_at", "last_login_at", "status_changed_at"}
+REDACTED_COLUMNS = {"password_hash", "session_id"}
+# Document bodies are versioned elsewhere; the log only notes that they changed.
+OMITTED_COLUMNS = {"content", "content_template", "body_template", "full_transcript"}
+
+
+@dataclass
+class AuditContext:
+    """Who is making the current request; the user is filled in once authenticated."""
+
+    request_id: str
+    ip_address: Optional[str] = None
+    user_agent: Optional[str] = None
+    user_id: Optional[uuid.UUID] = None
+    user_type: Optional[str] = None
+
+
+audit_context: ContextVar[Optional[AuditContext]] = ContextVar("audit_context", default=None)
+
+
+def set_audit_user(user_id, user_type: str) -> None:
+    context = audit_context.get()
+    if context is not None:
+        context.user_id = user_id
+        context.user_type = user_type
+
+
+def _ip_address(value: Optional[str]) -> Optional[str]:
+    try:
+        return str(ipaddress.ip_address((value or "").strip()))
+    except ValueError:
+        return None
+
+
+def _bounded(value: Optional[str], column) -> Optional[str]:
+    limit = column.type.length or settings.AUDIT_MAX_VALUE_LENGTH
+    return value[:limit] if value else value
+
+
+def client_address(peer: Optional[str], forwarded_for: Optional[str], trusted_proxies) -> Optional[str]:
+    """The address that made the request, as far as the trusted proxies in front of us vouch for it.
+
+    X-Forwarded-For is only believed when the direct peer is a trusted proxy; its entries
+    are then walked from the right, past further trusted proxies, to the first one that is
+    not. Anything left of that was written by the client and is ignored.
+    """
+    address = _ip_address(peer)
+    if address is None or not forwarded_for:
+        return address
+
+    def trusted(value: str) -> bool:
+        ip = ipaddress.ip_address(value)
+        return any(ip in network for network in trusted_proxies)
+
+    for hop in reversed(forwarded_for.split(",")):
+        if not trusted(address):
+            break
+        hop_address = _ip_address(hop)
+        if hop_address is None:
+            break
+        address = hop_address
+    return address
+
+
+class AuditContextMiddleware:
+    """Opens an audit context for each mutating request (pure ASGI, so no extra task per request)."""
+
+    def __init__(self, app):
+        self.app = app
+        self.trusted_proxies = settings.trusted_proxy_networks
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in ("GET", "HEAD", "OPTIONS"):
+            await self.app(scope, receive, send)
+            return
+        headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in scope.get("headers", [])}
+        client = scope.get("client")
+        # Headers are client-controlled: keep them within the audit_logs columns so one
+        # request can't make the batch insert fail.
+        context = AuditContext(
+            request_id=_bounded(headers.get("x-request-id"), AuditLog.request_id) or uuid.uuid4().hex,
+            ip_address=client_address(
+                client[0] if client else None, headers.get("x-forwarded-for"), self.trusted_proxies,
+            ),
+            user_agent=_bounded(headers.get("user-agent"), AuditLog.user_agent),
+        )
+        token = audit_context.set(context)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            audit_context.reset(token)
+
+
+def _shown(key: str, value):
+    if key in REDACTED_COLUMNS:
+        return "[redacted]"
+    if key in OMITTED_COLUMNS:
+        return "[omitted]"
+    return value
+
+
+def _created(state) -> dict:
+    # Only values already in memory; reading expired server defaults would cost a query.
+    columns = state.mapper.columns
+    return {
+        key: _shown(key, value)
+        for key, value in state.dict.items()
+        if key in columns and key not in IGNORED_COLUMNS and value is not None
+    }
+
+
+def _updated(state) -> dict:
+    changes = {}
+    for key in state.mapper.columns.keys():
+        if key in IGNORED_COLUMNS:
+            continue
+        history = state.attrs[key].history
+        if not history.added:
+            continue
+        old = history.deleted[0] if history.deleted else None
+        new = history.added[0]
+        if old != new:
+            changes[key] = {"old": _shown(key, old), "new": _shown(key, new)}
+    return changes
+
+
+def record_audit(session: Session, entity_type: str, entity_id, action: str, changes: Optional[dict]) -> None:
+    """Stage an entry for the current request; for writes that bypass the ORM, e.g. Core inserts."""
+    context = audit_context.get()
+    if context is None:
+        return
+    session.info.setdefault("audit_entries", []).append({
+        "entity_type": entity_type,
+        "entity_id": entity_id,
+        "action": action,
+        "user_id": context.user_id,
+        "user_type": context.user_type,
+        "changes": changes,
+        "ip_address": context.ip_address,
+        "user_agent": context.user_agent,
+        "request_id": context.request_id,
+        "created_at": datetime.now(timezone.utc),
+    })
+
+
+@event.listens_for(Session, "after_flush")
+def _capture_changes(session: Session, flush_context) -> None:
+    """Record audited changes on the session; they are queued only if the transaction commits."""
+    context = audit_context.get()
+    if context is None:
+        return
+
+    def add(obj, action: str, changes: Optional[dict]) -> None:
+        record_audit(session, type(obj).__tablename__, obj.id, action, changes)
+
+    for obj in session.new:
+        if isinstance(obj, AUDITED_MODELS):
+            add(obj, "create", _created(inspect(obj)))
+    for obj in session.dirty:
+        if isinstance(obj, AUDITED_MODELS):
+            changes = _updated(inspect(obj))
+            if not changes:
+                continue
+            soft_deleted = "deleted_at" in changes and changes["deleted_at"]["new"] is not None
+            add(obj, "delete" if soft_deleted else "update", changes)
+    for obj in session.deleted:
+        if isinstance(obj, AUDITED_MODELS):
+            add(obj, "delete", None)
+
+
+@event.listens_for(Session, "after_commit")
+def _enqueue_committed(session: Session) -> None:
+    entries = session.info.pop("audit_entries", None)
+    if entries:
+        audit_writer.submit(entries)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session: Session) -> None:
+    session.info.pop("audit_entries", None)
+
+
+class AuditWriter:
+    """Write-behind buffer for audit entries.
+
+    Requests only append to an in-memory queue; a daemon thread drains it every
+    AUDIT_FLUSH_INTERVAL_SECONDS (or once AUDIT_BATCH_SIZE entries are waiting)
+    and writes each batch with a single multi-row INSERT. When the queue is full
+    new entries are dropped and counted rather than slowing requests down.
+    """
+
+    def __init__(self, max_size: int, batch_size: int, flush_interval: float):
+        self._queue: queue.Queue[dict] = queue.Queue(maxsize=max_size)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.written = 0
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+                self._thread.start()
+
+    def submit(self, entries: list[dict]) -> None:
+        self._ensure_started()
+        for entry in entries:
+            try:
+                self._queue.put_nowait(entry)
+            except queue.Full:
+                self.dropped += 1
+
+    def _take_batch(self, timeout: float) -> list[dict]:
+        batch: list[dict] = []
+        deadline = time.monotonic() + timeout
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=max(remaining, 0)) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: list[dict]) -> None:
+        from app.db.session import engine
+
+        rows = [{**entry, "changes": jsonable(entry["changes"], max_length=settings.AUDIT_MAX_VALUE_LENGTH)} for entry in batch]
+        try:
+            with engine.begin() as conn:
+                conn.execute(insert(AuditLog), rows)
+            self.written += len(rows)
+            return
+        except Exception as e:
+            if len(rows) == 1:
+                self.dropped += 1
+                print(f"Audit log write failed, 1 entry lost: {e}")
+                return
+            print(f"Audit log batch write failed, retrying {len(rows)} entries one by one: {e}")
+        # Isolate the offending rows so the rest of the batch is still written.
+        for row in rows:
+            try:
+                with engine.begin() as conn:
+                    conn.execute(insert(AuditLog), [row])
+                self.written += 1
+            except Exception as e:
+                self.dropped += 1
+                print(f"Audit log write failed for request {row.get('request_id')}: {e}")
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            batch = self._take_batch(self.flush_interval)
+            if batch:
+                self._write(batch)
+        self.flush()
+
+    def flush(self) -> None:
+        """Write everything queued so far from the calling thread."""
+        while True:
+            batch = self._take_batch(0)
+            if not batch:
+                return
+            self._write(batch)
+
+    def stop(self) -> None:
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join(timeout=10)
+        self.flush()
+
+
+audit_writer = AuditWriter(
+    settings.AUDIT_QUEUE_SIZE,
+    settings.AUDIT_BATCH_SIZE,
+    settings.AUDIT_FLUSH_INTERVAL_SECONDS,
+)
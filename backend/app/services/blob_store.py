@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import BinaryIO, Iterator
+
+from app.core.config import settings
+
+
+class BlobNotFoundError(KeyError):
+    pass
+
+
+class BlobStoreNotDurableError(RuntimeError):
+    pass
+
+
+class BlobStore:
+    """Minimal object-store interface; keys are slash-separated paths."""
+
+    bucket: str = ""
+    # Whether objects survive a redeploy; data whose only copy would be a blob is
+    # kept in Postgres otherwise.
+    durable: bool = False
+
+    def put(self, key: str, data: bytes, content_type: str = "application/octet-stream") -> None:
+        raise NotImplementedError
+
+    def put_file(self, key: str, fileobj: BinaryIO, content_type: str = "application/octet-stream") -> None:
+        """Store the rest of an open file without reading it into memory."""
+        raise NotImplementedError
+
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def size(self, key: str) -> int:
+        raise NotImplementedError
+
+    def get(self, key: str) -> bytes:
+        raise NotImplementedError
+
+    def iter_range(self, key: str, start: int, end: int, chunk_size: int) -> Iterator[bytes]:
+        """Yield bytes start..end (inclusive) of the object in chunks."""
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def url(self, key: str) -> str:
+        raise NotImplementedError
+
+
+class LocalBlobStore(BlobStore):
+    """Filesystem stand-in for S3, used in development and tests."""
+
+    def __init__(self, root: str, durable: bool = False):
+        self.root = Path(root)
+        self.bucket = "local"
+        self.durable = durable
+
+    def _path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if self.root.resolve() not in path.parents:
+            raise ValueError(f"Invalid blob key: {key}")
+        return path
+
+    def put(self, key: str, data: bytes, content_type: str = "application/octet-stream") -> None:
+        self._write(key, lambda f: f.write(data))
+
+    def put_file(self, key: str, fileobj: BinaryIO, content_type: str = "application/octet-stream") -> None:
+        self._write(key, lambda f: shutil.copyfileobj(fileobj, f))
+
+    def _write(self, key: str, write) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def exists(self, key: str) -> bool:
+        return self._path(key).is_file()
+
+    def size(self, key: str) -> int:
+        try:
+            return self._path(key).stat().st_size
+        except FileNotFoundError as e:
+            raise BlobNotFoundError(key) from e
+
+    def get(self, key: str) -> bytes:
+        try:
+            return self._path(key).read_bytes()
+        except FileNotFoundError as e:
+            raise BlobNotFoundError(key) from e
+
+    def iter_range(self, key: str, start: int, end: int, chunk_size: int) -> Iterator[bytes]:
+        try:
+            f = open(self._path(key), "rb")
+        except FileNotFoundError as e:
+            raise BlobNotFoundError(key) from e
+        with f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = f.read(min(chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    def delete(self, key: str) -> None:
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+    def url(self, key: str) -> str:
+        return self._path(key).as_uri()
+
+
+class S3BlobStore(BlobStore):
+    """S3 API store; set S3_ENDPOINT_URL to point it at MinIO."""
+
+    durable = True
+
+    def __init__(self, bucket: str, endpoint_url: str | None = None):
+        import boto3
+
+        self.bucket = bucket
+        self.endpoint_url = endpoint_url
+        self.client = boto3.client(
+            "s3",
+            region_name=settings.AWS_REGION,
+            endpoint_url=endpoint_url,
+            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+        )
+
+    def _is_not_found(self, exc: Exception) -> bool:
+        code = getattr(exc, "response", {}).get("Error", {}).get("Code")
+        return code in ("404", "NoSuchKey", "NotFound")
+
+    def put(self, key: str, data: bytes, content_type: str = "application/octet-stream") -> None:
+        self.client.put_object(Bucket=self.bucket, Key=key, Body=data, ContentType=content_type)
+
+    def put_file(self, key: str, fileobj: BinaryIO, content_type: str = "application/octet-stream") -> None:
+        # Multipart upload in parts, so large files are never held in memory at once.
+        self.client.upload_fileobj(fileobj, self.bucket, key, ExtraArgs={"ContentType": content_type})
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+            return True
+        except Exception as e:
+            if self._is_not_found(e):
+                return False
+            raise
+
+    def size(self, key: str) -> int:
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=key)["ContentLength"]
+        except Exception as e:
+            if self._is_not_found(e):
+                raise BlobNotFoundError(key) from e
+            raise
+
+    def get(self, key: str) -> bytes:
+        try:
+            return self.client.get_object(Bucket=self.bucket, Key=key)["Body"].read()
+        except Exception as e:
+            if self._is_not_found(e):
+                raise BlobNotFoundError(key) from e
+            raise
+
+    def iter_range(self, key: str, start: int, end: int, chunk_size: int) -> Iterator[bytes]:
+        try:
+            body = self.client.get_object(
+                Bucket=self.bucket, Key=key, Range=f"bytes={start}-{end}",
+            )["Body"]
+        except Exception as e:
+            if self._is_not_found(e):
+                raise BlobNotFoundError(key) from e
+            raise
+        try:
+            yield from body.iter_chunks(chunk_size)
+        finally:
+            body.close()
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+    def url(self, key: str) -> str:
+        if self.endpoint_url:
+            return f"{self.endpoint_url.rstrip('/')}/{self.bucket}/{key}"
+        return f"https://{self.bucket}.s3.{settings.AWS_REGION}.amazonaws.com/{key}"
+
+
+_store: BlobStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_blob_store() -> BlobStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            if settings.BLOB_STORE_BACKEND == "s3":
+                _store = S3BlobStore(settings.S3_BUCKET_NAME, settings.S3_ENDPOINT_URL)
+            else:
+                _store = LocalBlobStore(settings.BLOB_STORE_LOCAL_DIR, settings.BLOB_STORE_LOCAL_DURABLE)
+        return _store
+
+
+def ensure_durable(store: BlobStore, purpose: str) -> None:
+    if not store.durable:
+        raise BlobStoreNotDurableError(
+            f"Refusing to {purpose}: the blob store does not survive redeploys. Use BLOB_STORE_BACKEND=s3, "
+            "or set BLOB_STORE_LOCAL_DURABLE=true once BLOB_STORE_LOCAL_DIR is on a persistent volume."
+        )
+
+
+def sha256_hex(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def content_addressed_key(namespace: str, digest: str, suffix: str = "") -> str:
+    return f"{namespace}/{digest[:2]}/{digest}{suffix}"
+
+
+def put_content_addressed(
+    namespace: str,
+    data: bytes,
+    suffix: str = "",
+    content_type: str = "application/octet-stream",
+) -> tuple[str, str]:
+    """Store data under its SHA-256 and return (key, digest); identical data is written once."""
+    store = get_blob_store()
+    digest = sha256_hex(data)
+    key = content_addressed_key(namespace, digest, suffix)
+    if not store.exists(key):
+        store.put(key, data, content_type)
+    return key, digest
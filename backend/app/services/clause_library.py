@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.contract_clause import ContractClause
+from app.services.llm_provider import Completion, LLMProvider
+from app.services.prompt_builder import compact_json
+from app.services.template_renderer import render_source
+
+
+FALLBACK_LANGUAGE = "en"
+CLAUSE_LIBRARY_MODEL = "clause_library"
+
+CLAUSE_GENERATION_PROMPT = """Adapt the "{title}" clause of a {contract_type} document for {country}.
+
+INSTRUCTIONS:
+{instructions}
+
+STANDARD WORDING:
+{body}
+
+CONTEXT:
+{context}
+
+Return only the clause body, without its heading."""
+
+
+@dataclass(frozen=True)
+class ClauseFragment:
+    """Detached copy of a library clause, safe to use after its session is closed."""
+
+    id: str
+    clause_key: str
+    title: str
+    contract_types: Optional[tuple[str, ...]]
+    position: int
+    numbered: bool
+    body_template: str
+    variables: list
+    generation_prompt: Optional[str]
+    version: int
+
+    def applies_to(self, contract_type: str) -> bool:
+        return self.contract_types is None or contract_type in self.contract_types
+
+
+def _key(country: str, language: str) -> tuple[str, str]:
+    return (country or "").strip().lower(), (language or "").strip().lower()
+
+
+class ClauseLibrary:
+    """In-memory copy of the preferred active clauses per (country, language).
+
+    Clause versions supersede each other through parent_clause_id, like templates;
+    for each clause_key the highest remaining version wins. The library is loaded
+    with its own session so documents can be assembled without one, and is reloaded
+    after invalidate() or once TEMPLATE_INDEX_TTL_SECONDS have passed.
+    """
+
+    def __init__(self):
+        self._clauses: Optional[dict[tuple[str, str], list[ClauseFragment]]] = None
+        self._built_at = 0.0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._clauses = None
+            self._generation += 1
+
+    def _build(self, db: Session) -> dict[tuple[str, str], list[ClauseFragment]]:
+        rows = db.query(ContractClause).filter(
+            ContractClause.is_active == True,
+            ContractClause.deleted_at == None,
+        ).all()
+
+        superseded = {r.parent_clause_id for r in rows if r.parent_clause_id}
+        best: dict[tuple[str, str, str], tuple] = {}
+        for r in rows:
+            if r.id in superseded:
+                continue
+            key = (*_key(r.country, r.language), r.clause_key)
+            rank = (r.version or 1, r.created_at.timestamp() if r.created_at else 0.0)
+            if key not in best or rank > best[key][0]:
+                best[key] = (rank, r)
+
+        library: dict[tuple[str, str], list[ClauseFragment]] = {}
+        for (country, language, _), (_, r) in best.items():
+            library.setdefault((country, language), []).append(ClauseFragment(
+                id=str(r.id),
+                clause_key=r.clause_key,
+                title=r.title,
+                contract_types=tuple(r.contract_types) if r.contract_types else None,
+                position=r.position or 0,
+                numbered=r.numbered is not False,
+                body_template=r.body_template,
+                variables=list(r.variables or []),
+                generation_prompt=r.generation_prompt,
+                version=r.version or 1,
+            ))
+        for fragments in library.values():
+            fragments.sort(key=lambda f: (f.position, f.clause_key))
+        return library
+
+    def _snapshot(self) -> dict[tuple[str, str], list[ClauseFragment]]:
+        from app.db.session import SessionLocal
+
+        with self._lock:
+            if self._clauses is not None and time.monotonic() - self._built_at < settings.TEMPLATE_INDEX_TTL_SECONDS:
+                return self._clauses
+            generation = self._generation
+        db = SessionLocal()
+        try:
+            library = self._build(db)
+        finally:
+            db.close()
+        with self._lock:
+            if generation == self._generation:
+                self._clauses, self._built_at = library, time.monotonic()
+        return library
+
+    def clauses_for(self, contract_type: str, country: str, language: str) -> list[ClauseFragment]:
+        """Ordered clauses for a document, falling back to English when the language has none."""
+        library = self._snapshot()
+        fragments = library.get(_key(country, language)) or library.get(_key(country, FALLBACK_LANGUAGE)) or []
+        return [f for f in fragments if f.applies_to(contract_type)]
+
+    async def assemble(
+        self,
+        contract_type: str,
+        context: dict,
+        custom_vars: dict,
+        llm: Optional[LLMProvider] = None,
+    ) -> Optional[tuple[str, list[Completion]]]:
+        """Build a document from library clauses, or None when the jurisdiction has none.
+
+        Returns the document with the model calls made for it.
+
+        Every clause is rendered from its compiled template; only clauses carrying a
+        generation_prompt are passed to the model, concurrently, and only when a
+        provider is available.
+        """
+        employment = context.get("employment", {})
+        country = employment.get("country") or ""
+        language = context.get("employee", {}).get("language") or FALLBACK_LANGUAGE
+        fragments = await asyncio.to_thread(self.clauses_for, contract_type, country, language)
+        if not any(f.numbered for f in fragments):
+            return None
+
+        bodies = [
+            render_source((f"clause:{f.id}", f.version), f.body_template, f.variables, context, custom_vars)
+            for f in fragments
+        ]
+        completions: list[Completion] = []
+        if llm is not None:
+            adapt = [i for i, f in enumerate(fragments) if f.generation_prompt]
+            completions = list(await asyncio.gather(*(
+                _adapt_clause(llm, fragments[i], bodies[i], context, contract_type, country)
+                for i in adapt
+            )))
+            for i, completion in zip(adapt, completions):
+                bodies[i] = completion.text or bodies[i]
+
+        parts = []
+        number = 0
+        for fragment, body in zip(fragments, bodies):
+            body = body.strip("\n")
+            if fragment.numbered:
+                number += 1
+                parts.append(f"{number}. {fragment.title.upper()}\n{body}")
+            else:
+                parts.append(body)
+        return "\n\n".join(parts) + "\n", completions
+
+
+async def _adapt_clause(
+    llm: LLMProvider,
+    fragment: ClauseFragment,
+    body: str,
+    context: dict,
+    contract_type: str,
+    country: str,
+) -> Completion:
+    return await llm.complete(
+        [{
+            "role": "user",
+            "content": CLAUSE_GENERATION_PROMPT.format(
+                title=fragment.title,
+                contract_type=contract_type,
+                country=country,
+                instructions=fragment.generation_prompt,
+                body=body,
+                context=compact_json(context),
+            ),
+        }],
+        temperature=0.2,
+        max_tokens=1024,
+    )
+
+
+clause_library = ClauseLibrary()
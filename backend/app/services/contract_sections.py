@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import difflib
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+
+CLAUSE_HEADING = re.compile(r"^\s*(\d+)\.\s+([A-Z][A-Z0-9 &,'/()-]*[A-Z)])\s*$")
+SIGNATURE_HEADING = re.compile(r"^\s*[A-Z][A-Z ]*SIGNATURE:?\s*$")
+
+PREAMBLE = "PREAMBLE"
+SIGNATURES = "SIGNATURES"
+
+
+@dataclass
+class Clause:
+    title: str
+    text: str
+    number: Optional[str] = None
+
+    @property
+    def key(self) -> str:
+        return self.title.strip().upper()
+
+
+def split_clauses(content: str) -> list[Clause]:
+    """Split a contract into its preamble, numbered clauses and signature block.
+
+    Joining the ``text`` of the returned clauses reproduces ``content`` exactly.
+    """
+    clauses: list[Clause] = [Clause(title=PREAMBLE, text="")]
+    for line in content.splitlines(keepends=True):
+        heading = CLAUSE_HEADING.match(line)
+        if heading and clauses[-1].title != SIGNATURES:
+            clauses.append(Clause(title=heading.group(2), text=line, number=heading.group(1)))
+        elif SIGNATURE_HEADING.match(line) and clauses[-1].title != SIGNATURES:
+            clauses.append(Clause(title=SIGNATURES, text=line))
+        else:
+            clauses[-1].text += line
+    if not clauses[0].text:
+        clauses.pop(0)
+    return clauses
+
+
+def join_clauses(clauses: list[Clause]) -> str:
+    return "".join(c.text for c in clauses)
+
+
+def diff_clauses(old_content: str, new_content: str) -> tuple[list[dict], int]:
+    """Return (changed clauses, number of unchanged clauses) between two contract texts."""
+    old = {c.key: c for c in split_clauses(old_content)}
+    new = split_clauses(new_content)
+    new_keys = {c.key for c in new}
+
+    changes = []
+    unchanged = 0
+    for clause in new:
+        before = old.get(clause.key)
+        if before is None:
+            changes.append({"clause": clause.title, "number": clause.number, "change": "added", "text": clause.text})
+        elif before.text == clause.text:
+            unchanged += 1
+        else:
+            changes.append({
+                "clause": clause.title,
+                "number": clause.number,
+                "change": "modified",
+                "diff": list(difflib.unified_diff(
+                    before.text.splitlines(), clause.text.splitlines(), lineterm="", n=1,
+                ))[2:],
+            })
+    for key, clause in old.items():
+        if key not in new_keys:
+            changes.append({"clause": clause.title, "number": clause.number, "change": "removed", "text": clause.text})
+    return changes, unchanged
+
+
+# Context paths each clause is written from, matched on keywords in the clause
+# title so model-written headings ("REMUNERATION") map like template ones.
+CLAUSE_DEPENDENCY_RULES: list[tuple[tuple[str, ...], list[str]]] = [
+    ((PREAMBLE,), ["company", "employee.full_name", "employee.email", "employment.start_date"]),
+    ((SIGNATURES,), ["company.signatory_name", "company.signatory_title", "employee.full_name"]),
+    (("POSITION", "DUTIES", "ROLE"), ["employee.position", "employee.department"]),
+    (("COMMENCEMENT", "PROBATION"), ["employment.start_date", "employment.probation_period_months"]),
+    (("COMPENSATION", "SALARY", "REMUNERATION"), ["employee.salary", "employee.currency"]),
+    (("WORKING HOURS", "WORK LOCATION"), ["employment.work_location", "employment.employment_type"]),
+    (("LEAVE", "VACATION"), ["employment.annual_leave_days"]),
+    (("BENEFIT",), ["benefits"]),
+    (("TERMINATION", "NOTICE"), ["employment.notice_period_days", "employment.country"]),
+    (("GOVERNING LAW", "JURISDICTION"), ["employment.country"]),
+    (("CONFIDENTIALITY", "NON-DISCLOSURE", "INTELLECTUAL PROPERTY"), []),
+]
+
+
+def clause_dependencies(title: str) -> Optional[list[str]]:
+    """Context paths a clause depends on, or None when unknown (treated as depending on everything)."""
+    upper = title.upper()
+    for keywords, paths in CLAUSE_DEPENDENCY_RULES:
+        if any(keyword in upper for keyword in keywords):
+            return paths
+    return None
+
+
+def flatten_context(context: dict, prefix: str = "") -> dict:
+    flat = {}
+    for key, value in context.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten_context(value, f"{path}."))
+        else:
+            flat[path] = value
+    return flat
+
+
+def changed_context_paths(old_context: dict, new_context: dict) -> set[str]:
+    old, new = flatten_context(old_context), flatten_context(new_context)
+    return {path for path in old.keys() | new.keys() if old.get(path) != new.get(path)}
+
+
+def affected_clauses(clauses: list[Clause], changed_paths: set[str]) -> list[Clause]:
+    if not changed_paths:
+        return []
+    affected = []
+    for clause in clauses:
+        deps = clause_dependencies(clause.title)
+        if deps is None or any(
+            changed == dep or changed.startswith(f"{dep}.") for dep in deps for changed in changed_paths
+        ):
+            affected.append(clause)
+    return affected
+
+
+def splice_clauses(clauses: list[Clause], replacements: dict[str, str]) -> str:
+    """Swap in new text for the clauses keyed in ``replacements``, keeping each clause's trailing spacing."""
+    parts = []
+    for clause in clauses:
+        new_text = replacements.get(clause.key)
+        if new_text is None:
+            parts.append(clause.text)
+        else:
+            trailing = clause.text[len(clause.text.rstrip("\n")):]
+            parts.append(new_text.rstrip("\n") + trailing)
+    return "".join(parts)
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import difflib
+import json
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.models.contract import Contract
+from app.services.blob_store import (
+    content_addressed_key, ensure_durable, get_blob_store, put_content_addressed, sha256_hex,
+)
+
+
+CONTENT_NAMESPACE = "contracts/text"
+DELTA_NAMESPACE = "contracts/delta"
+DELTA_FORMAT_VERSION = 1
+
+
+# Decoded contract text; keys are content-addressed, so entries never go stale.
+_text_cache: LRUCache[str, str] = LRUCache(settings.CONTRACT_TEXT_CACHE_SIZE)
+
+
+def make_delta(base: str, target: str) -> list:
+    """Line-level delta: [start, end] copies base lines, a string inserts new text."""
+    base_lines = base.splitlines(keepends=True)
+    target_lines = target.splitlines(keepends=True)
+    ops: list = []
+    matcher = difflib.SequenceMatcher(None, base_lines, target_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append([i1, i2])
+        elif j2 > j1:
+            ops.append("".join(target_lines[j1:j2]))
+    return ops
+
+
+def apply_delta(base: str, ops: list) -> str:
+    base_lines = base.splitlines(keepends=True)
+    return "".join(
+        "".join(base_lines[op[0]:op[1]]) if isinstance(op, list) else op
+        for op in ops
+    )
+
+
+def store_contract_content(
+    contract: Contract,
+    content: Optional[str],
+    parent: Optional[Contract] = None,
+) -> None:
+    """Write contract text to the blob store and keep only its key and hash on the row.
+
+    With a blob store that does not survive redeploys the text stays inline.
+
+    When a parent version is given, the text is stored as a delta against it unless
+    the chain is due a full snapshot (every CONTRACT_SNAPSHOT_INTERVAL versions) or
+    the delta would not save enough space.
+    """
+    if content is None:
+        contract.content = None
+        contract.s3_key = contract.s3_bucket = contract.s3_url = None
+        contract.content_sha256 = None
+        contract.content_size = None
+        contract.delta_depth = 0
+        return
+
+    store = get_blob_store()
+    data = content.encode("utf-8")
+    digest = sha256_hex(data)
+    if not store.durable:
+        # The blob would be the only copy; keep the text on the row instead.
+        contract.content = content
+        contract.s3_key = contract.s3_bucket = contract.s3_url = None
+        contract.content_sha256 = digest
+        contract.content_size = len(data)
+        contract.delta_depth = 0
+        return
+
+    full_key = content_addressed_key(CONTENT_NAMESPACE, digest, ".txt")
+
+    key, depth = full_key, 0
+    parent_depth = (parent.delta_depth or 0) if parent is not None else 0
+    if (
+        parent is not None
+        and parent.s3_key
+        and parent_depth + 1 < settings.CONTRACT_SNAPSHOT_INTERVAL
+        and not store.exists(full_key)
+    ):
+        base = load_contract_content(parent)
+        payload = json.dumps({
+            "format": DELTA_FORMAT_VERSION,
+            "base_key": parent.s3_key,
+            "sha256": digest,
+            "ops": make_delta(base, content),
+        }, separators=(",", ":")).encode("utf-8")
+        if len(payload) <= len(data) * settings.CONTRACT_DELTA_MAX_RATIO:
+            key, _ = put_content_addressed(DELTA_NAMESPACE, payload, ".json", "application/json")
+            depth = parent_depth + 1
+
+    if key == full_key:
+        put_content_addressed(CONTENT_NAMESPACE, data, ".txt", "text/plain; charset=utf-8")
+    _text_cache.put(key, content)
+
+    contract.content = None
+    contract.s3_bucket = store.bucket
+    contract.s3_key = key
+    contract.s3_url = store.url(key)
+    contract.content_sha256 = digest
+    contract.content_size = len(data)
+    contract.delta_depth = depth
+
+
+def _load_blob_text(key: str) -> str:
+    cached = _text_cache.get(key)
+    if cached is not None:
+        return cached
+
+    raw = get_blob_store().get(key)
+    if key.startswith(DELTA_NAMESPACE + "/"):
+        delta = json.loads(raw)
+        content = apply_delta(_load_blob_text(delta["base_key"]), delta["ops"])
+    else:
+        content = raw.decode("utf-8")
+    _text_cache.put(key, content)
+    return content
+
+
+def load_contract_content(contract: Contract) -> Optional[str]:
+    if not contract.s3_key:
+        # Rows written before content moved to the blob store.
+        return contract.content
+    return _load_blob_text(contract.s3_key)
+
+
+def migrate_inline_content(db: Session, batch_size: int = 200) -> int:
+    """Move content still held in the contracts.content column into the blob store."""
+    ensure_durable(get_blob_store(), "move contract text out of Postgres")
+    moved = 0
+    while True:
+        contracts = db.query(Contract).filter(
+            Contract.content != None, Contract.s3_key == None
+        ).limit(batch_size).all()
+        if not contracts:
+            return moved
+        for contract in contracts:
+            store_contract_content(contract, contract.content)
+        db.commit()
+        moved += len(contracts)
+
+
+if __name__ == "__main__":
+    import app.db.base  # noqa – register all models
+    from app.db.session import SessionLocal
+
+    session = SessionLocal()
+    try:
+        print(f"Moved {migrate_inline_content(session)} contracts to the blob store.")
+    finally:
+        session.close()
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.models.conversation import Conversation
+from app.models.new_hire import NewHire
+from app.services.blob_store import ensure_durable, get_blob_store
+from app.services.transcript_store import get_transcript_store
+
+
+ARCHIVE_NAMESPACE = "conversations/archive"
+ARCHIVE_FORMAT_VERSION = 1
+
+
+class ConversationArchiveError(RuntimeError):
+    pass
+
+
+def _zstd():
+    import zstandard
+
+    return zstandard
+
+
+def archive_key(conversation: Conversation) -> str:
+    return f"{ARCHIVE_NAMESPACE}/{conversation.new_hire_id}/{conversation.id}.json.zst"
+
+
+# Decompressed archives; keys are immutable once written.
+_archive_cache: LRUCache[str, dict] = LRUCache(settings.CONVERSATION_ARCHIVE_CACHE_SIZE)
+
+
+def load_archive(key: str) -> dict:
+    cached = _archive_cache.get(key)
+    if cached is not None:
+        return cached
+    raw = _zstd().ZstdDecompressor().decompress(get_blob_store().get(key))
+    archive = json.loads(raw)
+    _archive_cache.put(key, archive)
+    return archive
+
+
+def get_transcript(db: Session, conversation: Conversation) -> tuple[list[dict], Optional[str]]:
+    """(messages in sequence order, full transcript) from the conversation's archive and the hot tables.
+
+    Turns appended after the conversation was archived stay in the hot tables and
+    follow the archived ones.
+    """
+    messages = get_transcript_store().load(db, conversation)
+    if not conversation.archive_key:
+        return messages, conversation.full_transcript
+    archive = load_archive(conversation.archive_key)
+    return archive["messages"] + messages, conversation.full_transcript or archive.get("full_transcript")
+
+
+def message_count(db: Session, conversation: Conversation) -> int:
+    return (conversation.archived_message_count or 0) + get_transcript_store().count(db, conversation)
+
+
+def archive_conversation(db: Session, conversation: Conversation) -> int:
+    """Move a conversation's messages and transcript to a compressed blob; returns the compressed size.
+
+    The blob is written and read back before the rows are removed, so an
+    interrupted or corrupted write leaves the conversation intact and the next
+    run overwrites the same key. Archiving an archived conversation again folds
+    the turns appended since into its archive. Only durable blob stores are accepted.
+    """
+    store = get_blob_store()
+    ensure_durable(store, "archive conversations")
+    # Hold off appends until the turns read here are deleted and the archive is recorded.
+    get_transcript_store().lock(db, conversation)
+    messages, full_transcript = get_transcript(db, conversation)
+    payload = {
+        "version": ARCHIVE_FORMAT_VERSION,
+        "conversation_id": str(conversation.id),
+        "full_transcript": full_transcript,
+        "messages": messages,
+    }
+    raw = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+    data = _zstd().ZstdCompressor(level=settings.CONVERSATION_ARCHIVE_ZSTD_LEVEL).compress(raw)
+    key = archive_key(conversation)
+    store.put(key, data, "application/zstd")
+    if _zstd().ZstdDecompressor().decompress(store.get(key)) != raw:
+        raise ConversationArchiveError(f"Archive {key} did not read back intact; conversation {conversation.id} kept")
+
+    get_transcript_store().delete(db, conversation)
+    conversation.full_transcript = None
+    conversation.archive_key = key
+    conversation.archived_at = datetime.now(timezone.utc)
+    conversation.archived_message_count = len(messages)
+    db.commit()
+    return len(data)
+
+
+def archive_completed_conversations(db: Session, older_than_days: Optional[int] = None, batch_size: int = 100) -> dict:
+    """Archive conversations of completed new hires that ended more than ``older_than_days`` ago."""
+    ensure_durable(get_blob_store(), "archive conversations")
+    days = settings.CONVERSATION_ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+    archived = 0
+    compressed_bytes = 0
+    failed = []
+    while True:
+        query = (
+            db.query(Conversation)
+            .join(NewHire, NewHire.id == Conversation.new_hire_id)
+            .filter(
+                NewHire.status == "completed",
+                Conversation.archive_key == None,
+                func.coalesce(Conversation.end_time, Conversation.start_time) < cutoff,
+            )
+        )
+        if failed:
+            query = query.filter(Conversation.id.notin_(failed))
+        conversations = query.order_by(Conversation.start_time).limit(batch_size).all()
+        if not conversations:
+            break
+        for conversation in conversations:
+            conversation_id = conversation.id
+            try:
+                compressed_bytes += archive_conversation(db, conversation)
+                archived += 1
+            except Exception as e:
+                # One bad conversation shouldn't hold up the rest; it stays hot until the next run.
+                db.rollback()
+                failed.append(conversation_id)
+                print(f"Failed to archive conversation {conversation_id}: {e}")
+    return {"conversations": archived, "failed": len(failed), "compressed_bytes": compressed_bytes}
+
+
+if __name__ == "__main__":
+    import app.db.base  # noqa – register all models
+    from app.db.session import SessionLocal
+
+    session = SessionLocal()
+    try:
+        result = archive_completed_conversations(session)
+        print(
+            f"Archived {result['conversations']} conversations ({result['compressed_bytes']} bytes compressed), "
+            f"{result['failed']} failed."
+        )
+    finally:
+        session.close()
@@ -0,0 +1,475 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, AsyncIterator, Optional
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.services.generation_metrics import generation_metrics
+from app.services.llm_provider import llm_rate_limiter
+
+
+FIELD_DESCRIPTIONS = {
+    "full_name": "Employee's full name",
+    "email": "Email address",
+    "phone": "Phone number",
+    "preferred_language": '"en" for English, "ar" for Arabic',
+    "position": "Job title/position",
+    "department": "Department name (e.g., Engineering, Marketing, Sales, HR, Finance)",
+    "salary": "Numeric salary value",
+    "currency": "Currency code (AED, USD, SAR, EGP)",
+    "start_date": "Start date in YYYY-MM-DD format",
+    "employment_type": '"full_time", "part_time", or "contract"',
+    "country": "Country name (UAE, Saudi Arabia, Egypt, Jordan, Qatar)",
+    "city": "City name",
+    "work_location": '"office", "remote", or "hybrid"',
+    "benefits": "Array of benefits with type and description",
+    "notes": "Any additional notes",
+}
+
+# Fields a description must yield before the local result is returned without the model.
+CORE_FIELDS = ("full_name", "position", "start_date", "salary", "currency", "country")
+
+CITY_COUNTRIES = {
+    "dubai": "UAE", "abu dhabi": "UAE", "sharjah": "UAE", "ajman": "UAE", "al ain": "UAE",
+    "ras al khaimah": "UAE", "fujairah": "UAE",
+    "riyadh": "Saudi Arabia", "jeddah": "Saudi Arabia", "dammam": "Saudi Arabia",
+    "khobar": "Saudi Arabia", "mecca": "Saudi Arabia", "medina": "Saudi Arabia",
+    "cairo": "Egypt", "alexandria": "Egypt", "giza": "Egypt",
+    "amman": "Jordan", "doha": "Qatar", "kuwait city": "Kuwait", "manama": "Bahrain",
+    "muscat": "Oman", "beirut": "Lebanon", "casablanca": "Morocco", "rabat": "Morocco",
+    "tunis": "Tunisia",
+}
+
+COUNTRY_ALIASES = {
+    "uae": "UAE", "united arab emirates": "UAE", "emirates": "UAE",
+    "ksa": "Saudi Arabia", "saudi arabia": "Saudi Arabia", "saudi": "Saudi Arabia",
+    "egypt": "Egypt", "jordan": "Jordan", "qatar": "Qatar", "kuwait": "Kuwait",
+    "bahrain": "Bahrain", "oman": "Oman", "lebanon": "Lebanon", "morocco": "Morocco",
+    "tunisia": "Tunisia",
+}
+
+CURRENCY_ALIASES = {
+    "aed": "AED", "dirham": "AED", "dirhams": "AED", "dhs": "AED",
+    "sar": "SAR", "riyal": "SAR", "riyals": "SAR",
+    "egp": "EGP", "le": "EGP", "egyptian pounds": "EGP",
+    "usd": "USD", "$": "USD", "dollars": "USD",
+    "qar": "QAR", "jod": "JOD", "kwd": "KWD", "bhd": "BHD", "omr": "OMR",
+    "eur": "EUR", "€": "EUR", "gbp": "GBP", "£": "GBP",
+}
+
+EMPLOYMENT_TYPES = {
+    "full_time": ["full-time", "full time", "fulltime", "permanent"],
+    "part_time": ["part-time", "part time", "parttime"],
+    "contract": ["contractor", "contract", "freelance", "freelancer", "fixed-term", "fixed term"],
+}
+
+WORK_LOCATIONS = {
+    "remote": ["remote", "remotely", "work from home", "wfh"],
+    "hybrid": ["hybrid"],
+    "office": ["on-site", "onsite", "in office", "in-office", "office-based"],
+}
+
+ROLE_WORDS = {
+    "engineer", "developer", "manager", "designer", "analyst", "director", "specialist",
+    "consultant", "accountant", "officer", "lead", "architect", "scientist", "coordinator",
+    "executive", "head", "vp", "president", "intern", "associate", "administrator",
+    "representative", "recruiter", "assistant", "technician", "advisor", "strategist",
+    "writer", "editor", "researcher", "owner", "programmer", "tester", "supervisor",
+}
+
+DEPARTMENT_KEYWORDS = {
+    "Engineering": ["engineer", "developer", "programmer", "devops", "architect", "qa", "tester"],
+    "Product": ["product"],
+    "Design": ["designer", "design", "ux", "ui"],
+    "Data": ["data", "analytics", "machine learning"],
+    "Marketing": ["marketing", "brand", "content", "seo"],
+    "Sales": ["sales", "account executive", "business development"],
+    "Finance": ["finance", "accountant", "accounting", "controller"],
+    "HR": ["hr", "human resources", "recruiter", "talent", "people"],
+    "Operations": ["operations", "logistics", "supply chain"],
+    "Legal": ["legal", "counsel", "lawyer"],
+}
+
+MONTHS = {
+    name: i for i, names in enumerate([
+        ("january", "jan"), ("february", "feb"), ("march", "mar"), ("april", "apr"),
+        ("may",), ("june", "jun"), ("july", "jul"), ("august", "aug"),
+        ("september", "sep", "sept"), ("october", "oct"), ("november", "nov"), ("december", "dec"),
+    ], 1) for name in names
+}
+
+_MONTH = r"(?P<month>" + "|".join(sorted(MONTHS, key=len, reverse=True)) + r")\.?"
+_DAY = r"(?P<day>\d{1,2})(?:st|nd|rd|th)?"
+_YEAR = r"(?:,?\s*(?P<year>\d{4}))?"
+DATE_PATTERNS = [
+    re.compile(r"\b(?P<year>\d{4})-(?P<month>\d{1,2})-(?P<day>\d{1,2})\b"),
+    re.compile(r"\b(?P<day>\d{1,2})/(?P<month>\d{1,2})/(?P<year>\d{4})\b"),
+    re.compile(rf"\b{_MONTH}\s+{_DAY}{_YEAR}\b", re.IGNORECASE),
+    re.compile(rf"\b{_DAY}\s+(?:of\s+)?{_MONTH}{_YEAR}\b", re.IGNORECASE),
+]
+START_CUE = re.compile(r"\b(start(?:s|ing)?|join(?:s|ing)?|from|commenc\w*|begin(?:s|ning)?|on)\s*(?:on|date:?)?\s*$", re.IGNORECASE)
+
+def _phrases(phrases) -> re.Pattern:
+    """One precompiled alternation matching any of ``phrases`` as whole words."""
+    alternation = "|".join(re.escape(p) for p in sorted(phrases, key=len, reverse=True))
+    return re.compile(rf"(?<![\w-])(?:{alternation})(?![\w-])")
+
+
+CITY_PATTERN = _phrases(CITY_COUNTRIES)
+COUNTRY_PATTERN = _phrases(COUNTRY_ALIASES)
+EMPLOYMENT_TYPE_PATTERNS = {value: _phrases(p) for value, p in EMPLOYMENT_TYPES.items()}
+WORK_LOCATION_PATTERNS = {value: _phrases(p) for value, p in WORK_LOCATIONS.items()}
+DEPARTMENT_PATTERNS = {name: _phrases(k) for name, k in DEPARTMENT_KEYWORDS.items()}
+ARABIC = _phrases(["arabic"])
+ENGLISH_SPEAKER = _phrases(["english speaker", "speaks english"])
+
+EMAIL = re.compile(r"\b[\w.+-]+@[\w-]+(?:\.[\w-]+)+\b")
+# International (+/00) or trunk-prefixed (0) numbers, so dates and amounts don't match.
+PHONE = re.compile(r"(?<![\w@-])(?:\+|00|0)\d[\d\s-]{7,15}\d\b")
+_CURRENCY = r"(?P<currency>" + "|".join(
+    re.escape(c) for c in sorted(CURRENCY_ALIASES, key=len, reverse=True)
+) + r")"
+_AMOUNT = r"(?P<amount>\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?)\s*(?P<k>k\b)?"
+SALARY_PATTERNS = [
+    re.compile(rf"(?<![\w.]){_AMOUNT}\s*{_CURRENCY}(?![\w])", re.IGNORECASE),
+    re.compile(rf"(?<![\w]){_CURRENCY}\s*{_AMOUNT}", re.IGNORECASE),
+]
+NAME_CUE = re.compile(
+    r"\b(?i:hire|hiring|hired|onboard(?:ing)?|welcome|name is|new joiner|candidate)[:\s]+"
+    r"(?P<name>[A-Z][a-zA-Z'-]+(?:\s+(?:al-|el-|bin |ibn )?[A-Z][a-zA-Z'-]+){1,3})"
+)
+NAME = re.compile(r"^[A-Z][a-zA-Z'-]+(?:\s+(?:al-|el-|bin |ibn )?[A-Z][a-zA-Z'-]+){1,3}$")
+DEPARTMENT_CUE = re.compile(r"\b(?:in|on|joining)\s+(?:the\s+)?(?P<dept>[A-Za-z& ]{2,30}?)\s+(?:department|team|dept)\b", re.IGNORECASE)
+
+
+@dataclass
+class ParsedDescription:
+    fields: dict[str, Any] = field(default_factory=dict)
+    confidence: dict[str, float] = field(default_factory=dict)
+
+    def set(self, name: str, value: Any, confidence: float) -> None:
+        if value is None or confidence <= self.confidence.get(name, 0.0):
+            return
+        self.fields[name] = value
+        self.confidence[name] = round(confidence, 2)
+
+    def uncertain(self, names, threshold: float) -> list[str]:
+        return [n for n in names if self.confidence.get(n, 0.0) < threshold]
+
+
+def _resolve_date(year: Optional[str], month: int, day: int, today: date) -> Optional[date]:
+    try:
+        if year:
+            return date(int(year), month, day)
+        candidate = date(today.year, month, day)
+        # Without a year, a start date is the next occurrence of that day.
+        return candidate if candidate >= today else date(today.year + 1, month, day)
+    except ValueError:
+        return None
+
+
+def _extract_date(text: str, result: ParsedDescription, today: date) -> None:
+    for pattern in DATE_PATTERNS:
+        for match in pattern.finditer(text):
+            month = match.group("month")
+            month = MONTHS[month.lower()] if not month.isdigit() else int(month)
+            value = _resolve_date(match.group("year"), month, int(match.group("day")), today)
+            if value is None:
+                continue
+            cued = START_CUE.search(text[max(0, match.start() - 20):match.start()]) is not None
+            confidence = 0.95 if cued else 0.8
+            if not match.group("year"):
+                confidence -= 0.05
+            result.set("start_date", value.isoformat(), confidence)
+
+
+def _extract_salary(text: str, result: ParsedDescription) -> None:
+    for pattern in SALARY_PATTERNS:
+        for match in pattern.finditer(text):
+            amount = float(match.group("amount").replace(",", ""))
+            if match.group("k"):
+                amount *= 1000
+            if amount < 100:
+                continue
+            currency = CURRENCY_ALIASES[match.group("currency").lower()]
+            result.set("salary", amount, 0.9)
+            result.set("currency", currency, 0.95)
+
+
+def _extract_location(lower: str, result: ParsedDescription) -> None:
+    city = CITY_PATTERN.search(lower)
+    if city:
+        result.set("city", city.group(0).title(), 0.95)
+        result.set("country", CITY_COUNTRIES[city.group(0)], 0.9)
+    country = COUNTRY_PATTERN.search(lower)
+    if country:
+        result.set("country", COUNTRY_ALIASES[country.group(0)], 0.95)
+
+
+def _extract_keywords(lower: str, result: ParsedDescription) -> None:
+    for value, pattern in EMPLOYMENT_TYPE_PATTERNS.items():
+        if pattern.search(lower):
+            result.set("employment_type", value, 0.9)
+            break
+    for value, pattern in WORK_LOCATION_PATTERNS.items():
+        if pattern.search(lower):
+            result.set("work_location", value, 0.9)
+            break
+    if ARABIC.search(lower):
+        result.set("preferred_language", "ar", 0.7)
+    elif ENGLISH_SPEAKER.search(lower):
+        result.set("preferred_language", "en", 0.8)
+
+
+def _title_case(words: list[str]) -> str:
+    return " ".join(w if w.isupper() else w[:1].upper() + w[1:] for w in words)
+
+
+def _extract_position(segments: list[str], result: ParsedDescription) -> None:
+    for segment in segments:
+        words = segment.split()
+        lower = [w.lower().strip(".") for w in words]
+        role_at = [i for i, w in enumerate(lower) if w in ROLE_WORDS]
+        if not role_at:
+            continue
+        # The title runs from after any lead-in ("joining as a") to the last role word,
+        # plus a trailing "of X" / "manager" phrase.
+        start = 0
+        for i, w in enumerate(lower[:role_at[0]]):
+            if w in {"as", "a", "an", "the", "new", "is", "joining", "hired", "role", "position", "of"}:
+                start = i + 1
+        end = role_at[-1] + 1
+        if end < len(lower) - 1 and lower[end] == "of":
+            end += 2
+        title = words[start:end]
+        if title and not any(ch.isdigit() for ch in " ".join(title)):
+            result.set("position", _title_case(title), 0.85 if len(title) <= 5 else 0.6)
+            return
+
+
+def _extract_department(lower: str, result: ParsedDescription) -> None:
+    cue = DEPARTMENT_CUE.search(lower)
+    if cue:
+        dept = cue.group("dept").strip()
+        for name, keywords in DEPARTMENT_KEYWORDS.items():
+            if dept == name.lower() or dept in keywords:
+                result.set("department", name, 0.95)
+                return
+        result.set("department", dept.title(), 0.85)
+        return
+    position = (result.fields.get("position") or "").lower()
+    for name, pattern in DEPARTMENT_PATTERNS.items():
+        if pattern.search(position):
+            result.set("department", name, 0.75)
+            return
+
+
+def _extract_name(text: str, segments: list[str], result: ParsedDescription) -> None:
+    cue = NAME_CUE.search(text)
+    if cue:
+        result.set("full_name", cue.group("name"), 0.9)
+        return
+    first = segments[0] if segments else ""
+    if NAME.match(first) and not any(w.lower() in ROLE_WORDS for w in first.split()):
+        if first.lower() not in CITY_COUNTRIES and first.lower() not in COUNTRY_ALIASES:
+            result.set("full_name", first, 0.85)
+
+
+def parse_description(text: str, today: Optional[date] = None) -> ParsedDescription:
+    """Extract new hire fields from free text with rules and gazetteers, scoring each field."""
+    today = today or date.today()
+    result = ParsedDescription()
+    lower = text.lower()
+    segments = [s.strip() for s in re.split(r"[,;\n]|\s+-\s+", text) if s.strip()]
+
+    email = EMAIL.search(text)
+    if email:
+        result.set("email", email.group(0), 0.99)
+    phone = PHONE.search(text)
+    if phone:
+        result.set("phone", re.sub(r"[\s-]", "", phone.group(0)), 0.9)
+
+    _extract_date(text, result, today)
+    _extract_salary(text, result)
+    _extract_location(lower, result)
+    _extract_keywords(lower, result)
+    _extract_position(segments, result)
+    _extract_department(lower, result)
+    _extract_name(text, segments, result)
+    return result
+
+
+def fallback_system_prompt(fields: list[str]) -> str:
+    """Extraction prompt asking the model only for ``fields``."""
+    wanted = "\n".join(f"- {name}: {FIELD_DESCRIPTIONS[name]}" for name in fields)
+    return f"""You are an HR data extraction assistant. Extract structured employee information from natural language descriptions.
+
+Extract the following fields if mentioned:
+{wanted}
+
+Return ONLY valid JSON with the extracted fields. Omit fields that aren't mentioned.
+Use null for missing values. Be smart about inferring information (e.g., if "Dubai" is mentioned, country is likely "UAE")."""
+
+
+BATCH_INSTRUCTIONS = """
+
+You will receive several numbered descriptions, each about a different person.
+Return a JSON object {"results": [...]} with one object per description, containing
+its "index" and the fields extracted from that description only."""
+
+
+def normalize_description(text: str) -> str:
+    return " ".join(text.split()).lower()
+
+
+# Parse results keyed by normalized description
+_cache: LRUCache[str, dict] = LRUCache(settings.PARSE_CACHE_SIZE)
+
+
+async def parse_with_fallback(description: str, llm=None) -> tuple[dict, dict]:
+    """Return (fields, confidence), asking the model only for what the rules couldn't fill.
+
+    Results are cached by normalized description. Without a provider the local
+    result is returned as is.
+    """
+    key = normalize_description(description)
+    cached = _cache.get(key)
+    if cached is not None:
+        return dict(cached["fields"]), dict(cached["confidence"])
+
+    local = parse_description(description)
+    threshold = settings.PARSE_LOCAL_MIN_CONFIDENCE
+    model_fields = None
+    if llm is not None and local.uncertain(CORE_FIELDS, threshold):
+        wanted = local.uncertain(FIELD_DESCRIPTIONS, threshold)
+        completion = await llm.complete(
+            [
+                {"role": "system", "content": fallback_system_prompt(wanted)},
+                {"role": "user", "content": f'Extract employee information from this description:\n\n"{description}"\n\nReturn only the JSON object with extracted fields.'},
+            ],
+            temperature=0.1,
+            json_mode=True,
+        )
+        _record(completion)
+        model_fields = json.loads(completion.text)
+
+    return _merge_and_cache(key, local, model_fields)
+
+
+def _record(completion) -> None:
+    generation_metrics.record(
+        "parse_description",
+        completion.model,
+        completion.prompt_tokens,
+        completion.completion_tokens,
+        completion.latency_ms,
+        completion.ttft_ms,
+    )
+
+
+def _merge_and_cache(
+    key: str,
+    local: ParsedDescription,
+    model_fields: Optional[dict],
+    cache: bool = True,
+) -> tuple[dict, dict]:
+    """Fill the fields the local parser was unsure of from the model's answer, then cache."""
+    threshold = settings.PARSE_LOCAL_MIN_CONFIDENCE
+    fields, confidence = dict(local.fields), dict(local.confidence)
+    wanted = set(local.uncertain(FIELD_DESCRIPTIONS, threshold))
+    for name, value in (model_fields or {}).items():
+        if name in wanted and value is not None:
+            fields[name] = value
+            confidence[name] = threshold
+    if cache:
+        _cache.put(key, {"fields": dict(fields), "confidence": dict(confidence)})
+    return fields, confidence
+
+
+def _result_index(result: dict) -> Optional[int]:
+    try:
+        return int(result.get("index"))
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class BatchParseResult:
+    index: int
+    fields: dict
+    confidence: dict
+    # "cache", "local" or "model"
+    source: str
+    error: Optional[str] = None
+
+
+async def parse_batch(descriptions: list[str], llm=None) -> AsyncIterator[BatchParseResult]:
+    """Parse many descriptions, yielding each result as soon as it is ready.
+
+    Cached and confidently parsed descriptions are yielded first. The rest are sent
+    to the model PARSE_BATCH_ITEMS_PER_CALL at a time, with at most
+    PARSE_BATCH_CONCURRENCY calls in flight, started no faster than the provider
+    rate limit allows. If a call fails, its items fall back to their local result,
+    which is not cached.
+    """
+    threshold = settings.PARSE_LOCAL_MIN_CONFIDENCE
+    pending: list[tuple[int, str, ParsedDescription]] = []
+    for index, description in enumerate(descriptions):
+        key = normalize_description(description)
+        cached = _cache.get(key)
+        if cached is not None:
+            yield BatchParseResult(index, dict(cached["fields"]), dict(cached["confidence"]), "cache")
+            continue
+        local = parse_description(description)
+        if llm is None or not local.uncertain(CORE_FIELDS, threshold):
+            fields, confidence = _merge_and_cache(key, local, None)
+            yield BatchParseResult(index, fields, confidence, "local")
+        else:
+            pending.append((index, description, local))
+    if not pending:
+        return
+
+    size = max(1, settings.PARSE_BATCH_ITEMS_PER_CALL)
+    groups = [pending[i:i + size] for i in range(0, len(pending), size)]
+    semaphore = asyncio.Semaphore(settings.PARSE_BATCH_CONCURRENCY)
+    system_prompt = fallback_system_prompt(list(FIELD_DESCRIPTIONS)) + BATCH_INSTRUCTIONS
+
+    async def parse_group(group):
+        async with semaphore:
+            await llm_rate_limiter.acquire()
+            try:
+                completion = await llm.complete(
+                    [
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": "\n\n".join(
+                            f'[{index}] "{description}"' for index, description, _ in group
+                        )},
+                    ],
+                    temperature=0.1,
+                    json_mode=True,
+                )
+                _record(completion)
+                results = json.loads(completion.text).get("results") or []
+            except Exception as e:
+                return group, {}, str(e)
+        # Models sometimes echo the index as a string.
+        by_index = {_result_index(r): r for r in results if isinstance(r, dict)}
+        return group, by_index, None
+
+    for finished in asyncio.as_completed([parse_group(g) for g in groups]):
+        group, by_index, error = await finished
+        for index, description, local in group:
+            model_fields = by_index.get(index)
+            # A failed call is not the description's answer; let the next parse retry it.
+            fields, confidence = _merge_and_cache(
+                normalize_description(description), local, model_fields, cache=error is None,
+            )
+            if error is not None:
+                yield BatchParseResult(index, fields, confidence, "local", f"Model fallback failed: {error}")
+            else:
+                yield BatchParseResult(index, fields, confidence, "model" if model_fields else "local")
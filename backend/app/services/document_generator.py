@@ -1,10 +1,24 @@
+import asyncio
 import json
+import time
+import uuid
+from dataclasses import dataclass, field
 from typing import Optional
 from sqlalchemy.orm import Session
 from app.core.config import settings
 from app.models.new_hire import NewHire
 from app.models.contract import Contract
 from app.models.contract_template import ContractTemplate
+from app.services.template_renderer import render_template
+from app.services.clause_library import CLAUSE_LIBRARY_MODEL, clause_library
+from app.services.llm_provider import Completion, get_llm_provider
+from app.services.generation_metrics import generation_metrics
+from app.services.prompt_builder import build_generation_prompt, compact_json, estimate_tokens
+from app.services.contract_storage import load_contract_content, store_contract_content
+from app.services.speculative_drafts import draft_fingerprint, take_draft
+from app.services.contract_sections import (
+    affected_clauses, changed_context_paths, split_clauses, splice_clauses,
+)
 
 
 DOCUMENT_GENERATION_SYSTEM_PROMPT = """You are a legal document generation assistant specializing in employment contracts for the MENA region. Your role is to:
@@ -25,15 +39,29 @@ OUTPUT FORMAT:
 """
 
 
+SECTION_REGENERATION_PROMPT = """The clauses below are part of an existing {contract_type} document. The underlying data has changed, so rewrite ONLY these clauses to match the updated context.
+
+Keep every heading line exactly as given, keep the numbering and drafting style, and return the clauses in the same order with nothing before or after them.
+
+CLAUSES:
+{clauses}
+
+UPDATED CONTEXT:
+{context}"""
+
+
+@dataclass
+class GeneratedContent:
+    content: str
+    ai_model: str
+    regenerated_clauses: Optional[list[str]] = field(default=None)
+    # Model calls made to produce the content, for token and latency accounting
+    completions: list[Completion] = field(default_factory=list)
+
+
 class DocumentGeneratorService:
     def __init__(self):
-        self.openai_client = None
-        if settings.OPENAI_API_KEY:
-            try:
-                from openai import OpenAI
-                self.openai_client = OpenAI(api_key=settings.OPENAI_API_KEY)
-            except ImportError:
-                pass
+        self.llm = get_llm_provider()
 
     async def generate_contract(
         self,
@@ -43,40 +71,216 @@ class DocumentGeneratorService:
         template: Optional[ContractTemplate] = None,
         generation_prompt: Optional[str] = None,
         custom_variables: Optional[dict] = None,
-        parent_contract_id: Optional[str] = None,
+        parent_contract: Optional[Contract] = None,
         version: int = 1,
+        incremental: bool = False,
+        template_resolved: bool = False,
     ) -> Contract:
-        context = self._prepare_context(new_hire, custom_variables or {})
-        content = await self._generate_content(template, context, generation_prompt, contract_type)
+        contract = await self.build_contract(
+            new_hire=new_hire,
+            contract_type=contract_type,
+            template=template,
+            template_resolved=template_resolved,
+            generation_prompt=generation_prompt,
+            custom_variables=custom_variables,
+            parent_contract=parent_contract,
+            version=version,
+            incremental=incremental,
+        )
+        db.add(contract)
+        db.commit()
+        db.refresh(contract)
+        return contract
+
+    async def build_contract(
+        self,
+        new_hire: NewHire,
+        contract_type: str,
+        template: Optional[ContractTemplate] = None,
+        generation_prompt: Optional[str] = None,
+        custom_variables: Optional[dict] = None,
+        parent_contract: Optional[Contract] = None,
+        version: int = 1,
+        incremental: bool = False,
+        context: Optional[dict] = None,
+        template_resolved: bool = False,
+    ) -> Contract:
+        """Generate a contract without adding it to a session, so callers can persist in bulk.
+
+        With ``incremental`` and a parent version, only the clauses whose inputs changed
+        are regenerated and the rest are carried over from the parent. A ``context``
+        already built by ``prepare_context`` can be passed to share it between documents.
+        ``template_resolved`` marks a template picked by the template index rather than
+        by the caller; it is a foundation for the model, not the finished document.
+        """
+        if context is None:
+            context = self.prepare_context(new_hire, custom_variables or {})
+        started = time.perf_counter()
+        generated = None
+        if incremental and parent_contract is not None and not generation_prompt:
+            generated = await self._regenerate_sections(
+                parent_contract, template, context, contract_type, custom_variables or {},
+            )
+        served_from_draft = False
+        if generated is None and not generation_prompt and settings.SPECULATIVE_DRAFTS_ENABLED:
+            fingerprint = draft_fingerprint(context, contract_type, template, custom_variables or {}, template_resolved)
+            generated = await take_draft(str(new_hire.id), contract_type, fingerprint)
+            served_from_draft = generated is not None
+        if generated is None:
+            generated = await self._generate_content(
+                template, context, generation_prompt, contract_type, custom_variables or {}, template_resolved,
+            )
+
+        latency_ms = round((time.perf_counter() - started) * 1000)
+        prompt_tokens = sum(c.prompt_tokens for c in generated.completions)
+        completion_tokens = sum(c.completion_tokens for c in generated.completions)
+        ttfts = [c.ttft_ms for c in generated.completions if c.ttft_ms is not None]
+        ttft_ms = round(min(ttfts)) if ttfts else None
+
+        meta_data = {"generation_context": json.loads(json.dumps(context, default=str))}
+        if generated.regenerated_clauses is not None:
+            meta_data["regenerated_clauses"] = generated.regenerated_clauses
+        if served_from_draft:
+            meta_data["served_from_draft"] = True
 
         contract = Contract(
+            id=uuid.uuid4(),
             new_hire_id=new_hire.id,
             template_id=template.id if template else None,
             contract_type=contract_type,
-            content=content,
             status="draft",
             version=version,
-            parent_contract_id=parent_contract_id,
+            parent_contract_id=parent_contract.id if parent_contract is not None else None,
             generation_prompt=generation_prompt,
-            ai_model=settings.OPENAI_MODEL if self.openai_client else "template_fallback",
-            generation_tokens=0,
+            ai_model=generated.ai_model,
+            generation_tokens=prompt_tokens + completion_tokens,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            generation_latency_ms=latency_ms,
+            generation_ttft_ms=ttft_ms,
+            meta_data=meta_data,
             variables=custom_variables or {},
         )
-        db.add(contract)
-        db.commit()
-        db.refresh(contract)
+        generation_metrics.record(
+            "contract_generation",
+            generated.ai_model,
+            prompt_tokens,
+            completion_tokens,
+            latency_ms,
+            ttft_ms,
+            contract_type=contract_type,
+            template_id=str(template.id) if template else None,
+        )
+        await asyncio.to_thread(store_contract_content, contract, generated.content, parent_contract)
         return contract
 
+    async def _regenerate_sections(
+        self,
+        parent: Contract,
+        template: Optional[ContractTemplate],
+        context: dict,
+        contract_type: str,
+        custom_vars: dict,
+    ) -> Optional[GeneratedContent]:
+        """Rebuild only the parent's clauses affected by context changes; None means regenerate fully."""
+        parent_context = (parent.meta_data or {}).get("generation_context")
+        if parent_context is None or parent.template_id != (template.id if template else None):
+            return None
+        parent_content = await asyncio.to_thread(load_contract_content, parent)
+        if not parent_content:
+            return None
+
+        clauses = split_clauses(parent_content)
+        changed = changed_context_paths(parent_context, json.loads(json.dumps(context, default=str)))
+        affected = affected_clauses(clauses, changed)
+        if not affected:
+            return GeneratedContent(parent_content, parent.ai_model, regenerated_clauses=[])
+        if len(affected) > len(clauses) * settings.CONTRACT_INCREMENTAL_MAX_FRACTION:
+            return None
+
+        affected_keys = {c.key for c in affected}
+        completions: list[Completion] = []
+        if parent.ai_model == "template_render" and template:
+            fresh, ai_model = render_template(template, context, custom_vars), "template_render"
+        elif parent.ai_model == CLAUSE_LIBRARY_MODEL:
+            assembled = await clause_library.assemble(contract_type, context, custom_vars, self.llm)
+            if assembled is None:
+                return None
+            (fresh, completions), ai_model = assembled, CLAUSE_LIBRARY_MODEL
+        elif parent.ai_model == "template_fallback":
+            fresh = self._generate_from_template(template, context, contract_type, custom_vars)
+            ai_model = "template_fallback"
+        elif self.llm:
+            completion = await self._regenerate_clauses_with_ai(affected, context, contract_type)
+            fresh, ai_model, completions = completion.text, completion.model, [completion]
+        else:
+            return None
+
+        replacements = {c.key: c.text for c in split_clauses(fresh) if c.key in affected_keys}
+        if replacements.keys() != affected_keys:
+            return None
+        return GeneratedContent(
+            splice_clauses(clauses, replacements),
+            ai_model,
+            regenerated_clauses=[c.title for c in affected],
+            completions=completions,
+        )
+
+    async def _regenerate_clauses_with_ai(self, clauses: list, context: dict, contract_type: str) -> Completion:
+        clause_text = "".join(c.text for c in clauses)
+        prompt = SECTION_REGENERATION_PROMPT.format(
+            contract_type=contract_type,
+            clauses=clause_text,
+            context=compact_json(context),
+        )
+        max_tokens = min(
+            settings.GENERATION_MAX_OUTPUT_TOKENS,
+            max(settings.GENERATION_MIN_OUTPUT_TOKENS, int(estimate_tokens(clause_text) * 1.25)),
+        )
+        return await self.llm.complete(
+            [
+                {"role": "system", "content": DOCUMENT_GENERATION_SYSTEM_PROMPT},
+                {"role": "user", "content": prompt},
+            ],
+            temperature=0.2,
+            max_tokens=max_tokens,
+        )
+
     async def _generate_content(
         self,
         template: Optional[ContractTemplate],
         context: dict,
         generation_prompt: Optional[str],
         contract_type: str,
-    ) -> str:
-        if self.openai_client:
-            return await self._generate_with_ai(template, context, generation_prompt, contract_type)
-        return self._generate_from_template(template, context, contract_type)
+        custom_vars: dict,
+        template_resolved: bool = False,
+    ) -> GeneratedContent:
+        """Write a document from the first source that applies.
+
+        Without custom instructions:
+
+        1. a template the caller chose is rendered as is;
+        2. otherwise the jurisdiction's clause library assembles the document when
+           it has clauses for this document type, ahead of any resolved template;
+        3. otherwise the model writes it, on top of the template resolved for the
+           jurisdiction, which may be an outline only;
+        4. without a model, that template or the built-in outline is rendered.
+
+        Custom instructions always go to the model (step 3); neither templates nor
+        library clauses can follow them.
+        """
+        if not generation_prompt:
+            if template and not template_resolved:
+                return GeneratedContent(render_template(template, context, custom_vars), "template_render")
+            assembled = await clause_library.assemble(contract_type, context, custom_vars, self.llm)
+            if assembled is not None:
+                content, completions = assembled
+                return GeneratedContent(content, CLAUSE_LIBRARY_MODEL, completions=completions)
+        if self.llm:
+            completion = await self._generate_with_ai(template, context, generation_prompt, contract_type, custom_vars)
+            return GeneratedContent(completion.text, completion.model, completions=[completion])
+        content = self._generate_from_template(template, context, contract_type, custom_vars)
+        return GeneratedContent(content, "template_fallback")
 
     async def _generate_with_ai(
         self,
@@ -84,43 +288,29 @@ class DocumentGeneratorService:
         context: dict,
         generation_prompt: Optional[str],
         contract_type: str,
-    ) -> str:
-        template_content = template.content_template if template else "Generate a standard document."
-
-        messages = [
-            {"role": "system", "content": DOCUMENT_GENERATION_SYSTEM_PROMPT},
-            {
-                "role": "user",
-                "content": f"""Generate a {contract_type} document.
-
-TEMPLATE:
-{template_content}
-
-CONTEXT:
-{json.dumps(context, indent=2, default=str)}
-
-CUSTOM INSTRUCTIONS:
-{generation_prompt or 'Use standard terms'}
-
-Generate a complete, legally sound document.""",
-            },
-        ]
-
-        response = self.openai_client.chat.completions.create(
-            model=settings.OPENAI_MODEL,
-            messages=messages,
-            temperature=0.2,
-            max_tokens=4096,
+        custom_vars: dict,
+    ) -> Completion:
+        prompt = build_generation_prompt(
+            DOCUMENT_GENERATION_SYSTEM_PROMPT,
+            contract_type,
+            render_template(template, context, custom_vars) if template else None,
+            context,
+            generation_prompt,
         )
-
-        return response.choices[0].message.content
+        if prompt.trimmed_sections:
+            print(f"Trimmed template sections to fit the prompt budget: {', '.join(prompt.trimmed_sections)}")
+        return await self.llm.complete(prompt.messages, temperature=0.2, max_tokens=prompt.max_tokens)
 
     def _generate_from_template(
         self,
         template: Optional[ContractTemplate],
         context: dict,
         contract_type: str,
+        custom_vars: dict,
     ) -> str:
+        if template:
+            return render_template(template, context, custom_vars)
+
         emp = context.get("employee", {})
         company = context.get("company", {})
         employment = context.get("employment", {})
@@ -191,7 +381,7 @@ ________________________
 Date: ________________
 """
 
-    def _prepare_context(self, new_hire: NewHire, custom_vars: dict) -> dict:
+    def prepare_context(self, new_hire: NewHire, custom_vars: dict) -> dict:
         return {
             "company": {
                 "name": "TechCorp MENA",
@@ -204,6 +394,7 @@ Date: ________________
                 "full_name": new_hire.full_name,
                 "email": new_hire.email,
                 "phone": new_hire.phone,
+                "language": new_hire.preferred_language,
                 "position": new_hire.position,
                 "department": new_hire.department,
                 "start_date": str(new_hire.start_date),
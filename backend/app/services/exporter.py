@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Iterator, Optional
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+
+from app.core.config import settings
+from app.core.serialization import jsonable
+from app.db.session import SessionLocal
+
+
+EXPORT_FORMATS = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+
+def _csv_value(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, default=str)
+    return str(jsonable(value))
+
+
+def stream_rows(statement: Select, file_format: str, batch_size: Optional[int] = None) -> Iterator[bytes]:
+    """Encode the rows of ``statement`` as CSV or NDJSON, one chunk per fetched batch.
+
+    Rows come from a server-side cursor on a dedicated session, so at most one
+    batch is held in memory whatever the size of the result.
+    """
+    batch_size = batch_size or settings.EXPORT_BATCH_SIZE
+    db = SessionLocal()
+    try:
+        result = db.execute(statement.execution_options(stream_results=True, yield_per=batch_size))
+        columns = list(result.keys())
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if file_format == "csv":
+            writer.writerow(columns)
+        for rows in result.partitions():
+            for row in rows:
+                if file_format == "csv":
+                    writer.writerow([_csv_value(v) for v in row])
+                else:
+                    record = {k: jsonable(v) for k, v in zip(columns, row)}
+                    buffer.write(json.dumps(record, ensure_ascii=False, default=str))
+                    buffer.write("\n")
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        if file_format == "csv" and buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+    finally:
+        db.close()
+
+
+def export_response(statement: Select, file_format: str, name: str) -> StreamingResponse:
+    filename = f"{name}-{datetime.now().strftime('%Y%m%d')}.{file_format}"
+    return StreamingResponse(
+        stream_rows(statement, file_format),
+        media_type=EXPORT_FORMATS[file_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
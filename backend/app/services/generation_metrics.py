@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import threading
+from collections import deque
+from typing import Optional
+
+from app.core.config import settings
+
+
+def percentile(values, pct: float) -> Optional[float]:
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class _Series:
+    def __init__(self, sample_size: int):
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.latency_total_ms = 0.0
+        self.latencies: deque[float] = deque(maxlen=sample_size)
+        self.ttfts: deque[float] = deque(maxlen=sample_size)
+
+    def as_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "average_latency_ms": round(self.latency_total_ms / self.calls, 1) if self.calls else 0,
+            "p50_latency_ms": percentile(self.latencies, 50),
+            "p95_latency_ms": percentile(self.latencies, 95),
+            "p50_ttft_ms": percentile(self.ttfts, 50),
+            "p95_ttft_ms": percentile(self.ttfts, 95),
+        }
+
+
+class GenerationMetrics:
+    """Process-local counters for model calls, labelled by operation, model and contract type.
+
+    Totals cover the life of the process; percentiles use the most recent
+    GENERATION_METRICS_SAMPLE_SIZE calls of each series.
+    """
+
+    def __init__(self):
+        self._series: dict[tuple, _Series] = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        operation: str,
+        model: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        latency_ms: float,
+        ttft_ms: Optional[float] = None,
+        contract_type: Optional[str] = None,
+        template_id: Optional[str] = None,
+    ) -> None:
+        key = (operation, model, contract_type, template_id)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Series(settings.GENERATION_METRICS_SAMPLE_SIZE)
+            series.calls += 1
+            series.prompt_tokens += prompt_tokens
+            series.completion_tokens += completion_tokens
+            series.latency_total_ms += latency_ms
+            series.latencies.append(latency_ms)
+            if ttft_ms is not None:
+                series.ttfts.append(ttft_ms)
+
+    def snapshot(self) -> list[dict]:
+        with self._lock:
+            return [
+                {
+                    "operation": operation,
+                    "model": model,
+                    "contract_type": contract_type,
+                    "template_id": template_id,
+                    **series.as_dict(),
+                }
+                for (operation, model, contract_type, template_id), series in self._series.items()
+            ]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+generation_metrics = GenerationMetrics()
@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from app.core.config import settings
+from app.services.prompt_builder import estimate_tokens
+
+
+@dataclass
+class Completion:
+    text: str
+    model: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latency_ms: float = 0.0
+    # Time until the first content token arrived
+    ttft_ms: Optional[float] = None
+
+
+def prompt_key(messages: list[dict], json_mode: bool = False) -> str:
+    """Stable hash of a request, used to match recorded completions on replay."""
+    payload = json.dumps({"messages": messages, "json_mode": json_mode}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _usage_field(usage, name: str) -> Optional[int]:
+    if usage is None:
+        return None
+    if isinstance(usage, dict):
+        return usage.get(name)
+    return getattr(usage, name, None)
+
+
+class LLMProvider:
+    """Chat completion backend used by document generation and new hire parsing."""
+
+    model: str = ""
+
+    async def complete(
+        self,
+        messages: list[dict],
+        temperature: float = 0.2,
+        max_tokens: Optional[int] = None,
+        json_mode: bool = False,
+    ) -> Completion:
+        raise NotImplementedError
+
+
+class OpenAIProvider(LLMProvider):
+    def __init__(self, api_key: str, model: str):
+        from openai import AsyncOpenAI
+
+        self.client = AsyncOpenAI(api_key=api_key)
+        self.model = model
+
+    async def complete(self, messages, temperature=0.2, max_tokens=None, json_mode=False) -> Completion:
+        kwargs = {"model": self.model, "messages": messages, "temperature": temperature}
+        if max_tokens is not None:
+            kwargs["max_tokens"] = max_tokens
+        if json_mode:
+            kwargs["response_format"] = {"type": "json_object"}
+
+        # Streamed so time-to-first-token can be measured; the final chunk carries usage.
+        started = time.perf_counter()
+        stream = await self.client.chat.completions.create(
+            **kwargs, stream=True, extra_body={"stream_options": {"include_usage": True}},
+        )
+        parts: list[str] = []
+        ttft_ms = None
+        usage = None
+        model = self.model
+        async for chunk in stream:
+            model = chunk.model or model
+            if chunk.choices and chunk.choices[0].delta.content:
+                if ttft_ms is None:
+                    ttft_ms = (time.perf_counter() - started) * 1000
+                parts.append(chunk.choices[0].delta.content)
+            usage = getattr(chunk, "usage", None) or usage
+        latency_ms = (time.perf_counter() - started) * 1000
+
+        text = "".join(parts)
+        prompt_tokens = _usage_field(usage, "prompt_tokens")
+        completion_tokens = _usage_field(usage, "completion_tokens")
+        return Completion(
+            text=text,
+            model=model,
+            prompt_tokens=prompt_tokens if prompt_tokens is not None else sum(
+                estimate_tokens(m.get("content") or "") for m in messages
+            ),
+            completion_tokens=completion_tokens if completion_tokens is not None else estimate_tokens(text),
+            latency_ms=latency_ms,
+            ttft_ms=ttft_ms,
+        )
+
+
+# Share of the simulated latency spent before the first token arrives.
+_FAKE_TTFT_SHARE = 0.2
+_HEADING = re.compile(r"^\s*\d+\.\s+[A-Z][A-Z0-9 &,'/()-]*[A-Z)]\s*$", re.MULTILINE)
+_FILLER = (
+    "the employee shall perform the duties assigned by the employer in accordance with "
+    "applicable law and company policy as amended from time to time"
+).split()
+
+
+class FakeLLMProvider(LLMProvider):
+    """Offline provider returning recorded or synthetic completions.
+
+    Requests found in the replay file (JSONL written by RecordingProvider) return the
+    recorded text and token counts; anything else gets a synthetic completion. Latency
+    is drawn from a log-normal distribution fitted to the configured median and p95,
+    seeded from the prompt so repeated runs are reproducible.
+    """
+
+    def __init__(
+        self,
+        model: str = "fake-llm",
+        latency_median_ms: float = 800.0,
+        latency_p95_ms: float = 2500.0,
+        completion_tokens: int = 600,
+        replay_path: Optional[str] = None,
+        seed: int = 0,
+    ):
+        self.model = model
+        self.latency_median_ms = latency_median_ms
+        self.latency_p95_ms = latency_p95_ms
+        self.completion_tokens = completion_tokens
+        self.seed = seed
+        self.recorded: dict[str, dict] = {}
+        if replay_path:
+            with open(replay_path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.recorded[entry["key"]] = entry
+
+    def _latency_ms(self, rng: random.Random) -> float:
+        median = max(self.latency_median_ms, 0.0)
+        if median == 0:
+            return 0.0
+        sigma = max(math.log(max(self.latency_p95_ms, median) / median), 0.0) / 1.645
+        return rng.lognormvariate(math.log(median), sigma)
+
+    def _synthesize(self, messages: list[dict], json_mode: bool, rng: random.Random) -> str:
+        if json_mode:
+            return "{}"
+        prompt = messages[-1]["content"] if messages else ""
+        headings = _HEADING.findall(prompt) or [f"{i}. CLAUSE {i}" for i in range(1, 9)]
+        words_per_clause = max(1, self.completion_tokens // len(headings))
+        parts = []
+        for heading in headings:
+            words = [_FILLER[rng.randrange(len(_FILLER))] for _ in range(words_per_clause)]
+            parts.append(f"{heading.strip()}\n   {' '.join(words).capitalize()}.\n")
+        return "\n".join(parts)
+
+    async def complete(self, messages, temperature=0.2, max_tokens=None, json_mode=False) -> Completion:
+        key = prompt_key(messages, json_mode)
+        rng = random.Random(f"{self.seed}:{key}")
+        recorded = self.recorded.get(key)
+        if recorded is not None:
+            latency_ms = recorded.get("latency_ms") or self._latency_ms(rng)
+            completion = Completion(
+                text=recorded["text"],
+                model=self.model,
+                prompt_tokens=recorded.get("prompt_tokens", 0),
+                completion_tokens=recorded.get("completion_tokens", 0),
+                latency_ms=latency_ms,
+                ttft_ms=recorded.get("ttft_ms") or latency_ms * _FAKE_TTFT_SHARE,
+            )
+        else:
+            text = self._synthesize(messages, json_mode, rng)
+            latency = self._latency_ms(rng)
+            completion = Completion(
+                text=text,
+                model=self.model,
+                prompt_tokens=sum(estimate_tokens(m.get("content") or "") for m in messages),
+                completion_tokens=estimate_tokens(text),
+                latency_ms=latency,
+                ttft_ms=latency * _FAKE_TTFT_SHARE,
+            )
+        await asyncio.sleep(completion.latency_ms / 1000)
+        return completion
+
+
+class RecordingProvider(LLMProvider):
+    """Wraps a provider and appends every completion to a JSONL file for later replay."""
+
+    def __init__(self, inner: LLMProvider, path: str):
+        self.inner = inner
+        self.model = inner.model
+        self.path = path
+        self._lock = threading.Lock()
+
+    async def complete(self, messages, temperature=0.2, max_tokens=None, json_mode=False) -> Completion:
+        completion = await self.inner.complete(messages, temperature, max_tokens, json_mode)
+        entry = {"key": prompt_key(messages, json_mode), **asdict(completion)}
+        line = json.dumps(entry) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+        return completion
+
+
+class RateLimiter:
+    """Spaces the start of model calls so at most ``per_minute`` begin each minute."""
+
+    def __init__(self, per_minute: float):
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    async def acquire(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+llm_rate_limiter = RateLimiter(settings.LLM_REQUESTS_PER_MINUTE)
+
+_provider: Optional[LLMProvider] = None
+_provider_lock = threading.Lock()
+
+
+def _build_provider() -> Optional[LLMProvider]:
+    if settings.LLM_PROVIDER == "fake":
+        provider: LLMProvider = FakeLLMProvider(
+            latency_median_ms=settings.FAKE_LLM_LATENCY_MEDIAN_MS,
+            latency_p95_ms=settings.FAKE_LLM_LATENCY_P95_MS,
+            completion_tokens=settings.FAKE_LLM_COMPLETION_TOKENS,
+            replay_path=settings.FAKE_LLM_REPLAY_PATH,
+            seed=settings.FAKE_LLM_SEED,
+        )
+    elif settings.LLM_PROVIDER == "openai":
+        if not settings.OPENAI_API_KEY:
+            return None
+        try:
+            provider = OpenAIProvider(settings.OPENAI_API_KEY, settings.OPENAI_MODEL)
+        except ImportError:
+            print("OpenAI library not installed; AI generation is disabled.")
+            return None
+    else:
+        raise ValueError(f"Unknown LLM_PROVIDER: {settings.LLM_PROVIDER!r}")
+
+    if settings.LLM_RECORD_PATH:
+        provider = RecordingProvider(provider, settings.LLM_RECORD_PATH)
+    return provider
+
+
+def get_llm_provider() -> Optional[LLMProvider]:
+    """The configured provider, or None when no model is available."""
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            _provider = _build_provider()
+        return _provider
+
+
+def set_llm_provider(provider: Optional[LLMProvider]) -> None:
+    """Replace the process-wide provider, e.g. with a FakeLLMProvider in benchmarks."""
+    global _provider
+    with _provider_lock:
+        _provider = provider
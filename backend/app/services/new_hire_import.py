@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import codecs
+import csv
+import json
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Optional
+
+from pydantic import ValidationError
+from sqlalchemy import func, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.benefit import Benefit
+from app.models.new_hire import NewHire
+from app.schemas.new_hire import NewHireCreate
+from app.models.status_transition import NewHireStatusTransition
+from app.services.audit import record_audit
+from app.services.quantile_sketches import apply_sketch_changes
+from app.services.status_history import transition_values
+
+
+IMPORT_FORMATS = {"csv", "jsonl"}
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode an upload incrementally and yield complete lines (without line endings)."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer.rstrip("\r")
+
+
+async def iter_csv_records(lines: AsyncIterator[str]) -> AsyncIterator[tuple[int, object]]:
+    """Yield (line number, row) pairs, joining quoted fields that span several lines."""
+    header: Optional[list[str]] = None
+    record, record_line, line_no = "", 0, 0
+    async for line in lines:
+        line_no += 1
+        record = f"{record}\n{line}" if record else line
+        record_line = record_line or line_no
+        # An odd number of quotes means a quoted field continues on the next line.
+        if record.count('"') % 2:
+            continue
+        values = next(csv.reader([record]), [])
+        start, record, record_line = record_line, "", 0
+        if not any(v.strip() for v in values):
+            continue
+        if header is None:
+            header = [h.strip().lower() for h in values]
+            continue
+        yield start, {k: v.strip() for k, v in zip(header, values) if k and v.strip() != ""}
+    if record:
+        yield record_line, ValueError("Unterminated quoted field")
+
+
+async def iter_jsonl_records(lines: AsyncIterator[str]) -> AsyncIterator[tuple[int, object]]:
+    line_no = 0
+    async for line in lines:
+        line_no += 1
+        if not line.strip():
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_no, ValueError(f"Invalid JSON: {e.msg}")
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(p) for p in e['loc']) or 'row'}: {e['msg']}" for e in error.errors()
+    )
+
+
+class NewHireImporter:
+    """Validates rows with NewHireCreate and writes them in batches.
+
+    Each batch costs one query to find emails already on file and one multi-row
+    INSERT per table; rows that fail are reported by line without stopping the import.
+    """
+
+    def __init__(self, db: Session, hr_employee_id, batch_size: Optional[int] = None):
+        self.db = db
+        self.hr_employee_id = hr_employee_id
+        self.batch_size = batch_size or settings.NEW_HIRE_IMPORT_BATCH_SIZE
+        self.rows: list[tuple[int, NewHireCreate]] = []
+        self.seen_emails: set[str] = set()
+        self.total = 0
+        self.imported = 0
+        self.error_count = 0
+        self.errors: list[dict] = []
+
+    def _error(self, line: int, message: str, email: Optional[str] = None) -> None:
+        self.error_count += 1
+        if len(self.errors) < settings.NEW_HIRE_IMPORT_MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "email": email, "error": message})
+
+    def add(self, line: int, row) -> None:
+        self.total += 1
+        if isinstance(row, Exception):
+            self._error(line, str(row))
+            return
+        if not isinstance(row, dict):
+            self._error(line, "Row must be an object")
+            return
+        if isinstance(row.get("benefits"), str):
+            try:
+                row["benefits"] = json.loads(row["benefits"])
+            except json.JSONDecodeError:
+                self._error(line, "benefits: must be a JSON array", row.get("email"))
+                return
+        try:
+            record = NewHireCreate(**row)
+        except ValidationError as e:
+            self._error(line, _validation_message(e), row.get("email"))
+            return
+        email = record.email.lower()
+        if email in self.seen_emails:
+            self._error(line, "Duplicate email in this file", record.email)
+            return
+        self.seen_emails.add(email)
+        self.rows.append((line, record))
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        rows, self.rows = self.rows, []
+        if not rows:
+            return
+
+        emails = [r.email.lower() for _, r in rows]
+        # The unique index covers soft-deleted hires too, so they count as existing.
+        existing = {
+            e for (e,) in self.db.query(func.lower(NewHire.email)).filter(func.lower(NewHire.email).in_(emails))
+        }
+        fresh = []
+        for line, record in rows:
+            if record.email.lower() in existing:
+                self._error(line, "A new hire with this email already exists", record.email)
+            else:
+                fresh.append((line, record))
+        if not fresh:
+            return
+
+        try:
+            self._insert(fresh)
+            self.db.commit()
+            self.imported += len(fresh)
+        except IntegrityError:
+            # Lost a race with another writer; retry row by row to attribute the failure.
+            self.db.rollback()
+            for line, record in fresh:
+                try:
+                    with self.db.begin_nested():
+                        self._insert([(line, record)])
+                    self.imported += 1
+                except IntegrityError:
+                    self._error(line, "A new hire with this email already exists", record.email)
+            self.db.commit()
+
+    def _insert(self, rows: list[tuple[int, NewHireCreate]]) -> None:
+        now = datetime.now(timezone.utc)
+        hires, benefits = [], []
+        for _, r in rows:
+            new_hire_id = uuid.uuid4()
+            hires.append({
+                "id": new_hire_id,
+                "hr_employee_id": self.hr_employee_id,
+                "email": r.email,
+                "full_name": r.full_name,
+                "phone": r.phone,
+                "preferred_language": r.preferred_language,
+                "position": r.position,
+                "department": r.department,
+                "salary": r.salary,
+                "currency": r.currency,
+                "start_date": r.start_date,
+                "employment_type": r.employment_type,
+                "country": r.country,
+                "city": r.city,
+                "work_location": r.work_location,
+                "status": "draft",
+                "status_changed_at": now,
+                "session_id": uuid.uuid4().hex[:20],
+                "session_expires_at": now + timedelta(days=7),
+                "notes": r.notes,
+                "created_at": now,
+                "updated_at": now,
+            })
+            for b in r.benefits or []:
+                benefits.append({
+                    "id": uuid.uuid4(),
+                    "new_hire_id": new_hire_id,
+                    "benefit_type": b.benefit_type,
+                    "description": b.description,
+                    "value": b.value,
+                    "currency": b.currency,
+                    "coverage_start_date": b.coverage_start_date,
+                    "provider_name": b.provider_name,
+                    "created_at": now,
+                    "updated_at": now,
+                })
+        self.db.execute(insert(NewHire), hires)
+        self.db.execute(
+            insert(NewHireStatusTransition),
+            [transition_values(h["id"], None, "draft", now, None, now) for h in hires],
+        )
+        if benefits:
+            self.db.execute(insert(Benefit), benefits)
+        # Core inserts skip the ORM flush hooks, so update the salary sketches here.
+        salaries = defaultdict(list)
+        for _, r in rows:
+            if r.salary is not None:
+                salaries[(r.position, r.country, r.currency)].append((float(r.salary), 1))
+        apply_sketch_changes(self.db, "salary", salaries)
+        for h in hires:
+            record_audit(self.db, "new_hires", h["id"], "create", {"email": h["email"], "source": "import"})
+
+    def summary(self) -> dict:
+        return {
+            "total_rows": self.total,
+            "imported": self.imported,
+            "failed": self.error_count,
+            "errors": self.errors,
+            "errors_truncated": self.error_count > len(self.errors),
+        }
+
+
+async def import_new_hires(
+    db: Session,
+    chunks: AsyncIterator[bytes],
+    file_format: str,
+    hr_employee_id,
+) -> dict:
+    """Import new hires from a CSV (with header row) or JSONL upload as it arrives."""
+    if file_format not in IMPORT_FORMATS:
+        raise ImportFormatError(f"Unsupported format {file_format!r}; expected csv or jsonl")
+    importer = NewHireImporter(db, hr_employee_id)
+    records = iter_csv_records(iter_lines(chunks)) if file_format == "csv" else iter_jsonl_records(iter_lines(chunks))
+    async for line, row in records:
+        importer.add(line, row)
+    importer.flush()
+    return importer.summary()
+
+
+def detect_format(content_type: Optional[str]) -> Optional[str]:
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    if content_type in {"text/csv", "application/csv"}:
+        return "csv"
+    if content_type in {"application/x-ndjson", "application/jsonl", "application/x-jsonlines"}:
+        return "jsonl"
+    return None
@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+import asyncio
+import gzip
+import re
+import tempfile
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from app.core.config import settings
+from app.db.base_class import Base
+from app.models.audit_log import AuditLog
+from app.models.conversation_message import ConversationMessage
+from app.services.blob_store import ensure_durable, get_blob_store
+
+
+class PartitionArchiveError(RuntimeError):
+    pass
+
+
+# Tables range-partitioned by month on created_at, with how long their partitions are kept.
+PARTITIONED_TABLES = {
+    AuditLog.__tablename__: lambda: settings.AUDIT_LOG_RETENTION_MONTHS,
+    ConversationMessage.__tablename__: lambda: settings.CONVERSATION_MESSAGE_RETENTION_MONTHS,
+}
+ARCHIVE_NAMESPACE = "archive"
+_PARTITION_NAME = re.compile(r"_p(\d{4})(\d{2})$")
+
+# Messages are written after their conversation row; the slack covers clock differences between servers.
+MESSAGE_CLOCK_SLACK = timedelta(hours=1)
+# Arbitrary advisory lock id, so only one process runs maintenance at a time.
+MAINTENANCE_LOCK_ID = 730_412_905
+
+
+def conversation_messages_filter(conversation) -> list:
+    """Criteria selecting a conversation's messages that also let Postgres skip older partitions."""
+    criteria = [ConversationMessage.conversation_id == conversation.id]
+    if conversation.created_at is not None:
+        criteria.append(ConversationMessage.created_at >= conversation.created_at - MESSAGE_CLOCK_SLACK)
+    return criteria
+
+
+def _month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _add_months(day: date, months: int) -> date:
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y%m}"
+
+
+def is_partitioned(conn: Connection, table: str) -> bool:
+    return bool(conn.execute(
+        text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:t)"),
+        {"t": table},
+    ).scalar())
+
+
+def list_partitions(conn: Connection, table: str) -> list[str]:
+    return list(conn.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:t) ORDER BY c.relname"
+        ),
+        {"t": table},
+    ).scalars())
+
+
+def ensure_partitions(conn: Connection, table: str, start: Optional[date] = None, months_ahead: Optional[int] = None) -> list[str]:
+    """Create monthly partitions from ``start`` (default: this month) through ``months_ahead`` months."""
+    months_ahead = settings.PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+    this_month = _month_start(datetime.now(timezone.utc).date())
+    month = _month_start(start or this_month)
+    existing = set(list_partitions(conn, table))
+    created = []
+    conn.execute(text(f"CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT"))
+    while month <= _add_months(this_month, months_ahead):
+        name = partition_name(table, month)
+        if name not in existing:
+            _create_partition(conn, table, name, month, _add_months(month, 1))
+            created.append(name)
+        month = _add_months(month, 1)
+    return created
+
+
+def _create_partition(conn: Connection, table: str, name: str, start: date, end: date) -> None:
+    """Create a monthly partition, first moving any of its rows out of the default partition.
+
+    Postgres refuses to create a partition while the default one holds rows in
+    its range, which happens when maintenance fell behind. The default partition
+    is detached while those rows are moved, all within the caller's transaction.
+    """
+    default = f"{table}_default"
+    bounds = f"FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    in_range = f"created_at >= '{start.isoformat()}' AND created_at < '{end.isoformat()}'"
+    stray = conn.execute(text(f"SELECT 1 FROM {default} WHERE {in_range} LIMIT 1")).scalar()
+    if not stray:
+        conn.execute(text(f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} FOR VALUES {bounds}"))
+        return
+    conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {default}"))
+    conn.execute(text(f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} FOR VALUES {bounds}"))
+    moved = conn.execute(text(
+        f"WITH moved AS (DELETE FROM {default} WHERE {in_range} RETURNING *) "
+        f"INSERT INTO {table} SELECT * FROM moved"
+    )).rowcount
+    conn.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT"))
+    print(f"Moved {moved} rows from {default} into {name}.")
+
+
+def ensure_all_partitions(engine: Engine) -> None:
+    with engine.begin() as conn:
+        for table in PARTITIONED_TABLES:
+            if is_partitioned(conn, table):
+                ensure_partitions(conn, table)
+
+
+def convert_to_partitioned(engine: Engine, table: str) -> int:
+    """Rebuild an existing plain table as a partitioned one, copying its rows; returns rows copied.
+
+    Runs in a single transaction and locks the table while copying, so schedule it
+    in a maintenance window.
+    """
+    old = f"{table}_unpartitioned"
+    model_table = Base.metadata.tables[table]
+    columns = ", ".join(c.name for c in model_table.columns)
+    with engine.begin() as conn:
+        if is_partitioned(conn, table):
+            return 0
+        conn.execute(text(f"ALTER TABLE {table} RENAME TO {old}"))
+        conn.execute(text(f"ALTER TABLE {old} RENAME CONSTRAINT {table}_pkey TO {old}_pkey"))
+        # Index names are schema-wide; free them for the new table.
+        for index in model_table.indexes:
+            conn.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+        model_table.create(conn)
+        oldest = conn.execute(text(f"SELECT min(created_at) FROM {old}")).scalar()
+        ensure_partitions(conn, table, start=oldest.date() if oldest else None)
+        copied = conn.execute(text(
+            f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {old} WHERE created_at IS NOT NULL"
+        )).rowcount
+        conn.execute(text(f"DROP TABLE {old}"))
+    return copied
+
+
+def _archive_query(conn: Connection, key: str, query: str) -> None:
+    """Upload the rows of ``query`` to the blob store as gzipped CSV and check the upload.
+
+    The COPY runs on ``conn``, so it sees and locks what the caller's transaction does,
+    and anything the query deletes only goes once that transaction commits.
+    """
+    with tempfile.TemporaryFile() as spool:
+        with gzip.GzipFile(fileobj=spool, mode="wb") as gz:
+            with conn.connection.cursor() as cursor:
+                cursor.copy_expert(f"COPY ({query}) TO STDOUT WITH CSV HEADER", gz)
+        written = spool.tell()
+        spool.seek(0)
+        store = get_blob_store()
+        store.put_file(key, spool, "application/gzip")
+    stored = store.size(key) if store.exists(key) else None
+    if stored != written:
+        raise PartitionArchiveError(f"Archive {key} holds {stored} bytes, expected {written}")
+
+
+def _retire_partition(engine: Engine, table: str, partition: str) -> str:
+    """Archive a partition, then detach and drop it, all in one transaction; returns the archive key.
+
+    The partition stays attached and readable until its archive is verified; a
+    failure anywhere rolls everything back and leaves it in place.
+    """
+    key = f"{ARCHIVE_NAMESPACE}/{table}/{partition}.csv.gz"
+    with engine.begin() as conn:
+        # Writes to the partition would be missing from the archive.
+        conn.execute(text(f"LOCK TABLE {partition} IN SHARE MODE"))
+        _archive_query(conn, key, f"SELECT * FROM {partition}")
+        conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {partition}"))
+        conn.execute(text(f"DROP TABLE {partition}"))
+    return key
+
+
+def _retire_default_rows(engine: Engine, table: str, cutoff: date) -> Optional[str]:
+    """Archive and delete rows before ``cutoff`` left in the default partition; returns the key, if any.
+
+    Rows land there when they are older than the first monthly partition (backdated
+    or imported rows), and no partition is ever created to take them out. Rows
+    without a created_at can't age and stay.
+    """
+    default = f"{table}_default"
+    before = f"created_at < '{cutoff.isoformat()}'"
+    with engine.begin() as conn:
+        if not conn.execute(text(f"SELECT 1 FROM {default} WHERE {before} LIMIT 1")).scalar():
+            return None
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        key = f"{ARCHIVE_NAMESPACE}/{table}/{default}_before_{cutoff:%Y%m}_{stamp}.csv.gz"
+        _archive_query(conn, key, f"DELETE FROM {default} WHERE {before} RETURNING *")
+    return key
+
+
+def apply_retention(engine: Engine, table: str, retention_months: int, today: Optional[date] = None) -> list[str]:
+    """Archive and drop partitions entirely older than the retention window, and old rows of the default one.
+
+    Dropping a detached partition is a metadata change, so old data leaves the
+    table without the long-running DELETE and vacuum debt of removing rows one by one.
+    """
+    ensure_durable(get_blob_store(), f"archive and drop partitions of {table}")
+    cutoff = _add_months(_month_start(today or datetime.now(timezone.utc).date()), -retention_months)
+    archived = []
+    with engine.connect() as conn:
+        partitions = list_partitions(conn, table)
+    for partition in partitions:
+        match = _PARTITION_NAME.search(partition)
+        if not match:
+            continue
+        month = date(int(match.group(1)), int(match.group(2)), 1)
+        if _add_months(month, 1) > cutoff:
+            continue
+        archived.append(_retire_partition(engine, table, partition))
+    if f"{table}_default" in partitions:
+        key = _retire_default_rows(engine, table, cutoff)
+        if key:
+            archived.append(key)
+    return archived
+
+
+def run_maintenance(engine: Engine) -> dict[str, list[str]]:
+    """Create upcoming partitions and retire expired ones for every partitioned table.
+
+    Returns without doing anything when another process is already running it.
+    """
+    report = {}
+    with engine.connect() as lock_conn:
+        if not lock_conn.execute(text("SELECT pg_try_advisory_lock(:id)"), {"id": MAINTENANCE_LOCK_ID}).scalar():
+            return report
+        try:
+            for table, retention in PARTITIONED_TABLES.items():
+                with engine.begin() as conn:
+                    if not is_partitioned(conn, table):
+                        continue
+                    ensure_partitions(conn, table)
+                if not get_blob_store().durable:
+                    # Dropped partitions would only survive in a store that doesn't outlive the container.
+                    print(f"Skipping retention for {table}: the blob store is not durable.")
+                    continue
+                report[table] = apply_retention(engine, table, retention())
+        finally:
+            lock_conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MAINTENANCE_LOCK_ID})
+    return report
+
+
+async def maintenance_loop(engine: Engine) -> None:
+    """Run maintenance every PARTITION_MAINTENANCE_INTERVAL_SECONDS for as long as the app is up."""
+    while True:
+        await asyncio.sleep(settings.PARTITION_MAINTENANCE_INTERVAL_SECONDS)
+        try:
+            await asyncio.to_thread(run_maintenance, engine)
+        except Exception as e:
+            print(f"Partition maintenance failed: {e}")
+
+
+if __name__ == "__main__":
+    import sys
+
+    import app.db.base  # noqa – register all models
+    from app.db.session import engine
+
+    if sys.argv[1:2] == ["convert"]:
+        for name in sys.argv[2:] or list(PARTITIONED_TABLES):
+            print(f"{name}: copied {convert_to_partitioned(engine, name)} rows into the partitioned table.")
+    else:
+        for name, keys in run_maintenance(engine).items():
+            print(f"{name}: wrote {len(keys)} archives.")
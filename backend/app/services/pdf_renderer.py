@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import html
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+from app.core.config import settings
+from app.services.blob_store import content_addressed_key, get_blob_store
+
+
+# Bump when the HTML/CSS layout changes so previously cached PDFs are re-rendered.
+PDF_LAYOUT_VERSION = "1"
+PDF_NAMESPACE = "contracts/pdf"
+
+HEADING_PATTERN = re.compile(r"^(\d+\.\s+)?[A-Z][A-Z0-9 &,'/()-]{2,}$")
+
+PDF_STYLESHEET = """
+@page { size: A4; margin: 2.2cm 2cm; @bottom-center { content: counter(page) " / " counter(pages); font-size: 9pt; } }
+body { font-family: "DejaVu Serif", Georgia, serif; font-size: 11pt; line-height: 1.45; }
+h1 { font-size: 16pt; text-align: center; margin-bottom: 1.2em; }
+h2 { font-size: 12pt; margin: 1.2em 0 0.4em; }
+p { margin: 0 0 0.35em; white-space: pre-wrap; }
+"""
+
+_executor: ProcessPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+@dataclass
+class _RenderLock:
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    # Requests holding or waiting for the lock; the entry is dropped when the last one leaves.
+    users: int = 0
+
+
+_render_locks: dict[str, _RenderLock] = {}
+
+
+def content_hash(content: str, title: str) -> str:
+    # The title is rendered into the document, so it is part of the address too.
+    return hashlib.sha256(f"{PDF_LAYOUT_VERSION}\n{title}\n{content}".encode("utf-8")).hexdigest()
+
+
+def contract_to_html(content: str, title: str) -> str:
+    body = []
+    for line in content.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            continue
+        if HEADING_PATTERN.match(stripped):
+            body.append(f"<h2>{html.escape(stripped)}</h2>")
+        else:
+            body.append(f"<p>{html.escape(line.rstrip())}</p>")
+    return (
+        f"<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>{html.escape(title)}</title>"
+        f"<style>{PDF_STYLESHEET}</style></head><body>{''.join(body)}</body></html>"
+    )
+
+
+def _render_pdf(html_document: str) -> bytes:
+    # Runs inside a worker process: WeasyPrint layout is CPU-bound and holds the GIL.
+    from weasyprint import HTML
+    return HTML(string=html_document).write_pdf()
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=settings.PDF_RENDER_WORKERS)
+        return _executor
+
+
+def shutdown_renderer() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+async def get_contract_pdf(content: str, title: str) -> str:
+    """Return the blob key of the PDF for this content, rendering it in the process pool on a miss.
+
+    PDFs are addressed by the hash of the title and text they were rendered from,
+    so every contract version with identical content shares one stored PDF.
+    """
+    store = get_blob_store()
+    key = content_addressed_key(PDF_NAMESPACE, content_hash(content, title), ".pdf")
+    if await asyncio.to_thread(store.exists, key):
+        return key
+
+    entry = _render_locks.setdefault(key, _RenderLock())
+    entry.users += 1
+    try:
+        async with entry.lock:
+            if await asyncio.to_thread(store.exists, key):
+                return key
+
+            loop = asyncio.get_running_loop()
+            pdf_bytes = await loop.run_in_executor(
+                _get_executor(), _render_pdf, contract_to_html(content, title),
+            )
+            await asyncio.to_thread(store.put, key, pdf_bytes, "application/pdf")
+    finally:
+        entry.users -= 1
+        if entry.users == 0:
+            _render_locks.pop(key, None)
+
+    return key
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Optional
+
+from app.core.config import settings
+from app.services.contract_sections import split_clauses
+
+
+TRIM_MARKER = "\n   [... remaining standard wording omitted; keep its substance ...]\n"
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    # The BPE files are downloaded on first use; without network access that fails,
+    # and the cached None keeps every later call on the length estimate.
+    try:
+        try:
+            return tiktoken.encoding_for_model(settings.OPENAI_MODEL)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        print(f"tiktoken encoding unavailable, estimating tokens from length: {e}")
+        return None
+
+
+def estimate_tokens(text: str) -> int:
+    """Token count from tiktoken when installed, else about four characters per token."""
+    if not text:
+        return 0
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return max(1, len(text) // 4)
+
+
+def _drop_nulls(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: _drop_nulls(v) for k, v in value.items() if v is not None and v != "None"}
+    if isinstance(value, list):
+        return [_drop_nulls(v) for v in value if v is not None]
+    return value
+
+
+def compact_json(value: Any) -> str:
+    """JSON without indentation or null fields, for putting data into prompts."""
+    return json.dumps(_drop_nulls(value), separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def _truncate(text: str, tokens: int) -> str:
+    # Cut on a whitespace boundary near the token target, keeping the heading line.
+    heading, _, body = text.partition("\n")
+    keep = max(0, tokens * 4 - len(heading))
+    if len(body) <= keep:
+        return text
+    cut = body.rfind(" ", 0, keep)
+    return f"{heading}\n{body[:cut if cut > 0 else keep].rstrip()}{TRIM_MARKER}"
+
+
+def fit_sections(text: str, budget: int) -> tuple[str, list[str]]:
+    """Shorten the longest sections of a document until it fits ``budget`` tokens.
+
+    Each section keeps its heading and at least PROMPT_MIN_SECTION_TOKENS of its
+    opening wording; returns the text and the titles of the sections that were cut.
+    """
+    clauses = split_clauses(text)
+    sizes = [estimate_tokens(c.text) for c in clauses]
+    floor = settings.PROMPT_MIN_SECTION_TOKENS
+    trimmed: list[str] = []
+    while sum(sizes) > budget:
+        i = max(range(len(clauses)), key=lambda j: sizes[j])
+        if sizes[i] <= floor:
+            break
+        target = max(floor, sizes[i] - (sum(sizes) - budget))
+        shortened = _truncate(clauses[i].text, target - estimate_tokens(TRIM_MARKER))
+        size = estimate_tokens(shortened)
+        if size >= sizes[i]:
+            break
+        clauses[i].text, sizes[i] = shortened, size
+        if clauses[i].title not in trimmed:
+            trimmed.append(clauses[i].title)
+    result = "".join(c.text for c in clauses)
+    if estimate_tokens(result) > budget:
+        result = result[:budget * 4] + TRIM_MARKER
+    return result, trimmed
+
+
+@dataclass
+class BuiltPrompt:
+    messages: list[dict]
+    prompt_tokens: int
+    max_tokens: int
+    trimmed_sections: list[str] = field(default_factory=list)
+
+
+def build_generation_prompt(
+    system_prompt: str,
+    contract_type: str,
+    template_text: Optional[str],
+    context: dict,
+    generation_prompt: Optional[str],
+    budget: Optional[int] = None,
+) -> BuiltPrompt:
+    """Messages for a full document generation, kept within the prompt token budget.
+
+    The system prompt is sent unchanged as the first message so providers can
+    cache it as a shared prefix; everything request-specific follows it.
+    """
+    budget = budget or settings.PROMPT_TOKEN_BUDGET
+    context_text = compact_json(context)
+    instructions = generation_prompt or "Use standard terms"
+
+    def user_message(template_part: str) -> str:
+        return (
+            f"Generate a {contract_type} document.\n\n"
+            f"TEMPLATE:\n{template_part}\n\n"
+            f"CONTEXT:\n{context_text}\n\n"
+            f"CUSTOM INSTRUCTIONS:\n{instructions}\n\n"
+            "Generate a complete, legally sound document."
+        )
+
+    template_part = template_text or "Generate a standard document."
+    fixed = estimate_tokens(system_prompt) + estimate_tokens(user_message(""))
+    trimmed: list[str] = []
+    template_tokens = estimate_tokens(template_part)
+    if template_text and fixed + template_tokens > budget:
+        template_part, trimmed = fit_sections(template_text, max(budget - fixed, 0))
+
+    content = user_message(template_part)
+    prompt_tokens = estimate_tokens(system_prompt) + estimate_tokens(content)
+
+    # Size the completion to the document being written rather than a fixed cap.
+    if template_text:
+        expected = int(template_tokens * 1.25)
+        max_tokens = min(settings.GENERATION_MAX_OUTPUT_TOKENS, max(settings.GENERATION_MIN_OUTPUT_TOKENS, expected))
+    else:
+        max_tokens = settings.GENERATION_MAX_OUTPUT_TOKENS
+
+    return BuiltPrompt(
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": content},
+        ],
+        prompt_tokens=prompt_tokens,
+        max_tokens=max_tokens,
+        trimmed_sections=trimmed,
+    )
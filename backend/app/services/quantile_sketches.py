@@ -0,0 +1,321 @@
+from __future__ import annotations
+
+import json
+import math
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Callable, Iterable, Optional
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.history import track_previous_values
+from app.models.conversation import Conversation
+from app.models.new_hire import NewHire
+from app.models.quantile_sketch import QuantileSketch
+
+
+class QuantileSketchError(ValueError):
+    pass
+
+
+class DDSketch:
+    """Mergeable quantile sketch with bounded relative error.
+
+    Positive values fall into logarithmic bins of ratio ``gamma``, so any quantile
+    is returned within ``relative_accuracy`` of the true value. Unlike t-digest or
+    KLL a value can be removed again, which keeps sketches exact under updates.
+    """
+
+    def __init__(self, relative_accuracy: float, bins: Optional[dict[int, int]] = None, zero_count: int = 0):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: dict[int, int] = dict(bins or {})
+        self.zero_count = zero_count
+
+    @property
+    def count(self) -> int:
+        return self.zero_count + sum(self.bins.values())
+
+    def _index(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def add(self, value: float, weight: int = 1) -> None:
+        if value <= 0:
+            self.zero_count += weight
+            return
+        index = self._index(value)
+        count = self.bins.get(index, 0) + weight
+        if count > 0:
+            self.bins[index] = count
+        else:
+            self.bins.pop(index, None)
+
+    def remove(self, value: float) -> None:
+        if value <= 0:
+            self.zero_count = max(0, self.zero_count - 1)
+        else:
+            self.add(value, -1)
+
+    def merge(self, other: "DDSketch") -> None:
+        if other.relative_accuracy != self.relative_accuracy:
+            raise QuantileSketchError("Cannot merge sketches with different accuracy")
+        self.zero_count += other.zero_count
+        for index, count in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + count
+
+    def quantile(self, q: float) -> Optional[float]:
+        total = self.count
+        if total == 0:
+            return None
+        rank = q * (total - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.bins):
+            seen += self.bins[index]
+            if seen > rank:
+                return 2 * self.gamma ** index / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.bins) / (self.gamma + 1)
+
+
+@dataclass(frozen=True)
+class SketchMetric:
+    model: type
+    value: str
+    dimensions: tuple[str, ...]
+    # Other attributes ``include`` reads, and whether a row counts given an attribute getter
+    requires: tuple[str, ...] = ()
+    include: Callable[[Callable[[str], object]], bool] = lambda get: True
+
+
+SKETCH_METRICS = {
+    "salary": SketchMetric(
+        NewHire, "salary", ("position", "country", "currency"),
+        requires=("deleted_at",), include=lambda get: get("deleted_at") is None,
+    ),
+    "conversation_duration": SketchMetric(Conversation, "duration_seconds", ("language",)),
+}
+
+
+# Load the old value before an attribute is overwritten so the flush can take it out of its sketch.
+for _spec in SKETCH_METRICS.values():
+    track_previous_values(*(getattr(_spec.model, name) for name in (_spec.value, *_spec.dimensions, *_spec.requires)))
+
+
+def dimension_key(values: Iterable) -> str:
+    return json.dumps(list(values), ensure_ascii=False)
+
+
+def _number(value) -> Optional[float]:
+    return float(value) if isinstance(value, (Decimal, int, float)) else None
+
+
+def _previous(state, name: str):
+    history = state.attrs[name].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.added:
+        return None
+    return state.attrs[name].value
+
+
+def _observation(spec: SketchMetric, obj, previous: bool) -> Optional[tuple[tuple, float]]:
+    """(dimension values, value) the object contributes before or after this flush."""
+    state = inspect(obj)
+    get = (lambda name: _previous(state, name)) if previous else (lambda name: getattr(obj, name))
+    if not spec.include(get):
+        return None
+    value = _number(get(spec.value))
+    if value is None:
+        return None
+    return tuple(get(d) for d in spec.dimensions), value
+
+
+def _collect_changes(session: Session) -> dict[tuple[str, tuple], list[tuple[float, int]]]:
+    changes: dict[tuple[str, tuple], list[tuple[float, int]]] = defaultdict(list)
+    for name, spec in SKETCH_METRICS.items():
+        for obj in session.new:
+            if isinstance(obj, spec.model):
+                after = _observation(spec, obj, previous=False)
+                if after:
+                    changes[(name, after[0])].append((after[1], 1))
+        for obj in session.dirty:
+            if isinstance(obj, spec.model) and session.is_modified(obj):
+                before = _observation(spec, obj, previous=True)
+                after = _observation(spec, obj, previous=False)
+                if before == after:
+                    continue
+                if before:
+                    changes[(name, before[0])].append((before[1], -1))
+                if after:
+                    changes[(name, after[0])].append((after[1], 1))
+        for obj in session.deleted:
+            if isinstance(obj, spec.model):
+                before = _observation(spec, obj, previous=True)
+                if before:
+                    changes[(name, before[0])].append((before[1], -1))
+    return changes
+
+
+def _to_sketch(row: QuantileSketch) -> DDSketch:
+    return DDSketch(row.relative_accuracy, {int(k): v for k, v in (row.bins or {}).items()}, row.zero_count)
+
+
+def _store(row: QuantileSketch, sketch: DDSketch) -> None:
+    row.bins = {str(k): v for k, v in sorted(sketch.bins.items())}
+    row.zero_count = sketch.zero_count
+    row.count = sketch.count
+
+
+def apply_sketch_changes(session: Session, metric: str, changes: dict[tuple, list[tuple[float, int]]]) -> None:
+    """Add (weight 1) or remove (weight -1) values in the sketches of ``metric``, keyed by dimension values.
+
+    Runs in the caller's transaction; sketch rows are created if missing and locked
+    so concurrent writers to the same sketch apply their changes one after another.
+    """
+    if not changes:
+        return
+    spec = SKETCH_METRICS[metric]
+    keys = {dimension_key(dims): dims for dims in changes}
+    with session.no_autoflush:
+        session.execute(
+            pg_insert(QuantileSketch)
+            .values([
+                {
+                    "id": uuid.uuid4(),
+                    "metric": metric,
+                    "dimension_key": key,
+                    "dimensions": dict(zip(spec.dimensions, dims)),
+                    "relative_accuracy": settings.QUANTILE_SKETCH_RELATIVE_ACCURACY,
+                    "count": 0,
+                    "zero_count": 0,
+                    "bins": {},
+                }
+                for key, dims in keys.items()
+            ])
+            .on_conflict_do_nothing(index_elements=["metric", "dimension_key"])
+        )
+        rows = session.scalars(
+            select(QuantileSketch)
+            .where(QuantileSketch.metric == metric, QuantileSketch.dimension_key.in_(list(keys)))
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        for row in rows:
+            sketch = _to_sketch(row)
+            for value, weight in changes[keys[row.dimension_key]]:
+                if weight > 0:
+                    sketch.add(value)
+                else:
+                    sketch.remove(value)
+            _store(row, sketch)
+
+
+@event.listens_for(Session, "before_flush")
+def _update_sketches(session: Session, flush_context, instances) -> None:
+    """Apply salary and duration changes to their sketches in the same transaction."""
+    by_metric: dict[str, dict[tuple, list]] = defaultdict(dict)
+    for (metric, dims), deltas in _collect_changes(session).items():
+        by_metric[metric][dims] = deltas
+    for metric, changes in by_metric.items():
+        apply_sketch_changes(session, metric, changes)
+
+
+def sketch_quantiles(
+    db: Session,
+    metric: str,
+    quantiles: Iterable[float],
+    filters: Optional[dict] = None,
+    group_by: Iterable[str] = (),
+) -> list[dict]:
+    """Merge the stored sketches matching ``filters`` into one per ``group_by`` combination."""
+    spec = SKETCH_METRICS.get(metric)
+    if spec is None:
+        raise QuantileSketchError(f"Unknown metric {metric!r}; choose from {', '.join(SKETCH_METRICS)}")
+    group_by = list(group_by)
+    unknown = [d for d in [*group_by, *(filters or {})] if d not in spec.dimensions]
+    if unknown:
+        raise QuantileSketchError(
+            f"Unknown dimensions for {metric}: {', '.join(unknown)}; choose from {', '.join(spec.dimensions)}"
+        )
+    quantiles = sorted(set(quantiles))
+    if not quantiles or any(not 0 <= q <= 1 for q in quantiles):
+        raise QuantileSketchError("Quantiles must be between 0 and 1")
+
+    statement = select(QuantileSketch).where(QuantileSketch.metric == metric, QuantileSketch.count > 0)
+    for name, value in (filters or {}).items():
+        statement = statement.where(QuantileSketch.dimensions[name].astext == value)
+
+    merged: dict[tuple, DDSketch] = {}
+    for row in db.scalars(statement):
+        group = tuple(row.dimensions.get(d) for d in group_by)
+        sketch = _to_sketch(row)
+        if group in merged:
+            merged[group].merge(sketch)
+        else:
+            merged[group] = sketch
+
+    results = []
+    for group, sketch in sorted(merged.items(), key=lambda item: tuple(str(v) for v in item[0])):
+        results.append({
+            **dict(zip(group_by, group)),
+            "count": sketch.count,
+            **{f"p{round(q * 100, 1):g}": _round(sketch.quantile(q)) for q in quantiles},
+        })
+    return results
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 2) if value is not None else None
+
+
+def rebuild_sketches(db: Session, metrics: Optional[list[str]] = None) -> dict[str, int]:
+    """Recompute sketches from the source tables, e.g. after changing the accuracy."""
+    counts = {}
+    for metric in metrics or list(SKETCH_METRICS):
+        spec = SKETCH_METRICS[metric]
+        sketches: dict[tuple, DDSketch] = {}
+        columns = [getattr(spec.model, spec.value), *(getattr(spec.model, d) for d in spec.dimensions)]
+        statement = select(*columns).where(getattr(spec.model, spec.value) != None)
+        if hasattr(spec.model, "deleted_at"):
+            statement = statement.where(spec.model.deleted_at == None)
+        rows = db.execute(statement.execution_options(stream_results=True, yield_per=settings.EXPORT_BATCH_SIZE))
+        for value, *dims in rows:
+            sketch = sketches.get(tuple(dims))
+            if sketch is None:
+                sketch = sketches[tuple(dims)] = DDSketch(settings.QUANTILE_SKETCH_RELATIVE_ACCURACY)
+            sketch.add(float(value))
+
+        db.query(QuantileSketch).filter(QuantileSketch.metric == metric).delete(synchronize_session=False)
+        for dims, sketch in sketches.items():
+            row = QuantileSketch(
+                metric=metric,
+                dimension_key=dimension_key(dims),
+                dimensions=dict(zip(spec.dimensions, dims)),
+                relative_accuracy=sketch.relative_accuracy,
+            )
+            _store(row, sketch)
+            db.add(row)
+        db.commit()
+        counts[metric] = len(sketches)
+    return counts
+
+
+if __name__ == "__main__":
+    import sys
+
+    import app.db.base  # noqa – register all models
+    from app.db.session import SessionLocal
+
+    session = SessionLocal()
+    try:
+        for name, count in rebuild_sketches(session, sys.argv[1:] or None).items():
+            print(f"Rebuilt {count} {name} sketches.")
+    finally:
+        session.close()
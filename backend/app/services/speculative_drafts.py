@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy.orm import joinedload
+
+from app.core.config import settings
+from app.models.contract_template import ContractTemplate
+from app.models.new_hire import NewHire
+from app.services.template_index import template_index
+
+
+# Documents pre-generated for a new hire, per country; other countries use the default pack.
+DEFAULT_DOCUMENT_PACK = ["offer_letter", "employment_contract"]
+DOCUMENT_PACKS_BY_COUNTRY: dict[str, list[str]] = {}
+
+
+@dataclass
+class _Draft:
+    fingerprint: str
+    task: asyncio.Task
+    created_at: float
+
+
+_drafts: OrderedDict[tuple[str, str], _Draft] = OrderedDict()
+_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def draft_fingerprint(
+    context: dict,
+    contract_type: str,
+    template: Optional[ContractTemplate],
+    custom_vars: dict,
+    template_resolved: bool = False,
+) -> str:
+    """Hash of every input that shapes a generated document."""
+    payload = json.dumps({
+        "context": context,
+        "contract_type": contract_type,
+        "template": [str(template.id), template.version] if template else None,
+        "template_resolved": template_resolved,
+        "custom_variables": custom_vars,
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+async def take_draft(new_hire_id: str, contract_type: str, fingerprint: str):
+    """Return the pre-generated content for these inputs, waiting on it if still in flight.
+
+    A draft is handed out once; later calls generate afresh.
+    """
+    key = (new_hire_id, contract_type)
+    draft = _drafts.get(key)
+    if draft is None or draft.fingerprint != fingerprint:
+        return None
+    _drafts.pop(key, None)
+    if time.monotonic() - draft.created_at > settings.SPECULATIVE_DRAFT_TTL_SECONDS:
+        if not draft.task.done():
+            draft.task.cancel()
+        return None
+    try:
+        return await asyncio.shield(draft.task)
+    except asyncio.CancelledError:
+        if draft.task.cancelled():
+            return None
+        raise
+    except Exception:
+        return None
+
+
+def _log_failure(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        print(f"Speculative draft generation failed: {task.exception()}")
+
+
+def _remember(key: tuple[str, str], draft: _Draft) -> None:
+    _drafts[key] = draft
+    _drafts.move_to_end(key)
+    while len(_drafts) > settings.SPECULATIVE_DRAFT_CACHE_SIZE:
+        _, evicted = _drafts.popitem(last=False)
+        if not evicted.task.done():
+            evicted.task.cancel()
+
+
+async def pregenerate_drafts(new_hire_id: str) -> None:
+    """Background task: generate the default document pack for a new hire ahead of time."""
+    global _semaphore
+    from app.db.session import SessionLocal
+    from app.services.document_generator import DocumentGeneratorService
+
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(settings.SPECULATIVE_DRAFT_CONCURRENCY)
+
+    db = SessionLocal()
+    try:
+        new_hire = db.query(NewHire).options(joinedload(NewHire.benefits)).filter(
+            NewHire.id == new_hire_id, NewHire.deleted_at == None
+        ).first()
+        if not new_hire:
+            return
+
+        generator = DocumentGeneratorService()
+        context = generator.prepare_context(new_hire, {})
+        pack = DOCUMENT_PACKS_BY_COUNTRY.get(new_hire.country, DEFAULT_DOCUMENT_PACK)
+
+        async def generate(contract_type: str, template: Optional[ContractTemplate]):
+            async with _semaphore:
+                return await generator._generate_content(template, context, None, contract_type, {}, True)
+
+        for contract_type in pack:
+            key = (new_hire_id, contract_type)
+            template = template_index.resolve(db, contract_type, new_hire.country, new_hire.preferred_language)
+            fingerprint = draft_fingerprint(context, contract_type, template, {}, True)
+            existing = _drafts.get(key)
+            if existing is not None and existing.fingerprint == fingerprint:
+                continue
+            if existing is not None and not existing.task.done():
+                existing.task.cancel()
+            task = asyncio.create_task(generate(contract_type, template))
+            task.add_done_callback(_log_failure)
+            _remember(key, _Draft(fingerprint, task, time.monotonic()))
+    finally:
+        db.close()
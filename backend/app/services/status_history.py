@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import case, event, func, inspect, select, update
+from sqlalchemy.orm import Session
+
+from app.db.history import track_previous_values
+from app.models.new_hire import NewHire
+from app.models.status_transition import NewHireStatusTransition
+
+
+# Onboarding stages in order; a new hire that reached a later stage passed the earlier ones.
+FUNNEL_STAGES = ("draft", "invited", "in_progress", "offer_presented", "contract_sent", "signed", "completed")
+
+
+# Load the previous status before it is overwritten so the transition records where it came from.
+track_previous_values(NewHire.status)
+
+
+def _seconds(later: datetime, earlier: Optional[datetime]) -> Optional[float]:
+    if earlier is None:
+        return None
+    if earlier.tzinfo is None:
+        earlier = earlier.replace(tzinfo=timezone.utc)
+    return round((later - earlier).total_seconds(), 3)
+
+
+def transition_values(new_hire_id, from_status, to_status, at, changed_at, created_at) -> dict:
+    return {
+        "new_hire_id": new_hire_id,
+        "from_status": from_status,
+        "to_status": to_status,
+        "at": at,
+        "seconds_in_previous_status": _seconds(at, changed_at) if from_status else None,
+        "seconds_since_created": _seconds(at, created_at) or 0.0,
+    }
+
+
+@event.listens_for(Session, "before_flush")
+def _record_status_transitions(session: Session, flush_context, instances) -> None:
+    """Append a transition for every new hire created or whose status changed in this flush."""
+    now = datetime.now(timezone.utc)
+    for obj in list(session.new):
+        if isinstance(obj, NewHire):
+            obj.created_at = obj.created_at or now
+            obj.status = obj.status or "draft"
+            obj.status_changed_at = obj.created_at
+            values = transition_values(None, None, obj.status, obj.created_at, None, obj.created_at)
+            del values["new_hire_id"]
+            session.add(NewHireStatusTransition(new_hire=obj, **values))
+    for obj in list(session.dirty):
+        if not isinstance(obj, NewHire):
+            continue
+        history = inspect(obj).attrs.status.history
+        if not history.added:
+            continue
+        previous = history.deleted[0] if history.deleted else None
+        if previous == history.added[0]:
+            continue
+        values = transition_values(
+            obj.id, previous, history.added[0], now, obj.status_changed_at or obj.created_at, obj.created_at,
+        )
+        session.add(NewHireStatusTransition(**values))
+        obj.status_changed_at = now
+
+
+def _in_range(statement, column, start_date: Optional[str], end_date: Optional[str]):
+    if start_date:
+        statement = statement.where(column >= start_date)
+    if end_date:
+        statement = statement.where(column < func.date(end_date) + 1)
+    return statement
+
+
+# When each new hire first reached "completed" and how many hours after its creation.
+# This is the one definition of time to complete, shared with the analytics query metrics.
+completions = (
+    select(
+        NewHireStatusTransition.new_hire_id,
+        func.min(NewHireStatusTransition.at).label("at"),
+        (func.min(NewHireStatusTransition.seconds_since_created) / 3600.0).label("hours"),
+    )
+    .where(NewHireStatusTransition.to_status == "completed")
+    .group_by(NewHireStatusTransition.new_hire_id)
+    .subquery("completions")
+)
+
+
+def average_hours_to_complete(db: Session, start_date: Optional[str] = None, end_date: Optional[str] = None) -> float:
+    """Mean hours from creation to the "completed" status, for completions in the date range."""
+    statement = _in_range(select(func.avg(completions.c.hours)), completions.c.at, start_date, end_date)
+    hours = db.execute(statement).scalar()
+    return round(float(hours), 1) if hours is not None else 0.0
+
+
+def funnel(db: Session, start_date: Optional[str] = None, end_date: Optional[str] = None) -> list[dict]:
+    """How far the new hires created in the date range got, stage by stage."""
+    T = NewHireStatusTransition
+    cohort = _in_range(select(T.new_hire_id).where(T.from_status == None), T.at, start_date, end_date)
+    rank = case({stage: i for i, stage in enumerate(FUNNEL_STAGES)}, value=T.to_status)
+    furthest = (
+        select(T.new_hire_id, func.max(rank).label("rank"))
+        .where(T.new_hire_id.in_(cohort), T.to_status.in_(FUNNEL_STAGES))
+        .group_by(T.new_hire_id)
+        .subquery()
+    )
+    counts = dict(db.execute(select(furthest.c.rank, func.count()).group_by(furthest.c.rank)).all())
+
+    stages = []
+    reached = 0
+    for i in reversed(range(len(FUNNEL_STAGES))):
+        reached += counts.get(i, 0)
+        stages.append((FUNNEL_STAGES[i], reached))
+    stages.reverse()
+    total = stages[0][1]
+    return [
+        {
+            "stage": stage,
+            "reached": count,
+            "rate": round(count / total * 100, 1) if total else 0,
+            "conversion_from_previous": (
+                round(count / stages[i - 1][1] * 100, 1) if i and stages[i - 1][1] else None
+            ),
+        }
+        for i, (stage, count) in enumerate(stages)
+    ]
+
+
+def _hours_summary(seconds) -> list:
+    return [
+        func.count(),
+        func.avg(seconds) / 3600,
+        func.percentile_cont(0.5).within_group(seconds) / 3600,
+        func.percentile_cont(0.9).within_group(seconds) / 3600,
+    ]
+
+
+def _round(value) -> Optional[float]:
+    return round(float(value), 2) if value is not None else None
+
+
+def time_in_stage(db: Session, start_date: Optional[str] = None, end_date: Optional[str] = None) -> list[dict]:
+    """Hours spent in each status before leaving it, for exits in the date range."""
+    T = NewHireStatusTransition
+    statement = _in_range(
+        select(T.from_status, *_hours_summary(T.seconds_in_previous_status))
+        .where(T.from_status != None, T.seconds_in_previous_status != None)
+        .group_by(T.from_status),
+        T.at, start_date, end_date,
+    )
+    order = {stage: i for i, stage in enumerate(FUNNEL_STAGES)}
+    rows = sorted(db.execute(statement).all(), key=lambda r: (order.get(r[0], len(order)), r[0]))
+    return [
+        {
+            "status": status,
+            "exits": count,
+            "average_hours": _round(avg),
+            "median_hours": _round(p50),
+            "p90_hours": _round(p90),
+        }
+        for status, count, avg, p50, p90 in rows
+    ]
+
+
+def stage_durations(
+    db: Session,
+    from_status: str,
+    to_status: str,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+) -> dict:
+    """Hours from first reaching ``from_status`` to first reaching ``to_status`` afterwards."""
+    T = NewHireStatusTransition
+
+    def first_reached(status: str, name: str):
+        return (
+            select(T.new_hire_id, func.min(T.at).label("at"))
+            .where(T.to_status == status)
+            .group_by(T.new_hire_id)
+            .subquery(name)
+        )
+
+    start = first_reached(from_status, "stage_start")
+    end = first_reached(to_status, "stage_end")
+    seconds = func.extract("epoch", end.c.at - start.c.at)
+    statement = _in_range(
+        select(*_hours_summary(seconds))
+        .select_from(start)
+        .join(end, end.c.new_hire_id == start.c.new_hire_id)
+        .where(end.c.at >= start.c.at),
+        end.c.at, start_date, end_date,
+    )
+    count, avg, p50, p90 = db.execute(statement).one()
+    return {
+        "from_status": from_status,
+        "to_status": to_status,
+        "new_hires": count,
+        "average_hours": _round(avg),
+        "median_hours": _round(p50),
+        "p90_hours": _round(p90),
+    }
+
+
+def backfill_transitions(db: Session, batch_size: int = 500) -> int:
+    """Give new hires created before the log existed a creation and a current-status transition.
+
+    Their real history is unknown, so the current status is dated at the row's
+    last update; durations for these rows are approximate.
+    """
+    T = NewHireStatusTransition
+    written = 0
+    while True:
+        hires = db.execute(
+            select(NewHire.id, NewHire.status, NewHire.created_at, NewHire.updated_at)
+            .where(~select(T.id).where(T.new_hire_id == NewHire.id).exists())
+            .limit(batch_size)
+        ).all()
+        if not hires:
+            break
+        rows = []
+        for new_hire_id, status, created_at, updated_at in hires:
+            created_at = created_at or datetime.now(timezone.utc)
+            rows.append(transition_values(new_hire_id, None, "draft", created_at, None, created_at))
+            if status and status != "draft":
+                at = max(updated_at or created_at, created_at)
+                rows.append(transition_values(new_hire_id, "draft", status, at, created_at, created_at))
+        db.bulk_insert_mappings(T, rows)
+        db.commit()
+        written += len(rows)
+
+    db.execute(
+        update(NewHire)
+        .where(NewHire.status_changed_at == None)
+        .values(
+            status_changed_at=func.greatest(func.coalesce(NewHire.updated_at, NewHire.created_at), NewHire.created_at),
+            updated_at=NewHire.updated_at,
+        )
+    )
+    db.commit()
+    return written
+
+
+if __name__ == "__main__":
+    import app.db.base  # noqa – register all models
+    from app.db.session import SessionLocal
+
+    session = SessionLocal()
+    try:
+        print(f"Wrote {backfill_transitions(session)} status transitions.")
+    finally:
+        session.close()
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.contract_template import ContractTemplate
+
+
+FALLBACK_LANGUAGE = "en"
+
+
+def _key(template_type: str, country: str, language: str) -> tuple[str, str, str]:
+    return (template_type or "").strip().lower(), (country or "").strip().lower(), (language or "").strip().lower()
+
+
+class TemplateIndex:
+    """In-memory map of (template_type, country, language) to the preferred active template.
+
+    A template that another active template names as its parent_template_id is
+    superseded; among the rest the highest version (then the newest) wins. The map
+    is rebuilt lazily after invalidate() or once TEMPLATE_INDEX_TTL_SECONDS have
+    passed, so changes made by other workers are picked up too.
+    """
+
+    def __init__(self):
+        self._index: Optional[dict[tuple[str, str, str], uuid.UUID]] = None
+        self._built_at = 0.0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._index = None
+            self._generation += 1
+
+    def _build(self, db: Session) -> dict[tuple[str, str, str], uuid.UUID]:
+        rows = db.query(
+            ContractTemplate.id,
+            ContractTemplate.template_type,
+            ContractTemplate.country,
+            ContractTemplate.language,
+            ContractTemplate.version,
+            ContractTemplate.parent_template_id,
+            ContractTemplate.created_at,
+        ).filter(
+            ContractTemplate.is_active == True,
+            ContractTemplate.deleted_at == None,
+        ).all()
+
+        superseded = {r.parent_template_id for r in rows if r.parent_template_id}
+        best: dict[tuple[str, str, str], tuple] = {}
+        for r in rows:
+            if r.id in superseded:
+                continue
+            key = _key(r.template_type, r.country, r.language)
+            rank = (r.version or 1, r.created_at.timestamp() if r.created_at else 0.0)
+            if key not in best or rank > best[key][0]:
+                best[key] = (rank, r.id)
+        return {key: template_id for key, (_, template_id) in best.items()}
+
+    def _snapshot(self, db: Session) -> dict[tuple[str, str, str], uuid.UUID]:
+        with self._lock:
+            if self._index is not None and time.monotonic() - self._built_at < settings.TEMPLATE_INDEX_TTL_SECONDS:
+                return self._index
+            generation = self._generation
+        index = self._build(db)
+        with self._lock:
+            # Don't publish a map that an invalidate() raced with.
+            if generation == self._generation:
+                self._index, self._built_at = index, time.monotonic()
+        return index
+
+    def resolve_id(self, db: Session, template_type: str, country: str, language: str) -> Optional[uuid.UUID]:
+        index = self._snapshot(db)
+        return index.get(_key(template_type, country, language)) or index.get(
+            _key(template_type, country, FALLBACK_LANGUAGE)
+        )
+
+    def resolve(self, db: Session, template_type: str, country: str, language: str) -> Optional[ContractTemplate]:
+        template_id = self.resolve_id(db, template_type, country, language)
+        if template_id is None:
+            return None
+        template = db.get(ContractTemplate, template_id)
+        if template is None or not template.is_active or template.deleted_at is not None:
+            # Changed since the index was built; rebuild once and retry.
+            self.invalidate()
+            template_id = self.resolve_id(db, template_type, country, language)
+            template = db.get(ContractTemplate, template_id) if template_id else None
+        return template
+
+
+template_index = TemplateIndex()
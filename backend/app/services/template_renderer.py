@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from typing import Any
+
+from jinja2 import StrictUndefined, Template, TemplateSyntaxError, UndefinedError, meta
+from jinja2.sandbox import SandboxedEnvironment, SecurityError
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.models.contract_template import ContractTemplate
+
+
+VARIABLE_TYPES = {"string", "number", "date", "boolean", "list", "object"}
+
+# Names every template can use without declaring them; they are filled from
+# DocumentGeneratorService.prepare_context.
+CONTEXT_VARIABLES = {
+    "company", "employee", "employment", "benefits",
+    "company_name", "company_address", "company_registration_number",
+    "company_signatory_name", "company_signatory_title",
+    "full_name", "email", "phone", "language", "position", "department",
+    "salary", "currency", "start_date",
+    "employment_type", "work_location", "country",
+    "probation_period_months", "notice_period_days", "annual_leave_days",
+}
+
+
+class TemplateValidationError(ValueError):
+    pass
+
+
+class TemplateRenderError(ValueError):
+    pass
+
+
+_env = SandboxedEnvironment(
+    undefined=StrictUndefined,
+    autoescape=False,
+    trim_blocks=True,
+    lstrip_blocks=True,
+    keep_trailing_newline=True,
+)
+
+
+# Compiled templates keyed by (template id, version)
+_cache: LRUCache[tuple[str, int], Template] = LRUCache(settings.TEMPLATE_CACHE_SIZE)
+
+
+def validate_template(content_template: str, variables: list) -> None:
+    """Check that a template compiles and only references known or declared variables."""
+    declared = set()
+    for item in variables or []:
+        if not isinstance(item, dict) or not isinstance(item.get("name"), str):
+            raise TemplateValidationError("Each variable must be an object with a 'name'")
+        name = item["name"]
+        if not name.isidentifier():
+            raise TemplateValidationError(f"Invalid variable name: {name!r}")
+        if name in declared:
+            raise TemplateValidationError(f"Variable declared more than once: {name}")
+        var_type = item.get("type", "string")
+        if var_type not in VARIABLE_TYPES:
+            raise TemplateValidationError(
+                f"Unsupported type {var_type!r} for variable {name}; "
+                f"expected one of {', '.join(sorted(VARIABLE_TYPES))}"
+            )
+        declared.add(name)
+
+    try:
+        parsed = _env.parse(content_template)
+    except TemplateSyntaxError as e:
+        raise TemplateValidationError(f"Template syntax error on line {e.lineno}: {e.message}") from e
+
+    undeclared = meta.find_undeclared_variables(parsed) - declared - CONTEXT_VARIABLES
+    if undeclared:
+        raise TemplateValidationError(
+            f"Template uses undeclared variables: {', '.join(sorted(undeclared))}"
+        )
+
+
+def build_render_context(context: dict, variables: list, custom_vars: dict | None = None) -> dict:
+    """Flatten the generation context into the namespace templates are rendered with."""
+    namespace: dict[str, Any] = {}
+    for item in variables or []:
+        if isinstance(item, dict) and "name" in item and not item.get("required", False):
+            namespace[item["name"]] = item.get("default")
+
+    namespace.update(context.get("employment", {}))
+    namespace.update(context.get("employee", {}))
+    for key, value in context.get("company", {}).items():
+        namespace[f"company_{key}"] = value
+    namespace.update(context)
+    namespace.update(custom_vars or {})
+    return namespace
+
+
+def render_source(
+    cache_key: tuple[str, int],
+    source: str,
+    variables: list,
+    context: dict,
+    custom_vars: dict | None = None,
+) -> str:
+    """Render any stored Jinja2 source, compiling it at most once per cache key."""
+    compiled = _cache.get_or_set(cache_key, lambda: _env.from_string(source))
+    namespace = build_render_context(context, variables, custom_vars)
+    try:
+        return compiled.render(namespace)
+    except UndefinedError as e:
+        raise TemplateRenderError(f"Missing template variable: {e.message}") from e
+    except SecurityError as e:
+        raise TemplateRenderError(f"Template performed a disallowed operation: {e}") from e
+
+
+def render_template(template: ContractTemplate, context: dict, custom_vars: dict | None = None) -> str:
+    return render_source(
+        (str(template.id), template.version or 1),
+        template.content_template,
+        template.variables,
+        context,
+        custom_vars,
+    )
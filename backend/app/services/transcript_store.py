@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy import delete, func, insert, literal, select, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.conversation import Conversation
+from app.models.conversation_message import ConversationMessage
+from app.models.transcript_chunk import ConversationTranscriptChunk
+from app.services.partitions import conversation_messages_filter
+
+
+TRANSCRIPT_LAYOUTS = ("rows", "chunks")
+
+# Keys a turn may carry besides its sequence number, as accepted by ``append``
+TURN_FIELDS = (
+    "speaker", "message", "audio_url", "audio_duration_seconds", "original_language",
+    "translated_message", "timestamp", "message_metadata",
+)
+
+
+def _iso(value) -> Optional[str]:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def message_dict(m: ConversationMessage) -> dict:
+    return {
+        "speaker": m.speaker,
+        "message": m.message,
+        "audio_url": m.audio_url,
+        "audio_duration_seconds": float(m.audio_duration_seconds) if m.audio_duration_seconds is not None else None,
+        "original_language": m.original_language,
+        "translated_message": m.translated_message,
+        "timestamp": _iso(m.timestamp),
+        "message_metadata": m.message_metadata,
+        "sequence_number": m.sequence_number,
+        "created_at": _iso(m.created_at),
+    }
+
+
+class RowTranscriptStore:
+    """One conversation_messages row per turn (the default layout)."""
+
+    layout = "rows"
+
+    def count(self, db: Session, conversation: Conversation) -> int:
+        return db.query(func.count(ConversationMessage.id)).filter(
+            *conversation_messages_filter(conversation)
+        ).scalar()
+
+    def load(self, db: Session, conversation: Conversation) -> list[dict]:
+        messages = db.query(ConversationMessage).filter(
+            *conversation_messages_filter(conversation)
+        ).order_by(ConversationMessage.sequence_number).all()
+        return [message_dict(m) for m in messages]
+
+    def lock(self, db: Session, conversation: Conversation) -> int:
+        """Lock the conversation against appends and archiving until the caller commits.
+
+        Locks the conversation row, so it also serialises the first append, when there
+        is no message or chunk row to lock yet. Returns how many turns were moved to
+        the conversation's archive; turns in the tables are numbered after those.
+        """
+        return db.execute(
+            select(Conversation.archived_message_count).where(Conversation.id == conversation.id).with_for_update()
+        ).scalar() or 0
+
+    def append(self, db: Session, conversation: Conversation, turns: list[dict]) -> int:
+        """Stage ``turns`` after the conversation's existing ones; the caller commits."""
+        if not turns:
+            return 0
+        sequence_number = self.lock(db, conversation) + self.count(db, conversation)
+        for turn in turns:
+            sequence_number += 1
+            db.add(ConversationMessage(
+                conversation_id=conversation.id,
+                sequence_number=sequence_number,
+                **{k: turn[k] for k in TURN_FIELDS if turn.get(k) is not None},
+            ))
+        return len(turns)
+
+    def delete(self, db: Session, conversation: Conversation) -> None:
+        db.execute(
+            delete(ConversationMessage)
+            .where(*conversation_messages_filter(conversation))
+            .execution_options(synchronize_session=False)
+        )
+
+
+class ChunkedTranscriptStore(RowTranscriptStore):
+    """Turns appended to per-conversation JSONB arrays of up to ``chunk_size`` entries.
+
+    A transcript is read back with one index range scan over a handful of rows
+    instead of one row per turn. Appends extend the last chunk in place with
+    ``turns || :new`` and open new chunks once it is full, so a batch of turns
+    costs one UPDATE and at most a few INSERTs. Concurrent appends to the same
+    conversation queue on the lock of its conversation row.
+
+    Conversations written before the switch keep their rows and are read from
+    them; the first append moves those rows into chunks.
+    """
+
+    layout = "chunks"
+
+    def __init__(self, chunk_size: int):
+        self.chunk_size = max(1, chunk_size)
+
+    def count(self, db: Session, conversation: Conversation) -> int:
+        C = ConversationTranscriptChunk
+        total = db.execute(select(func.sum(C.turn_count)).where(C.conversation_id == conversation.id)).scalar()
+        return int(total) if total is not None else super().count(db, conversation)
+
+    def load(self, db: Session, conversation: Conversation) -> list[dict]:
+        C = ConversationTranscriptChunk
+        chunks = db.execute(
+            select(C.turns).where(C.conversation_id == conversation.id).order_by(C.chunk_index)
+        ).scalars().all()
+        if not chunks:
+            return super().load(db, conversation)
+        return [turn for chunk in chunks for turn in chunk]
+
+    def _turn(self, turn: dict, sequence_number: int, now: str) -> dict:
+        values = {k: turn.get(k) for k in TURN_FIELDS}
+        if isinstance(values["audio_duration_seconds"], Decimal):
+            values["audio_duration_seconds"] = float(values["audio_duration_seconds"])
+        values["timestamp"] = _iso(values["timestamp"]) or now
+        values["message_metadata"] = values["message_metadata"] or {}
+        values["sequence_number"] = sequence_number
+        values["created_at"] = now
+        return values
+
+    def append(self, db: Session, conversation: Conversation, turns: list[dict]) -> int:
+        if not turns:
+            return 0
+        C = ConversationTranscriptChunk
+        now = datetime.now(timezone.utc)
+        archived = self.lock(db, conversation)
+        last = db.execute(
+            select(C.chunk_index, C.first_sequence, C.turn_count)
+            .where(C.conversation_id == conversation.id)
+            .order_by(C.chunk_index.desc())
+            .limit(1)
+        ).first()
+
+        if last is not None:
+            pending = []
+            next_sequence = last.first_sequence + last.turn_count
+        else:
+            pending = super().load(db, conversation)
+            if pending:
+                super().delete(db, conversation)
+            next_sequence = archived + len(pending) + 1
+        pending += [self._turn(t, next_sequence + i, now.isoformat()) for i, t in enumerate(turns)]
+
+        if last is not None and last.turn_count < self.chunk_size:
+            head, pending = pending[:self.chunk_size - last.turn_count], pending[self.chunk_size - last.turn_count:]
+            db.execute(
+                update(C)
+                .where(C.conversation_id == conversation.id, C.chunk_index == last.chunk_index)
+                .values(
+                    turns=C.turns.op("||")(literal(head, JSONB)),
+                    turn_count=C.turn_count + len(head),
+                    updated_at=now,
+                )
+            )
+
+        chunk_index = last.chunk_index + 1 if last is not None else 0
+        rows = []
+        for start in range(0, len(pending), self.chunk_size):
+            part = pending[start:start + self.chunk_size]
+            rows.append({
+                "conversation_id": conversation.id,
+                "chunk_index": chunk_index,
+                "first_sequence": part[0]["sequence_number"],
+                "turn_count": len(part),
+                "turns": part,
+                "created_at": now,
+                "updated_at": now,
+            })
+            chunk_index += 1
+        if rows:
+            db.execute(insert(C), rows)
+        return len(turns)
+
+    def delete(self, db: Session, conversation: Conversation) -> None:
+        db.execute(
+            delete(ConversationTranscriptChunk)
+            .where(ConversationTranscriptChunk.conversation_id == conversation.id)
+            .execution_options(synchronize_session=False)
+        )
+        super().delete(db, conversation)
+
+
+def get_transcript_store(layout: Optional[str] = None) -> RowTranscriptStore:
+    if (layout or settings.TRANSCRIPT_STORAGE) == "chunks":
+        return ChunkedTranscriptStore(settings.TRANSCRIPT_CHUNK_SIZE)
+    return RowTranscriptStore()
@@ -0,0 +1,104 @@
+"""Benchmark contract generation throughput against the offline fake LLM provider.
+
+Run from the backend directory, no network or database needed:
+
+    python -m benchmarks.generation_throughput --requests 200 --concurrency 16
+
+Documents go through DocumentGeneratorService.build_contract (prompting, provider
+call, blob storage) with a custom prompt so every request reaches the model.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+
+import app.db.base  # noqa – register all models
+from app.services.document_generator import DocumentGeneratorService
+from app.services.generation_metrics import generation_metrics
+from app.services.llm_provider import FakeLLMProvider, set_llm_provider
+
+
+def fake_new_hire(i: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        full_name=f"Benchmark Hire {i}",
+        email=f"hire{i}@example.com",
+        phone="+971500000000",
+        preferred_language="en",
+        position="Software Engineer",
+        department="Engineering",
+        start_date=date(2025, 3, 1),
+        salary=Decimal(20000 + i),
+        currency="AED",
+        employment_type="full_time",
+        work_location="office",
+        country="UAE",
+        benefits=[],
+    )
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run(args) -> None:
+    set_llm_provider(FakeLLMProvider(
+        latency_median_ms=args.latency_median,
+        latency_p95_ms=args.latency_p95,
+        completion_tokens=args.tokens,
+        replay_path=args.replay,
+        seed=args.seed,
+    ))
+    generator = DocumentGeneratorService()
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies: list[float] = []
+    queued: list[float] = []
+
+    async def one(i: int) -> None:
+        submitted = time.perf_counter()
+        async with semaphore:
+            started = time.perf_counter()
+            await generator.build_contract(
+                new_hire=fake_new_hire(i),
+                contract_type=args.contract_type,
+                generation_prompt="Standard terms for benchmarking",
+            )
+        finished = time.perf_counter()
+        queued.append((started - submitted) * 1000)
+        latencies.append((finished - submitted) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(args.requests)))
+    elapsed = time.perf_counter() - started
+
+    print(f"requests:    {args.requests} (concurrency {args.concurrency})")
+    print(f"wall time:   {elapsed:.2f}s")
+    print(f"throughput:  {args.requests / elapsed:.2f} documents/s")
+    print(f"latency ms:  p50 {percentile(latencies, 50):.0f}  p95 {percentile(latencies, 95):.0f}  "
+          f"p99 {percentile(latencies, 99):.0f}  mean {statistics.mean(latencies):.0f}")
+    print(f"queue ms:    p50 {percentile(queued, 50):.0f}  p95 {percentile(queued, 95):.0f}")
+    for series in generation_metrics.snapshot():
+        print(f"tokens:      {series['prompt_tokens']} prompt / {series['completion_tokens']} completion "
+              f"over {series['calls']} calls; ttft p50 {series['p50_ttft_ms']:.0f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--contract-type", default="employment_contract")
+    parser.add_argument("--latency-median", type=float, default=800.0, help="fake model latency median (ms)")
+    parser.add_argument("--latency-p95", type=float, default=2500.0, help="fake model latency p95 (ms)")
+    parser.add_argument("--tokens", type=int, default=600, help="synthetic completion length in tokens")
+    parser.add_argument("--replay", help="JSONL of completions recorded with LLM_RECORD_PATH")
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""Benchmark the row-per-message and chunked JSONB transcript layouts against each other.
+
+Needs the Postgres in DATABASE_URL; everything happens in a scratch schema that is
+dropped and recreated for every run, so application tables are not touched:
+
+    python -m benchmarks.transcript_layouts --conversations 10000,100000,1000000
+
+For each scale and layout, conversations are seeded, then their turns are written
+through the transcript store in several appends per conversation (as the voice
+endpoint does), interleaved across conversations and committed in groups. The
+report gives ingest throughput, on-disk size after VACUUM (heap, TOAST and
+indexes) and transcript read latency for a random sample of conversations.
+"""
+import argparse
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.orm import Session
+
+import app.db.base  # noqa – register all models
+from app.core.config import settings
+from app.db.base_class import Base
+from app.models.conversation import Conversation
+from app.models.conversation_message import ConversationMessage
+from app.models.transcript_chunk import ConversationTranscriptChunk
+from app.services.partitions import ensure_partitions
+from app.services.transcript_store import TRANSCRIPT_LAYOUTS, get_transcript_store
+
+WORDS = (
+    "salary benefits contract start date housing allowance visa office remote team manager "
+    "probation notice period leave insurance relocation bonus schedule training onboarding"
+).split()
+LAYOUT_TABLES = {
+    "rows": ConversationMessage.__tablename__,
+    "chunks": ConversationTranscriptChunk.__tablename__,
+}
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def scratch_engine(schema: str):
+    return create_engine(settings.DATABASE_URL, connect_args={"options": f"-csearch_path={schema}"})
+
+
+def reset_schema(engine, schema: str) -> None:
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {schema}"))
+        tables = [Base.metadata.tables[name] for name in ("hr_employees", "new_hires", "conversations")]
+        Base.metadata.create_all(conn, tables=tables + [t.__table__ for t in (ConversationMessage, ConversationTranscriptChunk)])
+        ensure_partitions(conn, ConversationMessage.__tablename__)
+
+
+def seed_conversations(engine, count: int, batch_size: int = 5000) -> list[SimpleNamespace]:
+    now = datetime.now(timezone.utc)
+    conversations = []
+    with engine.begin() as conn:
+        for start in range(0, count, batch_size):
+            rows = []
+            for i in range(start, min(count, start + batch_size)):
+                conversation_id = uuid.uuid4()
+                rows.append({
+                    "id": conversation_id,
+                    "session_id": f"bench-{conversation_id.hex}",
+                    "start_time": now,
+                    "created_at": now,
+                    "conversation_metadata": {},
+                })
+                conversations.append(SimpleNamespace(id=conversation_id, created_at=now))
+            conn.execute(insert(Conversation), rows)
+    return conversations
+
+
+def fake_turn(rng: random.Random, sequence: int, start: datetime) -> dict:
+    return {
+        "speaker": "agent" if sequence % 2 else "new_hire",
+        "message": " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 40))).capitalize() + "?",
+        "timestamp": start + timedelta(seconds=sequence * 7),
+    }
+
+
+def ingest(engine, layout: str, conversations: list, args) -> float:
+    """Append every conversation's turns in ``args.appends`` batches; returns the elapsed seconds."""
+    store = get_transcript_store(layout)
+    rng = random.Random(args.seed)
+    per_append = max(1, args.turns // args.appends)
+    started = time.perf_counter()
+    for start in range(0, len(conversations), args.commit_every):
+        group = conversations[start:start + args.commit_every]
+        with Session(engine) as db:
+            for round_number in range(args.appends):
+                first = round_number * per_append
+                for conversation in group:
+                    turns = [fake_turn(rng, first + i + 1, conversation.created_at) for i in range(per_append)]
+                    store.append(db, conversation, turns)
+                db.flush()
+            db.commit()
+    return time.perf_counter() - started
+
+
+def storage(engine, layout: str) -> tuple[int, int]:
+    """(total bytes, index bytes) of the layout's table, summed over its partitions."""
+    table = LAYOUT_TABLES[layout]
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text(f"VACUUM ANALYZE {table}"))
+        return tuple(int(v or 0) for v in conn.execute(text(
+            "SELECT sum(pg_total_relation_size(relid)), sum(pg_indexes_size(relid)) "
+            "FROM pg_partition_tree(CAST(:t AS regclass))"
+        ), {"t": table}).one())
+
+
+def read_latencies(engine, layout: str, conversations: list, args) -> list[float]:
+    store = get_transcript_store(layout)
+    sample = random.Random(args.seed).sample(conversations, min(args.samples, len(conversations)))
+    latencies = []
+    with Session(engine) as db:
+        for conversation in sample:
+            started = time.perf_counter()
+            store.load(db, conversation)
+            latencies.append((time.perf_counter() - started) * 1000)
+            db.expunge_all()
+    return latencies
+
+
+def run(args) -> None:
+    engine = scratch_engine(args.schema)
+    scales = [int(n) for n in args.conversations.split(",")]
+    layouts = args.layouts.split(",")
+    print(f"{args.turns} turns per conversation in {args.appends} appends, chunk size {settings.TRANSCRIPT_CHUNK_SIZE}")
+    try:
+        for scale in scales:
+            for layout in layouts:
+                reset_schema(engine, args.schema)
+                conversations = seed_conversations(engine, scale)
+                elapsed = ingest(engine, layout, conversations, args)
+                total_bytes, index_bytes = storage(engine, layout)
+                latencies = read_latencies(engine, layout, conversations, args)
+                turns = scale * max(1, args.turns // args.appends) * args.appends
+                print(f"\n{scale} conversations, {layout}:")
+                print(f"  ingest:    {turns} turns in {elapsed:.1f}s, {turns / elapsed:.0f} turns/s")
+                print(f"  storage:   {total_bytes / 2 ** 20:.1f} MiB ({index_bytes / 2 ** 20:.1f} MiB indexes), "
+                      f"{total_bytes / turns:.0f} bytes/turn")
+                print(f"  read ms:   p50 {percentile(latencies, 50):.2f}  p95 {percentile(latencies, 95):.2f}  "
+                      f"p99 {percentile(latencies, 99):.2f}  mean {statistics.mean(latencies):.2f}")
+    finally:
+        if not args.keep:
+            with engine.begin() as conn:
+                conn.execute(text(f"DROP SCHEMA IF EXISTS {args.schema} CASCADE"))
+        engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--conversations", default="10000,100000,1000000", help="comma-separated scales")
+    parser.add_argument("--layouts", default=",".join(TRANSCRIPT_LAYOUTS))
+    parser.add_argument("--turns", type=int, default=24, help="turns per conversation")
+    parser.add_argument("--appends", type=int, default=6, help="append calls per conversation")
+    parser.add_argument("--commit-every", type=int, default=500, help="conversations per transaction")
+    parser.add_argument("--samples", type=int, default=1000, help="conversations timed for reads")
+    parser.add_argument("--schema", default="transcript_benchmark")
+    parser.add_argument("--keep", action="store_true", help="leave the scratch schema for inspection")
+    parser.add_argument("--seed", type=int, default=0)
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,15 @@
+import asyncio
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy import text, inspect
 from app.core.config import settings
 from app.api.router import api_router
 from app.db.session import engine
-import app.db.base  # noqa – register all models
+from app.services.pdf_renderer import shutdown_renderer
+from app.services.audit import AuditContextMiddleware, audit_writer
+from app.services.partitions import ensure_all_partitions, maintenance_loop
+from app.db.base import Base  # noqa – register all models
 
 app = FastAPI(
     title=settings.APP_NAME,
@@ -22,30 +27,86 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Audit context (request id, client, user) for mutating requests
+app.add_middleware(AuditContextMiddleware)
+
 # Include API routes
 app.include_router(api_router, prefix=settings.API_V1_PREFIX)
 
 
+_background_tasks: list[asyncio.Task] = []
+
+
+# Columns added after the initial schema, created on startup (no Alembic in this project).
+ADDED_COLUMNS = {
+    "conversations": {
+        "elevenlabs_conversation_id": "VARCHAR(255)",
+        "agent_id": "VARCHAR(255)",
+        "conversation_metadata": "JSONB DEFAULT '{}'",
+        "archive_key": "VARCHAR(500)",
+        "archived_at": "TIMESTAMP WITH TIME ZONE",
+        "archived_message_count": "INTEGER",
+    },
+    "new_hires": {
+        "status_changed_at": "TIMESTAMP WITH TIME ZONE",
+    },
+    "contracts": {
+        "content_sha256": "VARCHAR(64)",
+        "content_size": "INTEGER",
+        "pdf_key": "VARCHAR(500)",
+        "delta_depth": "INTEGER DEFAULT 0",
+        "prompt_tokens": "INTEGER",
+        "completion_tokens": "INTEGER",
+        "generation_latency_ms": "INTEGER",
+        "generation_ttft_ms": "INTEGER",
+    },
+}
+
+# Indexes added to existing tables after the initial schema.
+ADDED_INDEXES = {
+    "ix_new_hires_updated_at": "new_hires (updated_at)",
+    "ix_questions_updated_at": "questions (updated_at)",
+    "ix_conversations_updated_at": "conversations (updated_at)",
+    "ix_contracts_updated_at": "contracts (updated_at)",
+    # Analytics snapshot watermarks, see app.services.analytics_snapshot
+    "ix_new_hires_changed_at": "new_hires ((coalesce(updated_at, created_at)))",
+    "ix_questions_changed_at": "questions ((coalesce(updated_at, created_at)))",
+    "ix_conversations_changed_at": "conversations ((coalesce(updated_at, created_at)))",
+    "ix_contracts_changed_at": "contracts ((coalesce(updated_at, created_at)))",
+}
+
+
 @app.on_event("startup")
 async def ensure_schema():
-    """Add any model columns missing from the database (no Alembic in this project)."""
+    """Create missing tables and add missing model columns (no Alembic in this project)."""
+    Base.metadata.create_all(bind=engine)
+    ensure_all_partitions(engine)
     with engine.connect() as conn:
         insp = inspect(engine)
-        if "conversations" in insp.get_table_names():
-            existing = {c["name"] for c in insp.get_columns("conversations")}
-            if "elevenlabs_conversation_id" not in existing:
-                conn.execute(text(
-                    "ALTER TABLE conversations ADD COLUMN elevenlabs_conversation_id VARCHAR(255)"
-                ))
-            if "agent_id" not in existing:
-                conn.execute(text(
-                    "ALTER TABLE conversations ADD COLUMN agent_id VARCHAR(255)"
-                ))
-            if "conversation_metadata" not in existing:
-                conn.execute(text(
-                    "ALTER TABLE conversations ADD COLUMN conversation_metadata JSONB DEFAULT '{}'"
-                ))
-            conn.commit()
+        tables = insp.get_table_names()
+        for table, columns in ADDED_COLUMNS.items():
+            if table not in tables:
+                continue
+            existing = {c["name"] for c in insp.get_columns(table)}
+            for name, ddl in columns.items():
+                if name not in existing:
+                    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}"))
+        for name, target in ADDED_INDEXES.items():
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {target}"))
+        conn.commit()
+
+
+@app.on_event("startup")
+async def start_partition_maintenance():
+    _background_tasks.append(asyncio.create_task(maintenance_loop(engine)))
+
+
+@app.on_event("shutdown")
+async def shutdown_workers():
+    for task in _background_tasks:
+        task.cancel()
+    shutdown_renderer()
+    audit_writer.stop()
 
 
 @app.get("/")
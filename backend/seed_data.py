@@ -10,6 +10,7 @@ from app.models.hr_employee import HREmployee
 from app.models.new_hire import NewHire
 from app.models.benefit import Benefit
 from app.models.contract_template import ContractTemplate
+from app.models.contract_clause import ContractClause
 from app.models.question import Question
 from app.models.conversation import Conversation
 
@@ -98,6 +99,39 @@ def seed():
         db.add_all([tpl1, tpl2, tpl3])
         db.flush()
 
+        # ── Clause Library (UAE, English) ─────────────────────────
+        clauses_data = [
+            ("preamble", "Preamble", False,
+             "EMPLOYMENT CONTRACT\n\nThis Employment Contract is entered into on {{ start_date }} between "
+             "{{ company_name }}, {{ company_address }} (the \"Employer\") and {{ full_name }} (the \"Employee\")."),
+            ("position", "Position and Duties", True,
+             "   The Employee is hired as {{ position }} in the {{ department }} department."),
+            ("probation", "Commencement and Probation", True,
+             "   Employment commences on {{ start_date }}. The first {{ probation_period_months }} months "
+             "are a probation period in accordance with the UAE Labour Law."),
+            ("compensation", "Compensation", True,
+             "   The Employee shall receive a monthly salary of {{ salary }} {{ currency }}."),
+            ("annual_leave", "Annual Leave", True,
+             "   The Employee is entitled to {{ annual_leave_days }} days of paid annual leave per year."),
+            ("termination", "Termination", True,
+             "   Either party may terminate this contract with {{ notice_period_days }} days written notice. "
+             "The Employee is entitled to end-of-service gratuity as per the UAE Labour Law."),
+            ("governing_law", "Governing Law", True,
+             "   This Contract is governed by the laws of the United Arab Emirates."),
+            ("signatures", "Signatures", False,
+             "EMPLOYER SIGNATURE:\n________________________\n{{ company_signatory_name }}\n{{ company_signatory_title }}"
+             "\n\nEMPLOYEE SIGNATURE:\n________________________\n{{ full_name }}\nDate: ________________"),
+        ]
+        db.add_all([
+            ContractClause(
+                clause_key=key, title=title, country="UAE", language="en",
+                contract_types=["employment_contract"], position=i * 10, numbered=numbered,
+                body_template=body, created_by=hr1.id,
+            )
+            for i, (key, title, numbered, body) in enumerate(clauses_data)
+        ])
+        db.flush()
+
         # ── New Hires ─────────────────────────────────────────────
         new_hires_data = [
             {
@@ -267,6 +301,7 @@ def seed():
         print(f"New Hires: {len(hire_objects)} records created")
         print(f"Questions: {len(questions_data)} records created")
         print(f"Templates: 3 records created")
+        print(f"Clauses: {len(clauses_data)} records created")
 
     except Exception as e:
         db.rollback()